@@ -1,16 +1,38 @@
-from os.path import join, dirname
-from typing import Iterable, Union, List
+from collections import deque
+from dataclasses import asdict
+from datetime import timedelta
+from functools import partial
+from os import listdir
+from os.path import join, dirname, getmtime, isdir
+from threading import Event, RLock, Thread
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union, List
 
-from langcodes import closest_match
 from json_database import JsonStorage
+from ovos_bus_client.message import Message
 from ovos_utils import classproperty
 from ovos_utils.lang import standardize_lang_tag
-from ovos_utils.ocp import MediaType, PlaybackType, Playlist, PluginStream, dict2entry, MediaEntry
-from ovos_utils.parse import match_one, MatchStrategy
+from ovos_utils.ocp import MediaEntry, MediaState, MediaType, PlaybackType, Playlist, PluginStream
 from ovos_utils.process_utils import RuntimeRequirements
+from ovos_utils.time import now_local
 from ovos_workshop.decorators import ocp_search, ocp_featured_media, intent_handler
 from ovos_workshop.skills.common_play import OVOSCommonPlaybackSkill
 
+from .affinity import LanguageAffinity
+from .artwork import ArtworkCache
+from .briefing import BriefingPlayer
+from .bulletins import BulletinCache
+from .bundles import LocaleBundle
+from .cache import TTLCache
+from .catalog import CompiledCatalog, CompiledStationIndex, compile_catalog, load_keywords
+from .featured import FeaturedPlaylist, copy_entry
+from .health import HealthChecker
+from .metrics import QueryMetrics
+from .resolver import StreamResolver
+from .scoring import score_station
+from .sources import CatalogSource, IngestStats
+from .stations import CatalogDiff, NewsStation, StationIndex
+from .vocabulary import VocabMatch, VocabMatcher
+
 
 # Unified News Skill
 class NewsSkill(OVOSCommonPlaybackSkill):
@@ -27,10 +49,49 @@ class NewsSkill(OVOSCommonPlaybackSkill):
         "fr-FR": "EuroNews",
         "de-DE": "DLF - Die Nachrichten"
     }
+    # .voc files of language names -> requested language
+    lang_vocs = {
+        "pt-pt": "pt-pt",
+        "en-us": "en-us",
+        "en-gb": "en-gb",
+        "en-ca": "en-ca",
+        "en": "en",
+        "es": "es-es",
+        "de": "de-de",
+        "nl": "nl-nl",
+        "fi": "fi-fi",
+        "sv": "sv-se"
+    }
 
     def __init__(self, *args, **kwargs):
         self.default_bg = join(dirname(__file__), "res", "bg.jpg")
-        self.archive = JsonStorage(f"{dirname(__file__)}/News.json")
+        self.archive_path = join(dirname(__file__), "News.json")
+        # compiled from News.json on first use and whenever it changes, None for the skill data folder
+        self.compiled_path: Optional[str] = None
+        # OCP keywords of News.json, registered at startup without parsing the catalog
+        self.keywords_path = join(dirname(__file__), "News.keywords.json")
+        self._archive: Optional[JsonStorage] = None
+        self._catalog_langs: List[str] = []  # raw News.json language sections
+        self._extra_stations: List[NewsStation] = []  # ingested from external catalogs
+        self._stations: StationIndex = None  # as loaded, without the defaults of the current language
+        self._variants = (None, {})  # (loaded index, {(default_feed, lang): index with those defaults})
+        self._catalog_lock = RLock()  # serializes index swaps, queries never wait for it
+        self._warm = Event()  # set once the catalog, keyword matchers and language table are built
+        self._vocab_matchers: Dict[str, VocabMatcher] = {}
+        # built from locale/ by scripts/compile_locale.py, only used while up to date
+        self._locale_bundles: Dict[str, Optional[LocaleBundle]] = {}
+        self._affinity: Optional[LanguageAffinity] = None
+        self.search_cache = TTLCache()
+        self.featured = FeaturedPlaylist(self._station2featured)
+        self.resolver: Optional[StreamResolver] = None
+        self.health: Optional[HealthChecker] = None
+        self.bulletins: Optional[BulletinCache] = None
+        self._bulletin_events: List[str] = []
+        self.briefing: Optional[BriefingPlayer] = None
+        self.artwork: Optional[ArtworkCache] = None
+        self.metrics = QueryMetrics()
+        self._recent_uris = deque(maxlen=10)
+        self._cache_country = None
         super().__init__(supported_media=[MediaType.NEWS, MediaType.GENERIC],
                          skill_icon=join(dirname(__file__), "res", "news.png"),
                          *args, **kwargs)
@@ -41,207 +102,855 @@ class NewsSkill(OVOSCommonPlaybackSkill):
                                    requires_internet=True)
 
     def initialize(self):
-        news = []
-        for a in self.archive.values():
-            for k in a:
-                news += a[k]["aliases"] + [k]
-        self.register_ocp_keyword(MediaType.NEWS, "news_provider", news)
+        keywords = None
+        if self.settings.get("deferred_startup", True):
+            keywords = load_keywords(self.keywords_path, self.archive_path)
+        if keywords is not None:
+            # answer OCP right away, the catalog is parsed by a background
+            # thread or by the first query, whichever comes first
+            self._announce_keywords(keywords)
+            Thread(target=self.warm_up, name="news.warm_up", daemon=True).start()
+        else:
+            news = self.stations.keywords()
+            self.register_ocp_keyword(MediaType.NEWS, "news_provider", news)
+            self._build_affinity()
+            self._warm.set()
         # self.export_ocp_keywords_csv("news.csv")
+        self._configure_cache()
+        self._configure_resolver()
+        self._configure_health_check()
+        self._configure_catalog_watch()
+        self._configure_bulletins()
+        self._configure_briefing()
+        self._configure_artwork()
+        self.metrics.enabled = self.settings.get("metrics", False)
+        self.settings_change_callback = self.on_settings_changed
+        self.add_event(f"{self.skill_id}.cache.stats", self.handle_cache_stats)
+        self.add_event(f"{self.skill_id}.featured.page", self.handle_featured_page)
+        self.add_event(f"{self.skill_id}.metrics", self.handle_metrics)
+        self.add_event("ovos.common_play.play", self.handle_ocp_play)
+        self.add_event("ovos.common_play.media.state", self.handle_media_state)
+        self.add_event("ovos.common_play.stop", self.handle_ocp_stop)
+        self.add_event(f"{self.skill_id}.catalog.ingest", self.handle_ingest_catalog)
+        self.add_event(f"{self.skill_id}.catalog.reload", self.handle_reload_catalog)
+        if self.settings.get("external_catalogs"):
+            # large catalogs take a while to ingest, never during startup
+            self.schedule_event(self.ingest_external_catalogs, 1, name="news.ingest")
+
+    def warm_up(self, message=None):
+        """ loads the catalog, builds the local keyword matchers and the language table, only once """
+        if self._warm.is_set():
+            return
+        with self._catalog_lock:
+            if self._warm.is_set():
+                return
+            index = self._base_index()
+            self._build_keyword_matchers(index.keywords())
+            self._build_affinity()
+            # compile the expensive parts now, not in the first query
+            index.scorer, index.ngrams
+            self._warm.set()
+
+    def ocp_voc_match(self, utterance, lang=None):
+        """ waits for the keyword matchers if the startup was deferred and they are not built yet """
+        self.warm_up()
+        return super().ocp_voc_match(utterance, lang)
+
+    @property
+    def max_results(self) -> Optional[int]:
+        """ maximum number of search results, None if all relevant stations are returned """
+        return self.settings.get("max_results", 25) or None
+
+    def _configure_cache(self):
+        self.search_cache.maxsize = self.settings.get("search_cache_size", 128)
+        self.search_cache.ttl = self.settings.get("search_cache_ttl", 900)
+
+    def _configure_resolver(self):
+        """ (de)activates background resolution of the latest episode of likely stations """
+        self.cancel_scheduled_event("news.preresolve")
+        if not self.settings.get("preresolve_streams", False):
+            if self.resolver is not None:
+                self.resolver.shutdown()
+                self.resolver = None
+            return
+        ttl = self.settings.get("preresolve_ttl", 1800)
+        if self.resolver is None:
+            self.resolver = StreamResolver(ttl=ttl)
+        self.resolver.cache.ttl = ttl
+        self.schedule_repeating_event(self.preresolve_streams, None,
+                                      self.settings.get("preresolve_interval", 900),
+                                      name="news.preresolve")
+
+    def _configure_health_check(self):
+        """ loads the persisted station health and schedules probes, never blocks on the network """
+        self.cancel_scheduled_event("news.health_check")
+        if not self.settings.get("health_check", False):
+            if self.health is not None:
+                self.health.shutdown()
+                self.health = None
+            return
+        if self.health is None:
+            self.health = HealthChecker(join(self.file_system.path, "station_health.json"),
+                                        timeout=self.settings.get("health_check_timeout", 5))
+        # first round shortly after startup, results of previous runs are used until then
+        self.schedule_repeating_event(self.check_station_health, 60,
+                                      self.settings.get("health_check_interval", 3600),
+                                      name="news.health_check")
+
+    def _configure_catalog_watch(self):
+        """ periodically checks if News.json was modified, 0 disables the watcher """
+        self.cancel_scheduled_event("news.catalog_watch")
+        interval = self.settings.get("catalog_watch_interval", 60)
+        if interval:
+            self.schedule_repeating_event(self.reload_catalog, None, interval,
+                                          name="news.catalog_watch")
+
+    def _configure_bulletins(self):
+        """ (de)activates the scheduled download of the latest episodes, for playback without streaming """
+        for name in self._bulletin_events:
+            self.cancel_scheduled_event(name)
+        self._bulletin_events = []
+        if not self.settings.get("offline_bulletins", False):
+            if self.bulletins is not None:
+                self.bulletins.shutdown()
+                self.bulletins = None
+            return
+        quota = int(self.settings.get("offline_quota_mb", 200) * 1024 * 1024)
+        ttl = self.settings.get("offline_ttl", 3600)
+        if self.bulletins is None:
+            self.bulletins = BulletinCache(join(self.file_system.path, "bulletins"), StreamResolver(),
+                                           quota=quota, ttl=ttl)
+        self.bulletins.quota = quota
+        self.bulletins.ttl = ttl
+        # shortly after startup, then every day before the usual briefings
+        self.schedule_event(self.download_bulletins, 60, name="news.offline")
+        self._bulletin_events.append("news.offline")
+        now = now_local()
+        for idx, hhmm in enumerate(self.settings.get("offline_download_times") or []):
+            try:
+                hour, minute = (int(x) for x in hhmm.split(":"))
+                when = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            except ValueError:
+                self.log.error(f"Invalid offline_download_times entry: {hhmm!r}, expected HH:MM")
+                continue
+            if when <= now:
+                when += timedelta(days=1)
+            name = f"news.offline.{idx}"
+            self.schedule_repeating_event(self.download_bulletins, when, 24 * 3600, name=name)
+            self._bulletin_events.append(name)
+
+    def _configure_briefing(self):
+        """ (de)activates the briefing mode of "play the news", several stations played back to back """
+        if not self.settings.get("briefing", False):
+            if self.briefing is not None:
+                self.briefing.shutdown()
+                self.briefing = None
+            return
+        quota = int(self.settings.get("briefing_buffer_mb", 50) * 1024 * 1024)
+        if self.briefing is None:
+            cache = BulletinCache(join(self.file_system.path, "briefing"), StreamResolver(),
+                                  quota=quota, ttl=self.settings.get("briefing_ttl", 1800))
+            self.briefing = BriefingPlayer(cache, partial(self._station2entry, match_confidence=100),
+                                           self._queue_entry)
+        self.briefing.cache.quota = quota
+        self.briefing.cache.ttl = self.settings.get("briefing_ttl", 1800)
+        self.briefing.depth = max(1, self.settings.get("briefing_prefetch", 1))
+
+    def _configure_artwork(self):
+        """ (de)activates the thumbnail cache of the station images shown by the OCP GUI """
+        self.cancel_scheduled_event("news.artwork")
+        # featured entries may point to the previous thumbnails
+        self.featured.clear()
+        if not self.settings.get("artwork_cache", False):
+            if self.artwork is not None:
+                self.artwork.shutdown()
+                self.artwork = None
+            return
+        quota = int(self.settings.get("artwork_quota_mb", 20) * 1024 * 1024)
+        ttl = self.settings.get("artwork_ttl", 7 * 24 * 3600)
+        if self.artwork is None:
+            self.artwork = ArtworkCache(join(self.file_system.path, "artwork"), quota=quota, ttl=ttl)
+        self.artwork.quota = quota
+        self.artwork.ttl = ttl
+        # remote images are revalidated once they are older than the ttl
+        self.schedule_repeating_event(self.prepare_artwork, 30, min(ttl, 24 * 3600), name="news.artwork")
+
+    def on_settings_changed(self):
+        """ cached results may depend on any setting (eg. default_feed) """
+        self._configure_cache()
+        self._configure_resolver()
+        self._configure_health_check()
+        self._configure_catalog_watch()
+        self._configure_bulletins()
+        self._configure_briefing()
+        self._configure_artwork()
+        self._build_affinity()
+        self.metrics.enabled = self.settings.get("metrics", False)
+        self.search_cache.clear()
+
+    def handle_ocp_play(self, message):
+        """ keeps track of recently played stations, they are pre-resolved in the background """
+        media = message.data.get("media") or {}
+        if not isinstance(media, dict):
+            media = media.as_dict
+        uri = media.get("uri")
+        if media.get("extractor_id"):
+            uri = f"{media['extractor_id']}//{media.get('stream')}"
+        if uri and uri not in self._recent_uris:
+            self._recent_uris.append(uri)
+        if self.briefing is not None and self.briefing.active and not self.briefing.owns(uri):
+            # something else is playing now, stop queueing bulletins
+            self.briefing.stop()
+
+    def handle_media_state(self, message):
+        """ a bulletin of the briefing ended, the next ones are buffered """
+        if self.briefing is not None and message.data.get("state") == MediaState.END_OF_MEDIA:
+            self.briefing.advance()
+
+    def handle_ocp_stop(self, message):
+        if self.briefing is not None:
+            self.briefing.stop()
+
+    def _queue_entry(self, entry: Union[PluginStream, MediaEntry], message: Optional[Message] = None):
+        """ appends an entry to the OCP playlist that is playing, in the session of message """
+        self.audio_service.queue([entry], source_message=message)
+
+    def briefing_stations(self, utterance: str, langs=None) -> List[NewsStation]:
+        """
+        The stations of a briefing, in playback order
+
+        The best "briefing_local" local news stations then the best "briefing_world" world news
+        stations, chosen by the language and country scoring of "play the news".
+        """
+        stations = []
+        for setting, default, tier in (("briefing_local", 2, {"local_only": True}),
+                                       ("briefing_world", 1, {"world_only": True})):
+            count = self.settings.get(setting, default)
+            if count:
+                scored = self._score_stations(utterance, langs=langs, base_score=30, limit=count,
+                                              operation="briefing", **tier)
+                stations += [station for station, _ in scored]
+        return list(dict.fromkeys(stations))
+
+    def _preresolve_candidates(self) -> List[NewsStation]:
+        """ default feeds, native language stations and recently played stations, in that order """
+        max_stations = self.settings.get("preresolve_max_stations", 10)
+        native_langs = [standardize_lang_tag(l) for l in self.native_langs]
+        stations = list(self.stations)
+        candidates = [s for s in stations if s.is_default and s.lang in native_langs]
+        candidates += [s for s in stations if s.uri in self._recent_uris]
+        candidates += [s for s in stations if s.lang in native_langs]
+        unique = []
+        for station in candidates:
+            if station.extractor_id and station not in unique:
+                unique.append(station)
+        return unique[:max_stations]
+
+    def preresolve_streams(self, message=None):
+        """ resolves the latest episode of the stations the user is likely to ask for """
+        if self.resolver is None:
+            return
+        changed = self.resolver.refresh(self._preresolve_candidates())
+        if changed:
+            # cached results may contain the previous (unresolved) entries
+            self.search_cache.clear()
+
+    def _bulletin_candidates(self) -> List[NewsStation]:
+        """ default feeds of the native languages and the "offline_stations", in that order """
+        native_langs = [standardize_lang_tag(l) for l in self.native_langs]
+        wanted = set(self.settings.get("offline_stations") or [])
+        stations = self.stations
+        candidates = [s for s in stations if s.is_default and s.lang in native_langs]
+        candidates += [s for s in stations if s.feed in wanted or s.title in wanted]
+        return [s for s in dict.fromkeys(candidates) if s.extractor_id]
+
+    def download_bulletins(self, message=None):
+        """ downloads the latest episode of the likely stations, evicting old files over the quota """
+        if self.bulletins is None:
+            return
+        changed = self.bulletins.refresh(self._bulletin_candidates())
+        if changed:
+            # cached results may point to streams or evicted files
+            self.search_cache.clear()
+
+    def prepare_artwork(self, message=None):
+        """ scales the station images into thumbnails, downloading or revalidating remote images """
+        if self.artwork is None:
+            return
+        changed = self.artwork.refresh(s.image for s in self.stations)
+        if changed:
+            # cached results and featured entries may point to the full size images
+            self.search_cache.clear()
+            self.featured.clear()
+
+    def _station_image(self, station: NewsStation) -> str:
+        """ the cached thumbnail of the station image if there is one, the image itself otherwise """
+        if self.artwork is None or not station.image:
+            return station.image
+        return self.artwork.get(station.image, self.settings.get("artwork_size", 256)) or station.image
+
+    def check_station_health(self, message=None):
+        """ probes every station, unreachable stations are down-ranked or excluded from results """
+        if self.health is None:
+            return
+        changed = self.health.check(self.stations)
+        if changed:
+            self.log.info(f"Station health changed: {[s.title for s in changed]}")
+            self.search_cache.clear()
+
+    def ingest_external_catalogs(self, message=None):
+        """ merges the stations of the "external_catalogs" files (JSONL or CSV) into the index """
+        for path in self.settings.get("external_catalogs") or []:
+            try:
+                self.ingest_catalog(path)
+            except (OSError, ValueError) as e:
+                self.log.error(f"Failed to ingest station catalog {path}: {e}")
+
+    def ingest_catalog(self, source, fmt: Optional[str] = None, batch_size: Optional[int] = None) -> IngestStats:
+        """
+        Streams an external station catalog into the station index and the OCP keywords, in batches
+
+        Args:
+            source: Path or text file object of a JSONL or CSV catalog
+            fmt: "jsonl" or "csv", guessed from the file extension if not given
+            batch_size: Stations added at once, bounds the memory used while parsing
+
+        Returns:
+            Ingestion counters
+        """
+        known = {(s.lang, s.uri) for s in self._extra_stations}
+        catalog = CatalogSource(source, fmt,
+                                batch_size=batch_size or self.settings.get("ingest_batch_size", 1000),
+                                default_bg=self.default_bg, known=known)
+        added = []
+        for batch in catalog:
+            added += batch
+        if added:
+            with self._catalog_lock:
+                # the language groups are rebuilt once per catalog, not once per batch
+                old = self._base_index()
+                self._extra_stations += added
+                self._stations = old.extend(added)
+                # matchers are swapped once, never modified while queries use them
+                self._update_keywords(old, self._stations)
+            self.search_cache.clear()
+        self.log.info(f"Ingested station catalog {catalog.source}: {catalog.stats}")
+        return catalog.stats
+
+    def _announce_keywords(self, samples: Optional[List[str]] = None):
+        """ sends news_provider keywords to OCP at once as a csv file, all of them unless samples are given """
+        csv_path = f"{self.ocp_cache_dir}/{self.skill_id}_news_provider.csv"
+        if samples is None:
+            self.export_ocp_keywords_csv(csv_path, label="news_provider")
+        else:
+            with open(csv_path, "w") as f:
+                f.write("label,sample")
+                for sample in samples:
+                    f.write(f"\nnews_provider,{sample}")
+        self.bus.emit(Message("ovos.common_play.register_keyword",
+                              {"skill_id": self.skill_id,
+                               "label": "news_provider",
+                               "csv": csv_path,
+                               "media_type": MediaType.NEWS}))
+
+    def reload_catalog(self, message=None, force: bool = False) -> Optional[CatalogDiff]:
+        """
+        Picks up changes to News.json without restarting the skill
+
+        The new index is built and its scorer compiled while queries keep using the
+        previous one, which is then replaced in a single assignment. Only keywords that
+        were added or removed are sent to OCP.
+
+        Args:
+            force: Reload even if the file modification time did not change
+
+        Returns:
+            The stations that changed, None if the catalog was not modified
+        """
+        with self._catalog_lock:
+            old = self._base_index()
+            if not force and getmtime(self.archive_path) == old.key[0]:
+                return None
+            loaded = self._load_index(key=(getmtime(self.archive_path), old.key[1]))
+            new = loaded.extend(self._extra_stations) if self._extra_stations else loaded
+            diff = old.diff(new)
+            if not diff:
+                # same stations (eg. the file was touched), keep the compiled scorer
+                self._stations = old.with_defaults(old.default_feeds, key=new.key)
+                # the catalog opened for the comparison is not used by any query
+                loaded.close()
+                return diff
+            # compile the expensive parts now, not in the first query after the swap
+            new.scorer, new.ngrams
+            self._stations = new
+            self.search_cache.clear()
+            self._update_keywords(old, new)
+        self.log.info(f"Reloaded station catalog: {diff.summary()}")
+        return diff
+
+    def _update_keywords(self, old: StationIndex, new: StationIndex):
+        """ swaps in matchers with the news_provider keywords of the new index, OCP is only sent the changes """
+        keywords = new.keywords()
+        previous = set(old.keywords())
+        added = [k for k in keywords if k not in previous]
+        removed = previous.difference(keywords)
+        self._build_keyword_matchers(keywords)
+        if removed:
+            # OCP can't forget single keywords, the label is registered again
+            self.bus.emit(Message("ovos.common_play.deregister_keyword",
+                                  {"skill_id": self.skill_id,
+                                   "label": "news_provider",
+                                   "media_type": MediaType.NEWS}))
+            self._announce_keywords()
+        elif len(added) >= 20:
+            # bus messages with thousands of samples don't work well
+            self._announce_keywords(added)
+        elif added:
+            self.bus.emit(Message("ovos.common_play.register_keyword",
+                                  {"skill_id": self.skill_id,
+                                   "label": "news_provider",
+                                   "samples": added,
+                                   "media_type": MediaType.NEWS}))
+
+    def _build_keyword_matchers(self, keywords: List[str]):
+        """ swaps in local matchers of the news_provider keywords, OCP is not notified """
+        # heavy import (nltk), only needed once the catalog is loaded
+        from ovos_classifiers.skovos.features import KeywordFeatures
+        for lang in self.native_langs:
+            matcher = KeywordFeatures()
+            matcher.register_entity("news_provider", keywords)
+            list(matcher.match(""))  # builds the automaton before it is shared with queries
+            self.ocp_matchers[lang] = matcher
+
+    def handle_reload_catalog(self, message):
+        """ reloads News.json, even if it was not modified when "force" is set """
+        try:
+            diff = self.reload_catalog(force=message.data.get("force", False))
+            self.bus.emit(message.response(diff.summary() if diff is not None else {"modified": False}))
+        except (OSError, ValueError) as e:
+            self.bus.emit(message.response({"error": str(e)}))
+
+    def handle_ingest_catalog(self, message):
+        """ ingests the station catalog file given in the message "path" """
+        try:
+            stats = self.ingest_catalog(message.data["path"], message.data.get("format"),
+                                        message.data.get("batch_size"))
+            self.bus.emit(message.response(asdict(stats)))
+        except (KeyError, OSError, ValueError) as e:
+            self.bus.emit(message.response({"error": str(e)}))
+
+    def handle_metrics(self, message):
+        """ reports the per stage query metrics, as json and in the Prometheus text format """
+        self.bus.emit(message.response({"enabled": self.metrics.enabled,
+                                        "metrics": self.metrics.snapshot(),
+                                        "prometheus": self.metrics.prometheus()}))
+        if message.data.get("reset"):
+            self.metrics.reset()
+
+    def handle_cache_stats(self, message):
+        """ reports the search cache hit/miss counters, and the feed refresh counters if streams are pre-resolved """
+        stats = dict(self.search_cache.stats)
+        if self.resolver is not None:
+            stats["feeds"] = self.resolver.feeds.stats
+        self.bus.emit(message.response(stats))
+
+    def _cache_key(self, *args, langs=None) -> tuple:
+        """
+        Builds a search cache key from the query arguments and the context that influences ranking.
+
+        The cache is invalidated if the user location changes.
+        """
+        index = self.stations
+        country = self.location["city"]["state"]["country"]["code"]
+        if country != self._cache_country:
+            self.search_cache.clear()
+            self._cache_country = country
+        return args + (tuple(sorted(langs or [])), tuple(sorted(self.native_langs)), country,
+                       index.default_feeds.get(self.lang), self.lang, index.key)
+
+    @staticmethod
+    def _copy_results(results: list) -> list:
+        """ OCP modifies returned entries (eg. match_confidence), cached entries must never be shared """
+        return [copy_entry(r) for r in results]
+
+    def _default_feeds(self) -> Dict[str, str]:
+        """
+        Resolves the default news feed for each catalog language.
+
+        The "default_feed" setting overrides the built-in default for the skill language.
+
+        Returns:
+            A dictionary mapping standardized language tags to a feed name.
+        """
+        feeds = {}
+        for lang in self._catalog_langs:
+            std_lang = standardize_lang_tag(lang)
+            default_feed = self.langdefaults.get(lang)
+            if std_lang == self.lang:
+                default_feed = self.settings.get("default_feed") or default_feed
+            if default_feed:
+                feeds[std_lang] = default_feed
+        return feeds
+
+    @property
+    def archive(self) -> JsonStorage:
+        """ the News.json catalog, only loaded if there is no up to date compiled catalog """
+        if self._archive is None:
+            self._archive = JsonStorage(self.archive_path)
+        return self._archive
+
+    def _compiled_catalog(self) -> Optional[CompiledCatalog]:
+        """ the compiled catalog of News.json, (re)compiled if missing or out of date, None if it can not be written """
+        path = self.compiled_path or join(self.file_system.path, "News.catalog")
+        catalog = CompiledCatalog.open_fresh(path, self.archive_path)
+        if catalog is None:
+            try:
+                compile_catalog(self.archive_path, path)
+                catalog = CompiledCatalog(path)
+            except (OSError, ValueError) as e:
+                self.log.warning(f"Failed to compile the station catalog into {path}: {e}")
+                return None
+        return catalog
+
+    def _load_index(self, key: tuple) -> StationIndex:
+        """ compiles the station index, memory mapping the compiled catalog when possible """
+        catalog = self._compiled_catalog()
+        if catalog is not None:
+            self._catalog_langs = catalog.raw_langs
+            return CompiledStationIndex(catalog, self._default_feeds(),
+                                        default_bg=self.default_bg, key=key)
+        if self._archive is not None:
+            self._archive.reload()
+        self._catalog_langs = list(self.archive)
+        return StationIndex.from_archive(self.archive, self._default_feeds(),
+                                         default_bg=self.default_bg, key=key)
+
+    def _build_index(self, default_key: tuple) -> StationIndex:
+        """ a new index of the current News.json (or compiled catalog) and the ingested stations """
+        index = self._load_index(key=(getmtime(self.archive_path), default_key))
+        if self._extra_stations:
+            index = index.extend(self._extra_stations)
+        return index
+
+    def _base_index(self) -> StationIndex:
+        """ the loaded station index, before the default feeds of the current language are applied """
+        index = self._stations
+        if index is None:
+            with self._catalog_lock:
+                if self._stations is None:
+                    self._stations = self._build_index((self.settings.get("default_feed"), self.lang))
+                index = self._stations
+        return index
+
+    @property
+    def stations(self) -> StationIndex:
+        """
+        The station index snapshot of the current query, never modified.
+
+        The catalog is loaded on first use, modifications of News.json are applied by
+        reload_catalog. Sessions with a different language (or "default_feed" setting)
+        get their own index sharing the compiled records, concurrent queries never
+        replace each other's index.
+        """
+        default_key = (self.settings.get("default_feed"), self.lang)
+        index = self._base_index()
+        if index.key[1] == default_key:
+            return index
+        base, variants = self._variants
+        if base is not index:
+            variants = {}
+            self._variants = (index, variants)
+        variant = variants.get(default_key)
+        if variant is None:
+            variant = variants[default_key] = index.with_defaults(self._default_feeds(),
+                                                                  key=(index.key[0], default_key))
+        return variant
+
+    def locale_bundle(self, lang: Optional[str] = None) -> Optional[LocaleBundle]:
+        """ the compiled resources of a language, None if the locale files must be read instead """
+        lang = standardize_lang_tag(lang or self.lang)
+        if lang not in self._locale_bundles:
+            locale_dir = join(self.res_dir, "locale")
+            folders = listdir(locale_dir) if isdir(locale_dir) else []
+            folder = next((f for f in folders if f.lower() == lang.lower()), None)
+            self._locale_bundles[lang] = LocaleBundle.open_fresh(join(locale_dir, folder)) if folder else None
+        return self._locale_bundles[lang]
+
+    def voc_list(self, voc_filename: str, lang: Optional[str] = None) -> List[str]:
+        """ vocabulary samples from the locale bundle, read from the .voc file if not bundled """
+        bundle = self.locale_bundle(lang)
+        if bundle is not None and voc_filename in bundle.vocabs:
+            return bundle.vocabs[voc_filename]
+        return super().voc_list(voc_filename, lang)
+
+    def _vocab_matcher(self, lang: Optional[str] = None) -> VocabMatcher:
+        """ all language and news vocabularies of a language, compiled once """
+        lang = standardize_lang_tag(lang or self.lang)
+        if lang not in self._vocab_matchers:
+            vocabs = {}
+            for voc in ["world_news", "news"] + list(self.lang_vocs):
+                try:
+                    vocabs[voc] = self.voc_list(voc, lang)
+                except FileNotFoundError:
+                    self.log.warning(f"{self.skill_id} failed to find voc file '{voc}' for lang '{lang}'")
+            self._vocab_matchers[lang] = VocabMatcher(vocabs)
+        return self._vocab_matchers[lang]
+
+    def parse_phrase(self, phrase: str) -> VocabMatch:
+        """
+        Matches all language, news and world_news vocabularies in a single pass over the phrase.
+
+        Args:
+            phrase: The user utterance.
+
+        Returns:
+            The names of the matched vocabularies and the phrase with all of them removed.
+        """
+        return self._vocab_matcher().match(phrase)
 
     def clean_phrase(self, phrase: str) -> str:
-        phrase = self.remove_voc(phrase, "world_news")
-        phrase = self.remove_voc(phrase, "news")
-
-        phrase = self.remove_voc(phrase, "pt-pt")
-        phrase = self.remove_voc(phrase, "en-us")
-        phrase = self.remove_voc(phrase, "en-ca")
-        phrase = self.remove_voc(phrase, "en-gb")
-        phrase = self.remove_voc(phrase, "es")
-        phrase = self.remove_voc(phrase, "fi")
-        phrase = self.remove_voc(phrase, "de")
-        phrase = self.remove_voc(phrase, "sv")
-        phrase = self.remove_voc(phrase, "nl")
-        phrase = self.remove_voc(phrase, "en")
-
-        return phrase.strip()
-
-    def match_lang(self, phrase: str) -> List[str]:
-        langs = []
-        if self.voc_match(phrase, "pt-pt"):
-            langs.append("pt-pt")
-        if self.voc_match(phrase, "en-us"):
-            langs.append("en-us")
-        if self.voc_match(phrase, "en-gb"):
-            langs.append("en-gb")
-        if self.voc_match(phrase, "en-ca"):
-            langs.append("en-ca")
-        if self.voc_match(phrase, "en"):
-            langs.append("en")
-        if self.voc_match(phrase, "es"):
-            langs.append("es-es")
-        if self.voc_match(phrase, "de"):
-            langs.append("de-de")
-        if self.voc_match(phrase, "nl"):
-            langs.append("nl-nl")
-        if self.voc_match(phrase, "fi"):
-            langs.append("fi-fi")
-        if self.voc_match(phrase, "sv"):
-            langs.append("sv-se")
-        langs = [standardize_lang_tag(l, macro=True) for l in langs]
+        return self.parse_phrase(phrase).phrase
+
+    def match_lang(self, phrase: Union[str, VocabMatch]) -> List[str]:
+        if not isinstance(phrase, VocabMatch):
+            phrase = self.parse_phrase(phrase)
+        langs = [standardize_lang_tag(self.lang_vocs[voc], macro=True)
+                 for voc in phrase.vocs if voc in self.lang_vocs]
         return list(set(langs))
 
-    def _score(self, phrase, entry, langs=None, base_score=0):
+    def _score(self, phrase, entry: NewsStation, langs=None, base_score=0):
         # self.log.debug(f"### {entry}")
         """
-        Calculates a relevance score for a news entry based on a search phrase and language preferences.
+        Calculates a relevance score for a news station based on a search phrase and language preferences.
         
-        The score is determined by fuzzy matching the phrase to the entry's aliases or title, language matches (including explicit requests and native preferences), country code alignment, and whether the entry is marked as a default news feed. The final score is capped at 100.
+        The score is determined by fuzzy matching the phrase to the station's aliases or title, language matches (including explicit requests and native preferences), country code alignment, and whether the station is marked as a default news feed. The final score is capped at 100.
         
         Args:
             phrase: The user search phrase.
-            entry: The news entry dictionary to score.
+            entry: The precompiled news station to score.
             langs: Optional list of requested language codes. If not provided, native languages are used.
             base_score: Optional initial score to start from.
         
         Returns:
             A float representing the match confidence score, capped at 100.
         """
-        score = base_score
         target_langs = langs or self.native_langs
-        # self.log.debug(f"\t- base score: {score}")
+        country = self.location["city"]["state"]["country"]["code"]
+        return score_station(phrase, entry, target_langs, explicit_langs=bool(langs),
+                             country=country, base_score=base_score)
 
-        # match name
-        _, alias_score = match_one(phrase, entry.get("aliases") or [entry["title"]],
-                                   strategy=MatchStrategy.TOKEN_SORT_RATIO)
-        # self.log.debug(f"\t- fuzzy score: {match_confidence}")
+    def _build_affinity(self) -> LanguageAffinity:
+        """ language distances between the catalog and every language native_langs or match_lang can produce """
+        requestable = list(self.native_langs) + [standardize_lang_tag(lang, macro=True)
+                                                 for lang in self.lang_vocs.values()]
+        self._affinity = LanguageAffinity(self._base_index().langs, requestable)
+        return self._affinity
 
-        # match languages
-        entry_lang = standardize_lang_tag(entry["lang"])
-        entry_langs = set(standardize_lang_tag(l) for l in entry.get("secondary_langs", []))
-        entry_langs.add(entry_lang)
+    def _allowed_langs(self, langs=None) -> Optional[Sequence[str]]:
+        """ catalog languages close enough to the requested langs, None if all languages are allowed """
+        if not langs:
+            return None
+        affinity = self._affinity
+        if affinity is None or affinity.catalog_langs != tuple(self._base_index().langs):
+            # the catalog was (re)loaded with different language sections
+            affinity = self._build_affinity()
+        return affinity.allowed(langs)
 
-        match_confidence = score + alias_score * 50
+    def _filter_stations(self, world_only=False, local_only=False, langs=None) -> Iterator[NewsStation]:
+        """
+        Iterates the precompiled news stations, filtered by language and news type.
 
-        if langs: # if specific lang was requested
-            if any([lang in target_langs for lang in entry_langs]):
-                match_confidence += 30  # explicitly requested lang match bonus
-            else:
-                match_confidence -= 20  # wrong language penalty
-        elif entry_lang in target_langs:
-            # if no languages explicitly requested, assume user prefers their native lang
-            match_confidence += 10  # known main language bonus
+        Args:
+            world_only: If True, includes only world news feeds.
+            local_only: If True, includes only local news feeds.
+            langs: Optional list of language codes to filter feeds; if not provided all languages are included.
+        """
+        return self.stations.filter(self._allowed_langs(langs),
+                                    world_only=world_only, local_only=local_only)
 
-        # self.log.debug(f"\t- lang score: {match_confidence}")
+    def read_db(self, world_only=False, local_only=False, langs=None) -> List[dict]:
+        """
+        Reads and returns news feed entries from the station index, filtered by language and news type.
+        
+        Args:
+            world_only: If True, includes only world news feeds.
+            local_only: If True, includes only local news feeds.
+            langs: Optional list of language codes to filter feeds; if not provided all languages are included.
+        
+        Returns:
+            A list of new dictionaries representing news feed entries, each enriched with metadata such as language, title, images, playback type, media type, and stream information.
+        """
+        return [station.as_dict(self.skill_icon)
+                for station in self._filter_stations(world_only, local_only, langs)]
 
-        # match country code
-        country = self.location["city"]["state"]["country"]["code"]
-        if any((l.endswith(f"-{country}") for l in entry_langs)):
-            match_confidence += 20  # bonus for news stations from user location
-            # self.log.debug(f"\t- location score: {match_confidence}")
+    def _rank(self, phrase: str, langs=None, base_score=0, world_only=False, local_only=False,
+              world_news: Optional[bool] = None, prune=False, limit: Optional[int] = None,
+              operation: str = "search_news") -> List[Union[PluginStream, MediaEntry]]:
+        """
+        Scores all matching stations in a single batch and converts the relevant ones into OCP entries.
 
-        # default news feed gets a nice bonus
-        if entry.get("is_default"):
-            match_confidence += 10
-            # self.log.debug(f"\t- default station score: {match_confidence}")
+        Takes the same arguments as _score_stations.
 
-        return min([match_confidence, 100])
+        Returns:
+            Entries scoring above 50, in catalog order, or the best `limit` of them sorted by relevance.
+        """
+        scored = self._score_stations(phrase, langs, base_score, world_only, local_only,
+                                      world_news, prune, limit, operation)
+        with self.metrics.stage(operation, "entries"):
+            return [self._station2entry(station, s) for station, s in scored]
 
-    def read_db(self, world_only=False, local_only=False, langs=None) -> List[dict]:
+    def _score_stations(self, phrase: str, langs=None, base_score=0, world_only=False, local_only=False,
+                        world_news: Optional[bool] = None, prune=False, limit: Optional[int] = None,
+                        operation: str = "search_news") -> List[Tuple[NewsStation, float]]:
         """
-        Reads and returns news feed entries from the archive, filtered by language and news type.
-        
+        Scores all matching stations in a single batch.
+
         Args:
+            phrase: The user search phrase.
+            langs: Optional list of requested language codes, also used to filter stations.
+            base_score: Initial score to start from.
             world_only: If True, includes only world news feeds.
             local_only: If True, includes only local news feeds.
-            langs: Optional list of language codes to filter feeds; if not provided, uses native languages.
-        
+            world_news: If not None, stations flagged as world news get a bonus if True, a penalty if False.
+            prune: If True, only stations sharing n-grams with the phrase are scored first,
+                   all stations are scored unless no other station could change the results.
+            limit: If given, only the best `limit` stations are matched and converted into entries.
+            operation: Name the stages are reported under, when metrics are enabled.
+
         Returns:
-            A list of dictionaries representing news feed entries, each enriched with metadata such as language, title, images, playback type, media type, and stream information.
+            (station, score) pairs scoring above 50, in catalog order, or the best `limit` of them sorted by relevance.
         """
+        metrics = self.metrics
+        index = self.stations
+        with metrics.stage(operation, "filter"):
+            allowed_langs = self._allowed_langs(langs)
+        kwargs = dict(explicit_langs=bool(langs),
+                      country=self.location["city"]["state"]["country"]["code"],
+                      base_score=base_score,
+                      allowed_langs=allowed_langs,
+                      world_only=world_only, local_only=local_only,
+                      world_news=world_news)
+        penalties = self.health.penalties(index.stations) if self.health else None
+        stats = {} if metrics.enabled else None
         target_langs = langs or self.native_langs
-        entries = []
-        for lang in self.archive:
-            std_lang = standardize_lang_tag(lang)
-            lang_score = closest_match(std_lang, target_langs)[-1]
-            if lang_score > 10 and langs:
-                self.log.debug(f"Ignoring news streams from foreign language: {std_lang}")
-                continue
-            default_feed = self.langdefaults.get(lang)
-            if std_lang == self.lang:
-                default_feed = self.settings.get("default_feed") or default_feed
-            for feed, config in self.archive[lang].items():
-                if world_only and not config.get("world_news", False):
-                    continue
-                if local_only and config.get("world_news"):
+        with metrics.stage(operation, "candidates"):
+            candidates = index.ngrams.candidates(phrase) if prune else None
+        if limit is None:
+            score = index.scorer.score
+        else:
+            score = partial(index.scorer.top_k, k=limit)
+        with metrics.stage(operation, "score"):
+            for attempt, (subset, penalties) in enumerate(self._scans(candidates, penalties)):
+                if attempt:
+                    metrics.count(operation, "full_scans" if penalties is not None else "unpenalized_scans")
+                scored = score(phrase, target_langs, candidates=subset, penalties=penalties, stats=stats,
+                               threshold=50, **kwargs)
+                if subset is not None and not self._pruned_exact(scored, subset, limit, target_langs,
+                                                                 penalties, **kwargs):
                     continue
-                if feed == default_feed:
-                    config["is_default"] = True
-                config["lang"] = std_lang
-                config["title"] = config.get("title") or feed
-                config["image"] = config.get("image", "").replace("./res/images/",
-                                                                  f"{dirname(__file__)}/res/images/")
-                config["bg_image"] = config.get("bg_image") or self.default_bg
-                config["skill_logo"] = self.skill_icon
-                config["playback"] = PlaybackType.AUDIO
-                config["media_type"] = MediaType.NEWS
-
-                if config["uri"]:
-                    if config["uri"].startswith("news//"):
-                        config["extractor_id"] = "news"
-                        config["stream"] = config["uri"].split("news//")[-1]
-                    elif config["uri"].startswith("rss//"):
-                        config["extractor_id"] = "rss"
-                        config["stream"] = config["uri"].split("rss//")[-1]
-                    elif config["uri"].startswith("youtube.channel.live//"):
-                        config["extractor_id"] = "youtube.channel.live"
-                        config["stream"] = config["uri"].split("youtube.channel.live//")[-1]
-                entries.append(config)
-        return entries
+                if scored:
+                    break
+        if stats is not None:
+            metrics.count(operation, "scanned", stats.get("scanned", 0))
+            metrics.count(operation, "pruned", stats.get("pruned", 0))
+            metrics.count(operation, "above_threshold", len(scored))
+        return scored
+
+    def _pruned_exact(self, scored: List[Tuple[NewsStation, float]], candidates: Sequence[int],
+                      limit: Optional[int], target_langs: Sequence[str], penalties, **filters) -> bool:
+        """
+        True if scoring only the pruned candidates gave the same results as scoring every station
+
+        That is the case when no other station can score above the threshold, or when `limit`
+        results were found and no other station can reach the worst of them (it would tie
+        and could come first in the catalog).
+
+        Args:
+            scored: (station, score) pairs of the candidates
+            candidates: The scored station positions
+            limit: Number of results wanted, None for every relevant station
+            filters: The filters and bonuses of the scan (as in StationScorer.upper_bound)
+        """
+        bound = self.stations.scorer.upper_bound(target_langs, exclude=candidates,
+                                                 penalties=penalties, **filters)
+        if bound <= 50:
+            return True
+        return bool(limit) and len(scored) >= limit and bound < min(s for _, s in scored)
+
+    @staticmethod
+    def _scans(candidates, penalties) -> List[tuple]:
+        """
+        (candidates, penalties) of the scans tried in order until one finds a relevant station
+
+        If no pruned candidate is relevant enough all stations are scanned, if the health
+        penalties exclude every relevant station (eg. the device was offline while probing)
+        the stations are ranked without them, penalties never empty the results.
+        """
+        scans = [(candidates, penalties)]
+        if candidates is not None:
+            scans.append((None, penalties))
+        if penalties is not None:
+            scans += [(subset, None) for subset, _ in scans]
+        return scans
+
+    def _station2entry(self, station: NewsStation, match_confidence: float) -> Union[PluginStream, MediaEntry]:
+        bulletin = self.bulletins.get(station) if self.bulletins else None
+        resolved = self.resolver.get(station) if self.resolver else None
+        image = self._station_image(station)
+        if bulletin is not None:
+            # downloaded ahead of time, plays without waiting for the network
+            return station.entry(match_confidence, uri=f"file://{bulletin.path}", image=image)
+        if resolved is not None:
+            # latest episode already known, OCP does not need to extract the stream
+            return station.entry(match_confidence, uri=resolved.uri, image=image)
+        return station.entry(match_confidence, image=image)
 
     @ocp_featured_media()
     def news_playlist(self) -> Playlist:
         """
         Creates a playlist containing the latest news streams from all configured providers.
+
+        Entries are cached per station, only stations that changed in the catalog get a new entry.
         
         Returns:
             Playlist: A playlist of news streams, with each entry represented as a PluginStream
             or MediaEntry depending on the URI scheme.
         """
-        entries = Playlist(title="Latest News (Station Playlist)")
-        for config in self.read_db():
-            if config["uri"].startswith("rss//"):
-                entries.append(PluginStream(
-                    extractor_id="rss",
-                    stream=config["uri"].split("rss//")[-1],
-                    title=config.get("title"),
-                    image=config.get("image"),
-                    media_type=MediaType.NEWS,
-                    playback=PlaybackType.AUDIO,
-                    skill_icon=self.skill_icon,
-                    skill_id=self.skill_id)
-                )
-            elif config["uri"].startswith("news//"):
-                entries.append(PluginStream(
-                    extractor_id="news",
-                    stream=config["uri"].split("news//")[-1],
-                    title=config.get("title"),
-                    image=config.get("image"),
-                    media_type=MediaType.NEWS,
-                    playback=PlaybackType.AUDIO,
-                    skill_icon=self.skill_icon,
-                    skill_id=self.skill_id)
-                )
-            else:
-                entries.append(MediaEntry(
-                    uri=config["uri"],
-                    title=config.get("title"),
-                    image=config.get("image"),
-                    media_type=MediaType.NEWS,
-                    playback=PlaybackType.AUDIO,
-                    skill_icon=self.skill_icon,
-                    skill_id=self.skill_id)
-                )
-        return entries
+        stations = self.stations.stations
+        self.featured.update(stations)
+        return self.featured.playlist(stations)
+
+    def _station2featured(self, station: NewsStation) -> Union[PluginStream, MediaEntry]:
+        if station.extractor_id in ("rss", "news"):
+            return PluginStream(
+                extractor_id=station.extractor_id,
+                stream=station.stream,
+                title=station.title,
+                image=self._station_image(station),
+                media_type=MediaType.NEWS,
+                playback=PlaybackType.AUDIO,
+                skill_icon=self.skill_icon,
+                skill_id=self.skill_id)
+        return MediaEntry(
+            uri=station.uri,
+            title=station.title,
+            image=self._station_image(station),
+            media_type=MediaType.NEWS,
+            playback=PlaybackType.AUDIO,
+            skill_icon=self.skill_icon,
+            skill_id=self.skill_id)
+
+    def handle_featured_page(self, message):
+        """ pages through the featured playlist without building all of it """
+        page = message.data.get("page", 0)
+        page_size = message.data.get("page_size", 20)
+        stations = self.stations.stations
+        self.featured.update(stations)
+        entries = self.featured.page(page, page_size, stations)
+        self.bus.emit(message.response({"page": page,
+                                        "page_size": page_size,
+                                        "total": len(stations),
+                                        "entries": [e.as_dict for e in entries]}))
 
     @ocp_search()  # generic "play" handler
     def search_news(self, phrase, media_type) -> Iterable[Union[Playlist, MediaType, PluginStream]]:
@@ -249,6 +958,8 @@ class NewsSkill(OVOSCommonPlaybackSkill):
         Searches for news streams matching the user's phrase and requested media type.
         
         Analyzes the input phrase to detect news-related keywords, provider entities, and language preferences. Filters and scores news entries from the database based on relevance to the phrase, requested languages, and whether world news is specified. Returns a sorted list of matching news streams or playlists, each with associated metadata and confidence score.
+
+        With the "stream_results" setting the results are yielded one by one, see iter_search_news.
         
         Args:
             phrase: The user's spoken or typed request.
@@ -257,13 +968,42 @@ class NewsSkill(OVOSCommonPlaybackSkill):
         Returns:
             An iterable of news stream entries or playlists, sorted by match confidence.
         """
-        world_news = self.voc_match(phrase, "world_news")
+        if self.settings.get("stream_results", False):
+            return self.iter_search_news(phrase, media_type)
+        with self.metrics.stage("search_news", "total"):
+            return self._search_news(phrase, media_type)
+
+    def _plan_search(self, phrase, media_type) -> Tuple[tuple, Optional[list], Optional[dict], bool]:
+        """
+        Parses a search phrase
+
+        Returns:
+            (cache key, cached results or None, _rank arguments or None if stations are not searched,
+             True if the featured playlist is a result)
+        """
+        metrics = self.metrics
+        metrics.count("search_news", "queries")
+        phrase = " ".join(phrase.split())
+        with metrics.stage("search_news", "parse"):
+            parsed = self.parse_phrase(phrase)
+        with metrics.stage("search_news", "match_lang"):
+            langs = self.match_lang(parsed) or self.native_langs
+        with metrics.stage("search_news", "cache"):
+            cache_key = self._cache_key("search", phrase, media_type, langs=langs)
+            cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            metrics.count("search_news", "cache_hits")
+            return cache_key, cached, None, False
+        metrics.count("search_news", "cache_misses")
+
+        world_news = "world_news" in parsed.vocs
         base_score = 50 if world_news else 0
 
-        entities = self.ocp_voc_match(phrase)
+        with metrics.stage("search_news", "ocp_voc_match"):
+            entities = self.ocp_voc_match(phrase)
         base_score += 20 * len(entities)
 
-        if self.voc_match(phrase, "news"):
+        if "news" in parsed.vocs:
             media_type = MediaType.NEWS
             base_score += 20
         elif media_type == MediaType.NEWS:
@@ -272,34 +1012,133 @@ class NewsSkill(OVOSCommonPlaybackSkill):
                 base_score += 20  # "play the news", no query
 
         # score individual results
-        langs = self.match_lang(phrase) or self.native_langs
         if entities:
             phrase = entities["news_provider"]
         else:
-            phrase = self.clean_phrase(phrase)
-
-        results = []
+            phrase = parsed.phrase
 
+        rank = None
         if entities or media_type == MediaType.NEWS or world_news:
-            for v in self.read_db(world_only=world_news, langs=langs):
-                s = self._score(phrase, v, langs=langs, base_score=base_score)
-                if v.get("world_news"): # station flagged specifically as international
-                    if world_news:
-                        s += 10
-                    else:
-                        s -= 10
-                if s <= 50:
-                    continue
-                v = dict2entry(v)
-                v.match_confidence = min(100, s)
-                results.append(v)
-
+            # stations flagged specifically as international get a bonus/penalty
+            rank = dict(phrase=phrase, langs=langs, base_score=base_score,
+                        world_only=world_news, world_news=bool(world_news),
+                        prune=self.settings.get("prune_candidates", False),
+                        limit=self.max_results, exact=bool(entities))
         # default playlist result
-        if not langs and not world_news and (media_type == MediaType.NEWS or base_score >= 60):
-            pl = self.news_playlist()
+        playlist = not langs and not world_news and (media_type == MediaType.NEWS or base_score >= 60)
+        return cache_key, None, rank, playlist
+
+    def _search_news(self, phrase, media_type) -> List[Union[Playlist, MediaType, PluginStream]]:
+        metrics = self.metrics
+        cache_key, cached, rank, playlist = self._plan_search(phrase, media_type)
+        if cached is not None:
+            return self._copy_results(cached)
+
+        results = []
+        if rank is not None:
+            rank.pop("exact")
+            results += self._rank(**rank)
+        if playlist:
+            with metrics.stage("search_news", "playlist"):
+                pl = self.news_playlist()
             if pl:
                 results.append(pl)
-        return sorted(results, key=lambda k: k.match_confidence, reverse=True)
+        with metrics.stage("search_news", "sort"):
+            results = sorted(results, key=lambda k: k.match_confidence, reverse=True)[:self.max_results]
+        metrics.count("search_news", "results", len(results))
+        self.search_cache.put(cache_key, results)
+        with metrics.stage("search_news", "copy"):
+            return self._copy_results(results)
+
+    def iter_search_news(self, phrase, media_type) -> Iterator[Union[Playlist, MediaType, PluginStream]]:
+        """
+        Streaming version of search_news, yields every result as soon as its position is final.
+
+        When the phrase names a news provider the stations known by that exact name are matched
+        first, then the other stations in descending order of the best score they could reach,
+        so a consumer that only needs the best result can stop after the first one.
+        Consumed completely, the results are the same, in the same order, as search_news
+        and they are cached the same way.
+        """
+        metrics = self.metrics
+        cache_key, cached, rank, playlist = self._plan_search(phrase, media_type)
+        if cached is not None:
+            yield from self._copy_results(cached)
+            return
+
+        pl = None
+        if playlist:
+            with metrics.stage("search_news", "playlist"):
+                pl = self.news_playlist() or None
+        results = []
+        for entry in (self._iter_rank(**rank) if rank is not None else ()):
+            if pl is not None and pl.match_confidence > entry.match_confidence:
+                # a stable sort keeps the playlist after the entries it ties with
+                results.append(pl)
+                yield copy_entry(pl)
+                pl = None
+                if len(results) == self.max_results:
+                    break
+            results.append(entry)
+            yield copy_entry(entry)
+            if len(results) == self.max_results:
+                break
+        if pl is not None and len(results) != self.max_results:
+            results.append(pl)
+            yield copy_entry(pl)
+        metrics.count("search_news", "results", len(results))
+        self.search_cache.put(cache_key, results)
+
+    def _iter_rank(self, phrase: str, langs=None, base_score=0, world_only=False, world_news: Optional[bool] = None,
+                   prune=False, limit: Optional[int] = None, exact=False) -> Iterator[Union[PluginStream, MediaEntry]]:
+        """
+        Streaming version of _rank, entries are yielded best first as soon as they are final
+
+        Args:
+            exact: If True, the stations with an alias identical to phrase are matched first
+            (all other arguments as in _score_stations)
+        """
+        index = self.stations
+        scorer = index.scorer
+        kwargs = dict(explicit_langs=bool(langs),
+                      country=self.location["city"]["state"]["country"]["code"],
+                      base_score=base_score,
+                      allowed_langs=self._allowed_langs(langs),
+                      world_only=world_only, world_news=world_news, threshold=50,
+                      first=scorer.exact_matches(phrase) if exact else None,
+                      # without a limit search_news orders every relevant station by match confidence
+                      k=limit or len(index), cap=None if limit else 100)
+        target_langs = langs or self.native_langs
+        candidates = index.ngrams.candidates(phrase) if prune else None
+        penalties = self.health.penalties(index.stations) if self.health else None
+        for subset, penalties in self._scans(candidates, penalties):
+            results = scorer.iter_top(phrase, target_langs, candidates=subset, penalties=penalties, **kwargs)
+            if subset is not None:
+                # pruned results are only final once no other station can change them
+                results = list(results)
+                if not self._pruned_exact(results, subset, limit, target_langs, penalties,
+                                          explicit_langs=kwargs["explicit_langs"], country=kwargs["country"],
+                                          base_score=base_score, allowed_langs=kwargs["allowed_langs"],
+                                          world_only=world_only, world_news=world_news):
+                    continue
+            found = False
+            for station, score in results:
+                found = True
+                yield self._station2entry(station, score)
+            if found:
+                return
+
+    def shutdown(self):
+        if self.resolver is not None:
+            self.resolver.shutdown()
+        if self.health is not None:
+            self.health.shutdown()
+        if self.bulletins is not None:
+            self.bulletins.shutdown()
+        if self.briefing is not None:
+            self.briefing.shutdown()
+        if self.artwork is not None:
+            self.artwork.shutdown()
 
     @intent_handler("news.intent")
     def handle_play_the_news(self, message):
@@ -308,25 +1147,39 @@ class NewsSkill(OVOSCommonPlaybackSkill):
         
         Analyzes the user's utterance for language preferences, searches for matching local news entries, ranks them by relevance, and plays the top result. If no suitable news is found, notifies the user with an error dialog.
         """
-        utterance = message.data["utterance"]
-        self.acknowledge()  # short sound to know we are searching news
-        langs = self.match_lang(utterance) or self.native_langs # user may request specific lang
-        # create a playlist with results sorted by relevance
-        results = []
-        for v in self.read_db(local_only=True, langs=langs):
-            s = self._score(utterance, v, base_score=30, langs=langs)
-            if s <= 50:
-                continue
-            v = dict2entry(v)
-            v.match_confidence = min(100, s)
-            results.append(v)
+        metrics = self.metrics
+        metrics.count("handle_play_the_news", "queries")
+        with metrics.stage("handle_play_the_news", "total"):
+            utterance = " ".join(message.data["utterance"].split())
+            self.acknowledge()  # short sound to know we are searching news
+            with metrics.stage("handle_play_the_news", "match_lang"):
+                langs = self.match_lang(utterance) or self.native_langs # user may request specific lang
+            if self.briefing is not None:
+                first = self.briefing.start(self.briefing_stations(utterance, langs), message)
+                if first is None:
+                    self.speak_dialog("news.error")
+                else:
+                    self.play_media(media=first)
+                    # the following bulletins are queued while this one plays, never before
+                    # the play request, it replaces the OCP playlist
+                    self.briefing.prefetch()
+                return
+            # create a playlist with results sorted by relevance
+            cache_key = self._cache_key("news.intent", utterance, langs=langs)
+            results = self.search_cache.get(cache_key)
+            metrics.count("handle_play_the_news", "cache_hits" if results is not None else "cache_misses")
+            if results is None:
+                results = self._rank(utterance, langs=langs, base_score=30, local_only=True,
+                                     limit=self.max_results, operation="handle_play_the_news")
+                self.search_cache.put(cache_key, results)
+            results = self._copy_results(results)
 
-        if not results:
-            self.speak_dialog("news.error")
-        else:
-            self.play_media(media=results[0],
-                            disambiguation=results,
-                            playlist=results)
+            if not results:
+                self.speak_dialog("news.error")
+            else:
+                self.play_media(media=results[0],
+                                disambiguation=results,
+                                playlist=results)
 
     @intent_handler("global_news.intent")
     def handle_global_news(self, message):
@@ -335,26 +1188,30 @@ class NewsSkill(OVOSCommonPlaybackSkill):
         
         Detects requested languages from the user's utterance, retrieves relevant world news entries, scores them for relevance, and plays the top result. If no suitable news entries are found, notifies the user with an error dialog.
         """
-        utterance = message.data["utterance"]
-        self.acknowledge()  # short sound to know we are searching news
-        langs = self.match_lang(utterance) # user may request specific lang
-        # create a playlist with results sorted by relevance
-        results = []
-        for v in self.read_db(world_only=True, langs=langs):
+        metrics = self.metrics
+        metrics.count("handle_global_news", "queries")
+        with metrics.stage("handle_global_news", "total"):
+            utterance = " ".join(message.data["utterance"].split())
+            self.acknowledge()  # short sound to know we are searching news
+            with metrics.stage("handle_global_news", "match_lang"):
+                langs = self.match_lang(utterance) # user may request specific lang
+            # create a playlist with results sorted by relevance
             # NOTE: if langs is None then all languages are considered equally
-            s = self._score(utterance, v, base_score=30, langs=langs)
-            if s <= 50:
-                continue
-            v = dict2entry(v)
-            v.match_confidence = min(100, s)
-            results.append(v)
+            cache_key = self._cache_key("global_news.intent", utterance, langs=langs)
+            results = self.search_cache.get(cache_key)
+            metrics.count("handle_global_news", "cache_hits" if results is not None else "cache_misses")
+            if results is None:
+                results = self._rank(utterance, langs=langs, base_score=30, world_only=True,
+                                     limit=self.max_results, operation="handle_global_news")
+                self.search_cache.put(cache_key, results)
+            results = self._copy_results(results)
 
-        if not results:
-            self.speak_dialog("news.error")
-        else:
-            self.play_media(media=results[0],
-                            disambiguation=results,
-                            playlist=results)
+            if not results:
+                self.speak_dialog("news.error")
+            else:
+                self.play_media(media=results[0],
+                                disambiguation=results,
+                                playlist=results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+from typing import Dict, FrozenSet, Iterable, Sequence, Tuple
+
+from langcodes import standardize_tag, tag_distance
+
+# same cutoff as langcodes.closest_match, farther languages never match
+_NO_MATCH = 1000
+
+
+class LanguageAffinity:
+    """
+    Precomputed distances between the catalog languages and the languages a user can request.
+
+    Language filtering used to call langcodes.closest_match for every catalog language on
+    every query. Both sets of languages are small and known in advance (the catalog
+    sections and native_langs + the match_lang vocabularies), so all distances are
+    computed once and queries only do table lookups. Languages that were not known in
+    advance are computed on first use and kept.
+    """
+
+    def __init__(self, catalog_langs: Sequence[str], requestable_langs: Iterable[str] = (),
+                 max_distance: int = 10):
+        """
+        Args:
+            catalog_langs: Standardized languages of the catalog sections
+            requestable_langs: Languages queries may ask for, their distances are computed now
+            max_distance: Catalog languages farther than this from all requested languages are filtered out
+        """
+        self.catalog_langs: Tuple[str, ...] = tuple(catalog_langs)
+        self.max_distance = max_distance
+        self._standard = {lang: standardize_tag(lang) for lang in self.catalog_langs}
+        self.distances: Dict[Tuple[str, str], int] = {}
+        self._allowed: Dict[FrozenSet[str], Tuple[str, ...]] = {}
+        for lang in dict.fromkeys(requestable_langs):
+            for catalog_lang in self.catalog_langs:
+                self.distance(catalog_lang, lang)
+
+    def distance(self, catalog_lang: str, lang: str) -> int:
+        """ the distance langcodes.closest_match(catalog_lang, [lang]) would report """
+        key = (catalog_lang, lang)
+        distance = self.distances.get(key)
+        if distance is None:
+            standard = self._standard.get(catalog_lang) or standardize_tag(catalog_lang)
+            if lang in (catalog_lang, standard):
+                distance = 0
+            else:
+                distance = tag_distance(standard, lang)
+                if distance > 25:
+                    distance = _NO_MATCH
+            self.distances[key] = distance
+        return distance
+
+    def allowed(self, langs: Iterable[str]) -> Tuple[str, ...]:
+        """ catalog languages close enough to any of the requested languages, in catalog order """
+        key = frozenset(langs)
+        allowed = self._allowed.get(key)
+        if allowed is None:
+            allowed = self._allowed[key] = tuple(
+                catalog_lang for catalog_lang in self.catalog_langs
+                if min((self.distance(catalog_lang, l) for l in key), default=_NO_MATCH) <= self.max_distance)
+        return allowed
@@ -0,0 +1,265 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from os.path import exists, getmtime, getsize, isfile, join
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from json_database import JsonStorage
+from ovos_utils.log import LOG
+
+try:
+    from PIL import Image
+except ImportError:  # images are not scaled, remote artwork is still cached on disk
+    Image = None
+
+SIZES = (64, 128, 256)
+
+
+def is_remote(image: str) -> bool:
+    return image.startswith(("http://", "https://"))
+
+
+@dataclass(frozen=True)
+class Artwork:
+    source: str  # url or bundled path of the original image
+    path: str  # local copy of a remote image, the bundled file itself otherwise
+    sizes: Tuple[int, ...] = ()  # thumbnails on disk
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size: int = 0  # bytes in the cache folder, remote copy and thumbnails
+    checked_at: float = 0.0  # last download or revalidation
+    last_used: float = 0.0
+
+
+class ArtworkCache:
+    """
+    Keeps pre-scaled thumbnails of the station images, so the GUI never decodes full size images.
+
+    Remote images are downloaded once and revalidated with conditional requests when older
+    than the ttl, unchanged images answer 304 and are not downloaded again. Every image is
+    scaled to a few fixed square sizes (PNG), bundled images are only scaled again if the
+    file changes. The cached files are evicted least recently used first once they grow
+    above the quota, the index is persisted, so thumbnails survive restarts.
+
+    Images are not scaled if Pillow is not installed, remote images are cached anyway.
+    """
+
+    def __init__(self, directory: str, sizes: Iterable[int] = SIZES, quota: int = 20 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600, max_workers: int = 4, timeout: float = 10,
+                 max_image_size: int = 5 * 1024 * 1024):
+        """
+        Args:
+            directory: Folder of the cached images and the index
+            sizes: Edge lengths of the thumbnails, in pixels
+            quota: Maximum size of all cached files, in bytes
+            ttl: Seconds before a remote image is revalidated
+            max_workers: Number of images prepared concurrently
+            timeout: HTTP timeout in seconds
+            max_image_size: Remote images larger than this are not downloaded, in bytes
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sizes = tuple(sorted(sizes))
+        self.quota = quota
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_image_size = max_image_size
+        self.session = requests.Session()
+        self._lock = Lock()
+        self.storage = JsonStorage(join(directory, "artwork.json"))
+        self.artwork: Dict[str, Artwork] = {}  # source -> artwork
+        for source, record in self.storage.items():
+            try:
+                artwork = Artwork(**dict(record, sizes=tuple(record.get("sizes") or ())))
+            except TypeError:
+                LOG.warning(f"Ignoring invalid artwork record for {source}")
+                continue
+            if exists(artwork.path):
+                self.artwork[source] = artwork
+
+    @property
+    def size(self) -> int:
+        return sum(a.size for a in self.artwork.values())
+
+    def _name(self, source: str) -> str:
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def _thumbnail_path(self, source: str, size: int) -> str:
+        return join(self.directory, f"{self._name(source)}_{size}.png")
+
+    def get(self, image: str, size: int) -> Optional[str]:
+        """
+        Local thumbnail of an image, never blocks on the network
+
+        Args:
+            image: Url or bundled path of the station image
+            size: Wanted edge length, the smallest thumbnail at least this large is picked
+
+        Returns:
+            Path of the thumbnail, of the local copy of a remote image if it is not scaled,
+            None if the image was not prepared yet
+        """
+        artwork = self.artwork.get(image)
+        if artwork is None:
+            return None
+        fitting = [s for s in artwork.sizes if s >= size]
+        if fitting:
+            path = self._thumbnail_path(image, fitting[0])
+        elif artwork.path != image:
+            path = artwork.path
+        else:
+            return None  # bundled image smaller than the thumbnail, or not scaled
+        if not exists(path):
+            return None
+        with self._lock:
+            self.artwork[image] = Artwork(**dict(asdict(artwork), last_used=time.time()))
+        return path
+
+    def fetch(self, image: str) -> Optional[Artwork]:
+        """
+        Downloads or revalidates a remote image and scales it into thumbnails, if needed
+
+        Returns:
+            The artwork, None if the image can not be read
+        """
+        previous = artwork = self.artwork.get(image)
+        modified = previous is None
+        if is_remote(image):
+            if previous is None or time.time() - previous.checked_at >= self.ttl or not exists(previous.path):
+                try:
+                    artwork, modified = self._download(image, previous)
+                except Exception as e:
+                    LOG.warning(f"Failed to download artwork {image}: {e}")
+                    return None
+        else:
+            if not isfile(image):
+                return None
+            if previous is None or previous.checked_at < getmtime(image):
+                now = time.time()
+                artwork, modified = Artwork(source=image, path=image, checked_at=now, last_used=now), True
+        if modified or any(not exists(self._thumbnail_path(image, s)) for s in artwork.sizes):
+            artwork = self._scale(artwork)
+        with self._lock:
+            self.artwork[image] = artwork
+        return artwork
+
+    def _download(self, url: str, previous: Optional[Artwork]) -> Tuple[Artwork, bool]:
+        """
+        Conditional GET, the previous copy is kept if the image did not change
+
+        Returns:
+            (artwork, True if the image was downloaded)
+        """
+        headers = {}
+        if previous is not None and exists(previous.path):
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        now = time.time()
+        ext = os.path.splitext(urlparse(url).path)[1][:5] or ".img"
+        path = join(self.directory, self._name(url) + ext)
+        tmp = f"{path}.part"
+        size = 0
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    return Artwork(**dict(asdict(previous), checked_at=now)), False
+                response.raise_for_status()
+                with open(tmp, "wb") as f:
+                    for chunk in response.iter_content(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_image_size:
+                            raise ValueError(f"image is larger than {self.max_image_size} bytes")
+                        f.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            if exists(tmp):
+                os.remove(tmp)
+        return Artwork(source=url, path=path, etag=response.headers.get("ETag"),
+                       last_modified=response.headers.get("Last-Modified"),
+                       size=size, checked_at=now, last_used=now), True
+
+    def _scale(self, artwork: Artwork) -> Artwork:
+        """ writes the thumbnails of an image, sizes larger than the original are skipped """
+        own = getsize(artwork.path) if artwork.path != artwork.source else 0
+        if Image is None or artwork.path.lower().endswith(".svg"):
+            # vector images are drawn at any size by the GUI
+            return Artwork(**dict(asdict(artwork), sizes=(), size=own))
+        sizes = []
+        try:
+            with Image.open(artwork.path) as original:
+                original = original.convert("RGBA")
+                for size in self.sizes:
+                    if size > max(original.size):
+                        break  # never upscaled, larger sizes use the original image
+                    thumbnail = original.copy()
+                    thumbnail.thumbnail((size, size), Image.LANCZOS)
+                    path = self._thumbnail_path(artwork.source, size)
+                    thumbnail.save(path, "PNG")
+                    sizes.append(size)
+                    own += getsize(path)
+        except Exception as e:
+            LOG.warning(f"Failed to scale artwork {artwork.source}: {e}")
+        return Artwork(**dict(asdict(artwork), sizes=tuple(sizes), size=own))
+
+    def _remove(self, artwork: Artwork):
+        paths = [self._thumbnail_path(artwork.source, s) for s in artwork.sizes]
+        if artwork.path != artwork.source:
+            paths.append(artwork.path)  # bundled images are never removed
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> List[str]:
+        """
+        Removes the least recently used artwork until the cache fits its quota
+
+        Returns:
+            Sources whose cached files were removed
+        """
+        evicted = []
+        with self._lock:
+            total = self.size
+            for source, artwork in sorted(self.artwork.items(), key=lambda i: i[1].last_used):
+                if total <= self.quota:
+                    break
+                total -= artwork.size
+                self.artwork.pop(source)
+                self._remove(artwork)
+                evicted.append(source)
+        return evicted
+
+    def refresh(self, images: Iterable[str]) -> List[str]:
+        """
+        Prepares the thumbnails of images concurrently, then enforces the quota
+
+        Returns:
+            Sources whose thumbnails changed (created, rescaled or evicted)
+        """
+        images = [i for i in dict.fromkeys(images) if i]
+        previous = {i: self.artwork.get(i) for i in images}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            prepared = list(pool.map(self.fetch, images))
+        changed = [i for i, a in zip(images, prepared) if a is not None and
+                   (previous[i] is None or (previous[i].path, previous[i].sizes) != (a.path, a.sizes))]
+        changed += [source for source in self.evict() if source not in changed]
+        self.save()
+        return changed
+
+    def save(self):
+        with self._lock:
+            self.storage.clear()
+            self.storage.update({source: asdict(a) for source, a in self.artwork.items()})
+        self.storage.store()
+
+    def shutdown(self):
+        self.session.close()
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
+from typing import Callable, List, Optional, Set, Union
+
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+from ovos_utils.ocp import MediaEntry, PluginStream
+
+from .bulletins import Bulletin, BulletinCache
+from .stations import NewsStation
+
+Entry = Union[PluginStream, MediaEntry]
+
+
+class BriefingPlayer:
+    """
+    Plays a news briefing, an ordered list of stations, buffering the next bulletins ahead of time.
+
+    Only the first item is handed to OCP when the briefing starts. Once it plays, the latest
+    episode of the following stations is downloaded in order and every item is queued in OCP
+    as soon as it is on disk, never more than `depth` items ahead of the one playing. When a
+    bulletin ends the next one is already a local file and starts without a network round trip.
+    """
+
+    def __init__(self, cache: BulletinCache, to_entry: Callable[[NewsStation], Entry],
+                 queue: Callable[[Entry, Optional[Message]], None], depth: int = 1):
+        """
+        Args:
+            cache: Downloads and keeps the buffered bulletins
+            to_entry: Entry of a station that could not be buffered, OCP extracts its stream
+            queue: Appends an entry to the OCP playlist, in the session of the message that started the briefing
+            depth: Number of items buffered and queued ahead of the one playing
+        """
+        self.cache = cache
+        self.to_entry = to_entry
+        self.queue = queue
+        self.depth = depth
+        self.stations: List[NewsStation] = []
+        self.playing = 0  # position of the item playing
+        self.queued = 0  # items handed to OCP
+        self.uris: Set[str] = set()  # uris of the entries handed to OCP, playing one of them continues the briefing
+        self.message: Optional[Message] = None  # message that started the briefing
+        self._generation = 0  # incremented by every start/stop, outdated downloads are discarded
+        self._lock = RLock()
+        # a single worker, items are buffered and queued in briefing order
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news.briefing")
+
+    @property
+    def active(self) -> bool:
+        return self.playing < len(self.stations)
+
+    @staticmethod
+    def entry_uri(entry: Entry) -> str:
+        """ the uri OCP reports when it plays the entry """
+        return f"{entry.extractor_id}//{entry.stream}" if isinstance(entry, PluginStream) else entry.uri
+
+    def owns(self, uri: Optional[str]) -> bool:
+        """ True if uri is one of the entries of the briefing playing, OCP moved on to the next bulletin """
+        with self._lock:
+            return self.active and uri in self.uris
+
+    @staticmethod
+    def file_entry(station: NewsStation, bulletin: Bulletin) -> MediaEntry:
+        return station.entry(100, uri=f"file://{bulletin.path}")
+
+    def start(self, stations: List[NewsStation], message: Optional[Message] = None) -> Optional[Entry]:
+        """
+        Starts a new briefing, any previous one is abandoned
+
+        Nothing is queued until prefetch is called, the play request of the returned entry
+        replaces the OCP playlist and must reach OCP before the following items are queued.
+
+        Args:
+            stations: Stations of the briefing, in playback order
+            message: Message that started the briefing, queue requests are forwarded from it
+
+        Returns:
+            The entry to play now, None if there are no stations
+        """
+        with self._lock:
+            self._generation += 1
+            self.stations = list(stations)
+            self.playing = 0
+            self.queued = 1 if self.stations else 0
+            self.message = message
+            self.uris = set()
+        if not self.stations:
+            return None
+        first = self.stations[0]
+        # never wait for a download before the briefing starts
+        bulletin = self.cache.get(first)
+        entry = self.file_entry(first, bulletin) if bulletin else self.to_entry(first)
+        with self._lock:
+            self.uris.add(self.entry_uri(entry))
+        return entry
+
+    def prefetch(self):
+        """ the first item was sent to OCP, buffers and queues the following ones """
+        self._fill()
+
+    def stop(self):
+        with self._lock:
+            self._generation += 1
+            self.stations = []
+            self.playing = self.queued = 0
+            self.uris = set()
+            self.message = None
+
+    def advance(self):
+        """ the item playing ended, buffers the next ones """
+        with self._lock:
+            if not self.active:
+                return
+            self.playing += 1
+        self._fill()
+
+    def _fill(self):
+        """ schedules the items of the prefetch window that are not queued yet """
+        with self._lock:
+            generation = self._generation
+            end = min(len(self.stations), self.playing + 1 + self.depth)
+            pending = list(range(self.queued, end))
+            self.queued = max(self.queued, end)
+        for position in pending:
+            self._pool.submit(self._buffer, generation, position)
+
+    def _buffer(self, generation: int, position: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            station = self.stations[position]
+            message = self.message
+        try:
+            bulletin = self.cache.get(station) or self.cache.download(station)
+        except Exception as e:
+            LOG.warning(f"Failed to buffer {station.uri}: {e}")
+            bulletin = None
+        entry = self.file_entry(station, bulletin) if bulletin else self.to_entry(station)
+        with self._lock:
+            if generation != self._generation:
+                return  # the briefing was stopped or replaced meanwhile
+            self.uris.add(self.entry_uri(entry))
+            self.queue(entry, message)
+        if bulletin is not None:
+            self.cache.evict()
+            self.cache.save()
+
+    def shutdown(self):
+        self.stop()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.cache.shutdown()
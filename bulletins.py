@@ -0,0 +1,190 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from os.path import exists, join
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from json_database import JsonStorage
+from ovos_utils.log import LOG
+
+from .resolver import StreamResolver
+from .stations import NewsStation
+
+
+@dataclass(frozen=True)
+class Bulletin:
+    path: str  # local audio file
+    episode_uri: str  # url the file was downloaded from
+    title: str = ""
+    size: int = 0
+    downloaded_at: float = 0.0
+    last_used: float = 0.0
+
+
+class BulletinCache:
+    """
+    Downloads the latest episode of news stations ahead of time and keeps them on disk.
+
+    Files are evicted least recently used first once the cache grows above its quota,
+    a bulletin is only played while it is fresher than the ttl. The index is persisted,
+    so downloads survive restarts.
+    """
+
+    def __init__(self, directory: str, resolver: StreamResolver, quota: int = 200 * 1024 * 1024,
+                 ttl: float = 3600, max_workers: int = 2, timeout: float = 30, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            directory: Folder of the audio files and the index
+            resolver: Finds the url of the latest episode of a station
+            quota: Maximum size of all files, in bytes
+            ttl: Seconds a downloaded bulletin is considered fresh
+            max_workers: Number of concurrent downloads
+            timeout: HTTP timeout in seconds
+            chunk_size: Download chunk size, files are never loaded in memory
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.resolver = resolver
+        self.quota = quota
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.session = requests.Session()
+        self._lock = Lock()
+        self.storage = JsonStorage(join(directory, "bulletins.json"))
+        self.bulletins: Dict[str, Bulletin] = {}  # station uri -> bulletin
+        for uri, record in self.storage.items():
+            try:
+                bulletin = Bulletin(**record)
+            except TypeError:
+                LOG.warning(f"Ignoring invalid bulletin record for {uri}")
+                continue
+            if exists(bulletin.path):
+                self.bulletins[uri] = bulletin
+
+    @property
+    def size(self) -> int:
+        return sum(b.size for b in self.bulletins.values())
+
+    def is_fresh(self, bulletin: Bulletin) -> bool:
+        return time.time() - bulletin.downloaded_at < self.ttl and exists(bulletin.path)
+
+    def get(self, station: NewsStation) -> Optional[Bulletin]:
+        """ the downloaded bulletin of a station, only if still fresh, never blocks on the network """
+        bulletin = self.bulletins.get(station.uri)
+        if bulletin is None or not self.is_fresh(bulletin):
+            return None
+        with self._lock:
+            bulletin = self.bulletins[station.uri] = Bulletin(**dict(asdict(bulletin), last_used=time.time()))
+        return bulletin
+
+    def _path(self, station: NewsStation, episode_uri: str) -> str:
+        ext = os.path.splitext(urlparse(episode_uri).path)[1][:5] or ".mp3"
+        name = hashlib.sha1(f"{station.uri}\n{episode_uri}".encode("utf-8")).hexdigest()
+        return join(self.directory, name + ext)
+
+    def download(self, station: NewsStation) -> Optional[Bulletin]:
+        """
+        Downloads the latest episode of a station unless it is already on disk
+
+        Returns:
+            The bulletin, None if the station has no downloadable episode
+        """
+        resolved = self.resolver.resolve(station)
+        if resolved is None:
+            return None
+        previous = self.bulletins.get(station.uri)
+        if previous is not None and previous.episode_uri == resolved.uri and exists(previous.path):
+            # same episode, it is still the latest one
+            bulletin = Bulletin(**dict(asdict(previous), downloaded_at=time.time()))
+        else:
+            path = self._path(station, resolved.uri)
+            try:
+                size = self._fetch(resolved.uri, path)
+            except Exception as e:
+                LOG.warning(f"Failed to download {resolved.uri}: {e}")
+                return None
+            now = time.time()
+            bulletin = Bulletin(path=path, episode_uri=resolved.uri, title=resolved.title,
+                                size=size, downloaded_at=now, last_used=now)
+        with self._lock:
+            self.bulletins[station.uri] = bulletin
+        if previous is not None and previous.path != bulletin.path:
+            self._remove(previous)
+        return bulletin
+
+    def _fetch(self, url: str, path: str) -> int:
+        """ streams url into path, atomically, files larger than the quota are aborted """
+        tmp = f"{path}.part"
+        size = 0
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                with open(tmp, "wb") as f:
+                    for chunk in response.iter_content(self.chunk_size):
+                        size += len(chunk)
+                        if size > self.quota:
+                            raise ValueError(f"episode is larger than the cache quota ({self.quota} bytes)")
+                        f.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            if exists(tmp):
+                os.remove(tmp)
+        return size
+
+    def _remove(self, bulletin: Bulletin):
+        try:
+            os.remove(bulletin.path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> List[str]:
+        """
+        Removes least recently used bulletins until the cache fits its quota
+
+        Returns:
+            Station uris whose bulletin was removed
+        """
+        evicted = []
+        with self._lock:
+            total = self.size
+            for uri, bulletin in sorted(self.bulletins.items(), key=lambda i: i[1].last_used):
+                if total <= self.quota:
+                    break
+                total -= bulletin.size
+                self.bulletins.pop(uri)
+                self._remove(bulletin)
+                evicted.append(uri)
+        return evicted
+
+    def refresh(self, stations: Iterable[NewsStation]) -> List[str]:
+        """
+        Downloads the latest episode of stations concurrently, then enforces the quota
+
+        Returns:
+            Station uris whose local bulletin changed (downloaded or evicted)
+        """
+        stations = list({s.uri: s for s in stations if s.extractor_id}.values())
+        previous = {s.uri: self.bulletins.get(s.uri) for s in stations}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            downloaded = list(pool.map(self.download, stations))
+        changed = [s.uri for s, b in zip(stations, downloaded)
+                   if b is not None and (previous[s.uri] is None or previous[s.uri].path != b.path)]
+        changed += [uri for uri in self.evict() if uri not in changed]
+        self.save()
+        return changed
+
+    def save(self):
+        with self._lock:
+            self.storage.clear()
+            self.storage.update({uri: asdict(b) for uri, b in self.bulletins.items()})
+        self.storage.store()
+
+    def shutdown(self):
+        self.session.close()
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from itertools import chain
+from os.path import isdir, join, relpath, splitext
+from typing import Dict, List, Optional
+
+from ovos_utils.bracket_expansion import expand_template
+from ovos_utils.log import LOG
+
+BUNDLE_NAME = "bundle.json"
+VERSION = 3
+# resource file extension -> bundle section, intents and dialogs are read from the files by ovos_workshop
+SECTIONS = {".voc": "vocabs"}
+
+
+def _lines(path: str) -> List[str]:
+    """ non empty, non comment lines, like ovos_workshop resource files """
+    with open(path, encoding="utf-8") as f:
+        return [line for line in (l.strip() for l in f) if line and not line.startswith("#")]
+
+
+def _resource_files(lang_dir: str) -> Dict[str, str]:
+    """ relative path -> absolute path of every bundled resource file of a language """
+    files = {}
+    for root, _, names in os.walk(lang_dir):
+        for name in names:
+            if splitext(name)[1] in SECTIONS:
+                path = join(root, name)
+                files[relpath(path, lang_dir)] = path
+    return files
+
+
+def sources_digest(lang_dir: str) -> str:
+    """
+    Digest of the names and contents of the bundled resource files of a language
+
+    The files are hashed, not parsed or expanded. Modification times are left out, they
+    differ in every checkout and installation of the same files, any edit changes the contents.
+    """
+    h = hashlib.sha1()
+    for rel, path in sorted(_resource_files(lang_dir).items()):
+        with open(path, "rb") as f:
+            data = f.read()
+        h.update(f"{rel}\0{len(data)}\n".encode("utf-8"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def compile_bundle(lang_dir: str, target: Optional[str] = None) -> dict:
+    """
+    Compiles the .voc files of a language into a single json bundle
+
+    Samples are stored the way the skill consumes them, lower cased and expanded
+    like OVOSSkill.voc_list.
+
+    Args:
+        lang_dir: The locale folder of a language, eg. locale/en-us
+        target: Bundle path, defaults to bundle.json inside lang_dir
+
+    Returns:
+        The bundle contents
+    """
+    files = _resource_files(lang_dir)
+    bundle = {"version": VERSION, "digest": sources_digest(lang_dir), "files": len(files),
+              "vocabs": {}}
+    for rel, path in sorted(files.items()):
+        name, ext = splitext(os.path.basename(rel))
+        samples = list(chain(*[expand_template(line.lower()) for line in _lines(path)]))
+        bundle[SECTIONS[ext]][name] = samples
+    with open(target or join(lang_dir, BUNDLE_NAME), "w", encoding="utf-8") as f:
+        json.dump(bundle, f, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return bundle
+
+
+def compile_bundles(locale_dir: str) -> Dict[str, int]:
+    """
+    Compiles a bundle for every language folder of a locale directory
+
+    Returns:
+        folder name -> number of bundled resource files
+    """
+    compiled = {}
+    for lang in sorted(os.listdir(locale_dir)):
+        if isdir(join(locale_dir, lang)):
+            compiled[lang] = compile_bundle(join(locale_dir, lang))["files"]
+    return compiled
+
+
+class LocaleBundle:
+    """
+    Pre-expanded vocabularies of a language, loaded in one read.
+
+    Bundles are built from the locale files by scripts/compile_locale.py, a bundle whose
+    digest does not match the names and contents of the files on disk is ignored and the
+    files are parsed instead.
+    """
+
+    def __init__(self, data: dict):
+        self.digest: str = data.get("digest", "")
+        self.vocabs: Dict[str, List[str]] = data.get("vocabs", {})
+
+    @staticmethod
+    def open_fresh(lang_dir: str) -> Optional['LocaleBundle']:
+        """ the bundle of a locale folder, None if missing, invalid or out of date """
+        path = join(lang_dir, BUNDLE_NAME)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            LOG.warning(f"Ignoring invalid locale bundle {path}: {e}")
+            return None
+        if data.get("version") != VERSION:
+            LOG.info(f"Ignoring locale bundle {path}, compiled by another version")
+            return None
+        bundle = LocaleBundle(data)
+        if not bundle.is_fresh(lang_dir):
+            LOG.info(f"Ignoring out of date locale bundle {path}, run scripts/compile_locale.py")
+            return None
+        return bundle
+
+    def is_fresh(self, lang_dir: str) -> bool:
+        """ True if the bundle was compiled from the resource files on disk, they are hashed but not parsed """
+        return sources_digest(lang_dir) == self.digest
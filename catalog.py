@@ -0,0 +1,421 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from ovos_utils.log import LOG
+
+from .scoring import StationScorer, sort_tokens
+from .stations import IMAGES_DIR, NewsStation, StationIndex, intern_all, shared_set, split_extractor
+
+MAGIC = b"NEWSCAT\0"
+VERSION = 1
+NONE = 0xFFFFFFFF  # missing string
+WORLD_NEWS = 1  # flags bit
+
+# magic, version, number of sections, source size, source mtime (ns), source sha1
+_HEADER = struct.Struct("<8sIIQQ20s")
+# name, array typecode, offset, number of items
+_SECTION = struct.Struct("<24sc7xQQ")
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def add(self, text: Optional[str]) -> int:
+        if text is None:
+            return NONE
+        if text not in self.ids:
+            self.ids[text] = len(self.ids)
+        return self.ids[text]
+
+    def sections(self) -> Dict[str, array]:
+        offsets = array("I", [0])
+        blob = bytearray()
+        for text in self.ids:  # insertion order == id
+            blob += text.encode("utf-8")
+            offsets.append(len(blob))
+        return {"str_offsets": offsets, "str_blob": array("B", bytes(blob))}
+
+
+def _line(text: str) -> str:
+    return " ".join(text.splitlines())
+
+
+def _source_info(source: str) -> Tuple[int, int, bytes]:
+    st = os.stat(source)
+    with open(source, "rb") as f:
+        sha1 = hashlib.sha1(f.read()).digest()
+    return st.st_size, st.st_mtime_ns, sha1
+
+
+def compile_catalog(source: str, target: str) -> int:
+    """
+    Compiles a News.json catalog into the binary format read by CompiledCatalog
+
+    Stations are stored column wise: every string lives once in a string table and station
+    records are fixed width integer columns pointing into it, stations are grouped by
+    standardized language and the token sorted aliases used by the scorer are precomputed.
+
+    Args:
+        source: Path of the News.json catalog, it stays the source of truth
+        target: Path of the compiled catalog
+
+    Returns:
+        Number of compiled stations
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("compiled catalogs are only supported on little endian platforms")
+    with open(source) as f:
+        archive = json.load(f)
+    index = StationIndex.from_archive(archive)
+
+    strings = _StringTable()
+    columns: Dict[str, array] = {name: array("I") for name in
+                                 ("feed", "title", "uri", "image", "bg_image", "lang",
+                                  "langset", "countryset", "aliases", "secondary", "alt_uris")}
+    columns["flags"] = array("B")
+    for name in ("aliases", "secondary", "alt_uris", "norm_aliases"):
+        columns[f"{name}_offsets"] = array("I", [0])
+    # columns needed for every station at once are stored as single newline separated
+    # blobs, decoding one large string is much faster than decoding every record
+    norm_aliases, names = [], []
+
+    langs = list(index.by_lang)
+    langsets: Dict[FrozenSet[str], int] = {}
+    countrysets: Dict[FrozenSet[str], int] = {}
+    for station in index.stations:
+        columns["feed"].append(strings.add(station.feed))
+        columns["title"].append(strings.add(station.title))
+        columns["uri"].append(strings.add(station.uri))
+        columns["image"].append(strings.add(station.image.replace(IMAGES_DIR, "./res/images/")))
+        columns["bg_image"].append(strings.add(station.bg_image or None))
+        columns["lang"].append(langs.index(station.lang))
+        columns["langset"].append(langsets.setdefault(station.langs, len(langsets)))
+        columns["countryset"].append(countrysets.setdefault(station.countries, len(countrysets)))
+        columns["flags"].append(WORLD_NEWS if station.world_news else 0)
+        for name, values in (("aliases", station.aliases),
+                             ("secondary", station.secondary_langs),
+                             ("alt_uris", station.alt_uris)):
+            columns[name].extend(strings.add(v) for v in values)
+            columns[f"{name}_offsets"].append(len(columns[name]))
+        norm_aliases += [_line(sort_tokens(a)) for a in station.aliases or [station.title]]
+        columns["norm_aliases_offsets"].append(len(norm_aliases))
+        names.append(_line(" ".join((station.title,) + station.aliases)))
+
+    for name, sets in (("langset", langsets), ("countryset", countrysets)):
+        columns[f"{name}_items"] = array("I")
+        columns[f"{name}_offsets"] = array("I", [0])
+        for values in sets:  # insertion order == id
+            columns[f"{name}_items"].extend(strings.add(v) for v in sorted(values))
+            columns[f"{name}_offsets"].append(len(columns[f"{name}_items"]))
+
+    columns["lang_names"] = array("I", [strings.add(l) for l in langs])
+    columns["lang_offsets"] = array("I", [0])
+    for lang in langs:
+        columns["lang_offsets"].append(columns["lang_offsets"][-1] + len(index.by_lang[lang]))
+    columns["raw_langs"] = array("I", [strings.add(l) for l in archive])
+    columns["norm_aliases_blob"] = array("B", "\n".join(norm_aliases).encode("utf-8"))
+    columns["names_blob"] = array("B", "\n".join(names).encode("utf-8"))
+    columns["keywords_blob"] = array("B", "\n".join(_line(k) for k in index.keywords()).encode("utf-8"))
+    columns.update(strings.sections())
+
+    size, mtime_ns, sha1 = _source_info(source)
+    offset = _HEADER.size + _SECTION.size * len(columns)
+    table, payload = [], []
+    for name, values in columns.items():
+        padding = -offset % 8
+        payload.append(b"\0" * padding + values.tobytes())
+        offset += padding
+        table.append(_SECTION.pack(name.encode(), values.typecode.encode(), offset, len(values)))
+        offset += len(values) * values.itemsize
+
+    tmp = f"{target}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(columns), size, mtime_ns, sha1))
+        f.writelines(table)
+        f.writelines(payload)
+    os.replace(tmp, target)
+    return len(index)
+
+
+def compile_keywords(source: str, target: str) -> int:
+    """
+    Writes the OCP keywords (station names and aliases) of a News.json catalog into a small json file
+
+    The skill registers them at startup without parsing the catalog, see load_keywords
+
+    Returns:
+        Number of keywords
+    """
+    with open(source, encoding="utf-8") as f:
+        keywords = StationIndex.from_archive(json.load(f)).keywords()
+    size, mtime_ns, sha1 = _source_info(source)
+    tmp = f"{target}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"source": [size, mtime_ns, sha1.hex()], "keywords": keywords}, f, ensure_ascii=False)
+    os.replace(tmp, target)
+    return len(keywords)
+
+
+def load_keywords(path: str, source: str) -> Optional[List[str]]:
+    """ the precomputed keywords, None if missing or not compiled from the current source """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        size, mtime_ns, sha1 = data["source"]
+        keywords = data["keywords"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        LOG.warning(f"Ignoring precomputed keywords {path}: {e}")
+        return None
+    st = os.stat(source)
+    if st.st_size != size or (st.st_mtime_ns != mtime_ns and _source_info(source)[2].hex() != sha1):
+        LOG.info(f"Precomputed keywords {path} are outdated, loading {source}")
+        return None
+    return keywords
+
+
+class CompiledCatalog:
+    """
+    Memory mapped compiled catalog, see compile_catalog.
+
+    Only the small lookup tables (languages, language and country sets) are decoded when
+    the file is opened, strings and station records are decoded on demand.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: The compiled catalog file
+
+        Raises:
+            ValueError: if the file is not a compiled catalog of a supported version
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, self.source_size, self.source_mtime_ns, self.source_sha1 = \
+            _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION or sys.byteorder != "little":
+            self._mmap.close()
+            raise ValueError(f"Unsupported catalog file: {path}")
+        self._view = view = memoryview(self._mmap)
+        self._columns: Dict[str, memoryview] = {}
+        for i in range(count):
+            name, typecode, offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            typecode = typecode.decode()
+            size = array(typecode).itemsize
+            self._columns[name.rstrip(b"\0").decode()] = view[offset:offset + length * size].cast(typecode)
+        self._str_offsets = self._columns["str_offsets"]
+        self._str_blob = self._columns["str_blob"]
+        self._scorer_columns = None
+
+        self.langs: List[str] = list(intern_all(self.string(sid) for sid in self._columns["lang_names"]))
+        self.raw_langs: List[str] = [self.string(sid) for sid in self._columns["raw_langs"]]
+        self.langsets = self._decode_sets("langset")
+        self.countrysets = self._decode_sets("countryset")
+
+    @staticmethod
+    def open_fresh(path: str, source: str) -> Optional['CompiledCatalog']:
+        """ opens the compiled catalog if it exists and was compiled from the current source file """
+        if not os.path.isfile(path):
+            return None
+        try:
+            catalog = CompiledCatalog(path)
+        except (ValueError, OSError, struct.error) as e:
+            LOG.warning(f"Ignoring compiled catalog {path}: {e}")
+            return None
+        if not catalog.is_fresh(source):
+            LOG.info(f"Compiled catalog {path} is outdated, loading {source}")
+            catalog.close()
+            return None
+        return catalog
+
+    def is_fresh(self, source: str) -> bool:
+        """ True if this catalog was compiled from the current contents of source """
+        st = os.stat(source)
+        if st.st_size != self.source_size:
+            return False
+        if st.st_mtime_ns == self.source_mtime_ns:
+            return True
+        # copied or checked out again, compare contents
+        return _source_info(source)[2] == self.source_sha1
+
+    def close(self):
+        """ unmaps the file, must not be called once an index or scorer uses this catalog """
+        for column in self._columns.values():
+            column.release()
+        self._columns.clear()
+        self._view.release()
+        self._mmap.close()
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NONE:
+            return None
+        return self._str_blob[self._str_offsets[sid]:self._str_offsets[sid + 1]].tobytes().decode("utf-8")
+
+    def _strings(self, name: str, i: int) -> Tuple[str, ...]:
+        offsets = self._columns[f"{name}_offsets"]
+        return tuple(self.string(sid) for sid in self._columns[name][offsets[i]:offsets[i + 1]])
+
+    def _decode_sets(self, name: str) -> List[FrozenSet[str]]:
+        offsets = self._columns[f"{name}_offsets"]
+        items = self._columns[f"{name}_items"]
+        return [shared_set(self.string(sid) for sid in items[offsets[i]:offsets[i + 1]])
+                for i in range(len(offsets) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._columns["feed"])
+
+    def lang_ranges(self) -> Iterator[Tuple[str, int, int]]:
+        """ (standardized lang, first station, end) of every language section """
+        offsets = self._columns["lang_offsets"]
+        for i, lang in enumerate(self.langs):
+            yield lang, offsets[i], offsets[i + 1]
+
+    def find_feeds(self, feeds: Dict[str, str]) -> FrozenSet[int]:
+        """ positions of the given feeds, by standardized lang -> feed name """
+        found = set()
+        feed_column = self._columns["feed"]
+        for lang, start, end in self.lang_ranges():
+            if lang in feeds:
+                found |= {i for i in range(start, end) if self.string(feed_column[i]) == feeds[lang]}
+        return frozenset(found)
+
+    def station(self, i: int, default_bg: str = "", is_default: bool = False) -> NewsStation:
+        """ decodes a single station record """
+        c = self._columns
+        uri = self.string(c["uri"][i])
+        extractor_id, stream = split_extractor(uri)
+        return NewsStation(feed=self.string(c["feed"][i]),
+                           title=self.string(c["title"][i]),
+                           uri=uri,
+                           lang=self.langs[c["lang"][i]],
+                           aliases=intern_all(self._strings("aliases", i)),
+                           secondary_langs=intern_all(self._strings("secondary", i)),
+                           alt_uris=self._strings("alt_uris", i),
+                           langs=self.langsets[c["langset"][i]],
+                           countries=self.countrysets[c["countryset"][i]],
+                           image=sys.intern(self.string(c["image"][i]).replace("./res/images/", IMAGES_DIR)),
+                           bg_image=sys.intern(self.string(c["bg_image"][i]) or default_bg),
+                           extractor_id=extractor_id,
+                           stream=stream,
+                           world_news=bool(c["flags"][i] & WORLD_NEWS),
+                           is_default=is_default)
+
+    def _lines(self, name: str) -> List[str]:
+        blob = self._columns[f"{name}_blob"]
+        return blob.tobytes().decode("utf-8").split("\n") if len(blob) else []
+
+    def names(self) -> List[Tuple[str]]:
+        """ title and aliases of every station, joined in a single string """
+        return [(name,) for name in self._lines("names")]
+
+    def keywords(self) -> List[str]:
+        """ all station aliases and names, in the same order as StationIndex.keywords """
+        return self._lines("keywords")
+
+    def scorer_columns(self) -> dict:
+        """ the precomputed StationScorer.from_columns arguments, decoded once """
+        if self._scorer_columns is None:
+            c = self._columns
+            self._scorer_columns = dict(
+                sorted_aliases=self._lines("norm_aliases"),
+                offsets=list(c["norm_aliases_offsets"][:-1]),
+                catalog_langs=self.langs, lang_ids=c["lang"],
+                langsets=self.langsets, langset_ids=c["langset"],
+                countrysets=self.countrysets, countryset_ids=c["countryset"],
+                world_news=[bool(f & WORLD_NEWS) for f in c["flags"]])
+        return self._scorer_columns
+
+
+class CompiledStations(Sequence[NewsStation]):
+    """ lazy sequence of stations, records are decoded (once) when accessed """
+
+    def __init__(self, catalog: CompiledCatalog, default_bg: str = "",
+                 defaults: FrozenSet[int] = frozenset(), start: int = 0,
+                 stop: Optional[int] = None, _cache: Optional[Dict[int, NewsStation]] = None):
+        self.catalog = catalog
+        self.default_bg = default_bg
+        self.defaults = defaults
+        self.start = start
+        self.stop = len(catalog) if stop is None else stop
+        self._cache = {} if _cache is None else _cache
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return CompiledStations(self.catalog, self.default_bg, self.defaults,
+                                    self.start + start, self.start + max(start, stop), self._cache)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("station index out of range")
+        pos = self.start + i
+        station = self._cache.get(pos)
+        if station is None:
+            station = self.catalog.station(pos, self.default_bg, pos in self.defaults)
+            self._cache[pos] = station
+        return station
+
+    def __iter__(self) -> Iterator[NewsStation]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def decoded(self) -> int:
+        """ number of station records decoded so far """
+        return len(self._cache)
+
+
+class CompiledStationIndex(StationIndex):
+    """
+    StationIndex over a memory mapped CompiledCatalog.
+
+    Opening the index does not decode any station, the scorer is built from the
+    precomputed columns on the first query and only matched stations are decoded.
+    """
+
+    def __init__(self, catalog: CompiledCatalog, default_feeds: Optional[Dict[str, str]] = None,
+                 default_bg: str = "", key: tuple = (), _ngrams=None):
+        self.catalog = catalog
+        self.key = key
+        self.default_bg = default_bg
+        self.default_feeds = dict(default_feeds or {})
+        self.defaults = catalog.find_feeds(self.default_feeds)
+        self.stations = CompiledStations(catalog, default_bg, self.defaults)
+        self.by_lang = {lang: self.stations[start:end] for lang, start, end in catalog.lang_ranges()}
+        self._scorer = None
+        self._ngrams = _ngrams
+
+    def _build_scorer(self) -> StationScorer:
+        is_default = [False] * len(self.stations)
+        for i in self.defaults:
+            is_default[i] = True
+        return StationScorer.from_columns(self.stations, is_default=is_default,
+                                          **self.catalog.scorer_columns())
+
+    def names(self) -> List[Tuple[str, ...]]:
+        return self.catalog.names()
+
+    def keywords(self) -> List[str]:
+        return self.catalog.keywords()
+
+    def with_defaults(self, default_feeds: Dict[str, str], key: tuple = ()) -> 'CompiledStationIndex':
+        return CompiledStationIndex(self.catalog, default_feeds, self.default_bg, key,
+                                    _ngrams=self._ngrams)
+
+    def close(self):
+        self.catalog.close()
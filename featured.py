@@ -0,0 +1,98 @@
+import copy
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from ovos_utils.ocp import MediaEntry, Playlist, PluginStream
+
+from .stations import NewsStation
+
+FeaturedEntry = Union[PluginStream, MediaEntry]
+
+
+def copy_entry(entry: Union[FeaturedEntry, Playlist]) -> Union[FeaturedEntry, Playlist]:
+    """ shallow copy of an OCP result, playlists also get copies of their entries """
+    new = copy.copy(entry)
+    if isinstance(entry, Playlist):
+        new[:] = [copy.copy(e) for e in entry]
+    return new
+
+
+class FeaturedPlaylist:
+    """
+    Featured media entries of all stations, built lazily and cached per station.
+
+    When the station catalog changes only new or modified stations get a new entry,
+    entries are only created when iterated, so listing the first page of stations does
+    not build the whole playlist.
+    """
+
+    def __init__(self, entry_factory: Callable[[NewsStation], FeaturedEntry],
+                 title: str = "Latest News (Station Playlist)"):
+        """
+        Args:
+            entry_factory: Builds the OCP entry of a station
+            title: Title of the featured playlist
+        """
+        self.title = title
+        self.entry_factory = entry_factory
+        self.stations: Sequence[NewsStation] = ()
+        self._entries: Dict[NewsStation, FeaturedEntry] = {}
+        self._lock = Lock()
+        self.builds = 0  # number of entries created, for diagnostics
+
+    def update(self, stations: Sequence[NewsStation]):
+        """
+        Sets the current station catalog, cached entries of unchanged stations are kept
+
+        Args:
+            stations: All stations, in playlist order
+        """
+        with self._lock:
+            if stations is self.stations:
+                return
+            current = set(stations)
+            self._entries = {s: e for s, e in self._entries.items() if s in current}
+            self.stations = stations
+
+    def clear(self):
+        """ drops all cached entries, eg. when the entry factory output changes """
+        with self._lock:
+            self._entries = {}
+
+    def _entry(self, station: NewsStation) -> FeaturedEntry:
+        entry = self._entries.get(station)
+        if entry is None:
+            entry = self.entry_factory(station)
+            self._entries[station] = entry
+            self.builds += 1
+        return entry
+
+    def iter_entries(self, offset: int = 0, limit: Optional[int] = None,
+                     stations: Optional[Sequence[NewsStation]] = None) -> Iterator[FeaturedEntry]:
+        """
+        Lazily iterates copies of the featured entries
+
+        Args:
+            offset: Index of the first station
+            limit: Maximum number of entries, None for all remaining stations
+            stations: Station snapshot of the caller, concurrent updates are not seen if given
+        """
+        stations = self.stations if stations is None else stations
+        end = len(stations) if limit is None else min(len(stations), offset + limit)
+        for idx in range(offset, end):
+            yield copy.copy(self._entry(stations[idx]))
+
+    def page(self, page: int = 0, page_size: int = 20,
+             stations: Optional[Sequence[NewsStation]] = None) -> List[FeaturedEntry]:
+        """ a single page of featured entries """
+        return list(self.iter_entries(page * page_size, page_size, stations))
+
+    def playlist(self, stations: Optional[Sequence[NewsStation]] = None) -> Playlist:
+        """ the full featured playlist, safe to be modified by the caller """
+        entries = Playlist(title=self.title)
+        for entry in self.iter_entries(stations=stations):
+            entries.append(entry)
+        return entries
+
+    def __len__(self) -> int:
+        return len(self.stations)
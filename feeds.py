@@ -0,0 +1,212 @@
+import time
+from dataclasses import asdict, dataclass, replace
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass(frozen=True)
+class ResolvedStream:
+    uri: str  # concrete, directly playable url
+    title: str = ""
+    resolved_at: float = 0.0
+
+
+def latest_enclosure(feed: bytes) -> Optional[ResolvedStream]:
+    """
+    Finds the newest audio enclosure of a RSS/Atom feed
+
+    Args:
+        feed: The raw feed document
+
+    Returns:
+        The latest episode, or None if the feed has no playable items
+    """
+    import feedparser  # slow import, only needed for feeds that are not well formed xml
+    parsed = feedparser.parse(feed)
+    entries = [e for e in parsed.entries if e.get("enclosures")]
+    if not entries:
+        return None
+    if all(e.get("published_parsed") for e in entries):
+        entries = sorted(entries, key=lambda e: e.published_parsed, reverse=True)
+    entry = entries[0]
+    enclosure = next((enc for enc in entry.enclosures
+                      if enc.get("type", "").startswith(("audio", "video"))),
+                     entry.enclosures[0])
+    return ResolvedStream(uri=enclosure["href"], title=entry.get("title", ""),
+                          resolved_at=time.time())
+
+
+@dataclass
+class FeedStats:
+    requests: int = 0
+    not_modified: int = 0  # 304 answers, the feed was not downloaded at all
+    early_exits: int = 0  # downloads stopped after the first episode
+    fallbacks: int = 0  # feeds that are not well formed xml, parsed completely with feedparser
+    bytes_read: int = 0
+    bytes_saved: int = 0  # bytes of the feeds that never had to be downloaded
+
+
+@dataclass(frozen=True)
+class _FeedState:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size: int = 0  # full document size, 0 if unknown
+    stream: Optional[ResolvedStream] = None
+
+
+def _local_name(tag) -> str:
+    """ element name without its namespace, eg. {http://www.w3.org/2005/Atom}entry -> entry """
+    return tag.rsplit("}", 1)[-1].lower() if isinstance(tag, str) else ""
+
+
+class FirstEpisodeParser:
+    """
+    Incremental RSS/Atom parser that stops at the first item with an audio/video enclosure.
+
+    Feeds list their newest episode first, so only the beginning of the document needs
+    to be downloaded. Chunks are fed as they arrive and parsed items are discarded.
+    """
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._depth = 0  # > 0 inside an item/entry
+        self._title = ""
+        self._enclosures: List[dict] = []
+
+    def feed(self, chunk: bytes) -> Optional[ResolvedStream]:
+        """
+        Returns:
+            The first episode as soon as it was parsed, None while more data is needed
+
+        Raises:
+            xml.etree.ElementTree.ParseError: if the document is not well formed
+        """
+        self._parser.feed(chunk)
+        for event, elem in self._parser.read_events():
+            name = _local_name(elem.tag)
+            if event == "start":
+                if name in ("item", "entry") or self._depth:
+                    self._depth += 1
+                continue
+            if not self._depth:
+                continue
+            self._depth -= 1
+            if self._depth:
+                if name == "title" and not self._title:
+                    self._title = (elem.text or "").strip()
+                elif name == "enclosure" and elem.get("url"):
+                    self._enclosures.append({"href": elem.get("url"), "type": elem.get("type", "")})
+                elif name == "link" and elem.get("rel") == "enclosure" and elem.get("href"):
+                    self._enclosures.append({"href": elem.get("href"), "type": elem.get("type", "")})
+                continue
+            # end of an item
+            if self._enclosures:
+                enclosure = next((enc for enc in self._enclosures
+                                  if enc["type"].startswith(("audio", "video"))),
+                                 self._enclosures[0])
+                return ResolvedStream(uri=enclosure["href"], title=self._title, resolved_at=time.time())
+            self._title = ""
+            elem.clear()
+        return None
+
+
+class FeedRefresher:
+    """
+    Fetches the latest episode of RSS/Atom feeds with conditional, streaming requests.
+
+    Every request carries the ETag / Last-Modified validators of the previous answer,
+    unchanged feeds answer 304 and are never downloaded again. Changed feeds are parsed
+    while they download and the transfer stops after the first episode, large podcast
+    feeds are mostly never read. Connections are pooled and kept alive.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = 10,
+                 chunk_size: int = 8 * 1024, pool_size: int = 10):
+        """
+        Args:
+            session: HTTP session to share, a pooled session is created if not given
+            timeout: HTTP timeout in seconds
+            chunk_size: Bytes read at a time, the download stops at the first chunk with a complete episode
+            pool_size: Keep-alive connections per host of the created session
+        """
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.states: Dict[str, _FeedState] = {}  # feed url -> validators of the last answer
+        self._stats = FeedStats()
+        self._lock = Lock()
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return asdict(self._stats)
+
+    def _count(self, **values):
+        with self._lock:
+            for key, value in values.items():
+                setattr(self._stats, key, getattr(self._stats, key) + value)
+
+    def fetch(self, url: str) -> Optional[ResolvedStream]:
+        """
+        Finds the latest episode of a feed, downloading as little of it as possible
+
+        Returns:
+            The latest episode, None if the feed has no playable items
+
+        Raises:
+            requests.RequestException: if the feed can not be downloaded
+        """
+        state = self.states.get(url, _FeedState())
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        with self.session.get(url, timeout=self.timeout, stream=True, headers=headers) as response:
+            if response.status_code == 304:
+                self._count(requests=1, not_modified=1, bytes_saved=state.size)
+                return replace(state.stream, resolved_at=time.time()) if state.stream else None
+            response.raise_for_status()
+            size = int(response.headers.get("Content-Length") or 0)
+            stream, complete = self._parse(response)
+            read = response.raw.tell()
+            if complete:
+                size = size or read
+        self._count(requests=1, bytes_read=read, early_exits=0 if complete else 1,
+                    bytes_saved=max(0, size - read))
+        self.states[url] = _FeedState(etag=response.headers.get("ETag"),
+                                      last_modified=response.headers.get("Last-Modified"),
+                                      size=size, stream=stream)
+        return stream
+
+    def _parse(self, response: requests.Response) -> Tuple[Optional[ResolvedStream], bool]:
+        """
+        Returns:
+            (first episode, True if the whole document was read)
+        """
+        parser = FirstEpisodeParser()
+        chunks = []
+        body = response.iter_content(self.chunk_size)
+        for chunk in body:
+            chunks.append(chunk)
+            try:
+                stream = parser.feed(chunk)
+            except ParseError:
+                # not well formed (html entities, broken markup), feedparser is lenient
+                self._count(fallbacks=1)
+                return latest_enclosure(b"".join(chunks + list(body))), True
+            if stream is not None:
+                return stream, False
+        return None, True
+
+    def shutdown(self):
+        self.session.close()
@@ -0,0 +1,172 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from threading import BoundedSemaphore, Lock
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import requests
+from json_database import JsonStorage
+from ovos_utils.log import LOG
+from requests.adapters import HTTPAdapter
+
+from .stations import NewsStation
+
+
+@dataclass(frozen=True)
+class StationHealth:
+    available: bool
+    latency: float = 0.0  # seconds until the response headers arrived
+    failures: int = 0  # consecutive failed probes
+    checked_at: float = 0.0
+
+
+def probe_url(station: NewsStation) -> str:
+    """ the url that must be reachable for a station to play, the feed/page for extractor uris """
+    return station.stream if station.extractor_id else station.uri
+
+
+class HealthChecker:
+    """
+    Probes station urls concurrently and keeps track of their availability and latency.
+
+    Probes share a pooled keep-alive HTTP session and at most `per_host` requests hit the
+    same host at once. Results are persisted, so rankings survive restarts without
+    waiting for a new round of probes. A round in which every probe fails is not recorded,
+    the checker can not tell a dead station from a device without network.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 5, max_workers: int = 8,
+                 per_host: int = 2, failure_threshold: int = 3, slow_latency: float = 3.0,
+                 unavailable_penalty: float = 20, slow_penalty: float = 10):
+        """
+        Args:
+            path: json file where results are persisted, None to keep them in memory only
+            timeout: Seconds to wait for a station to answer
+            max_workers: Number of concurrent probes
+            per_host: Maximum concurrent probes against the same host
+            failure_threshold: Consecutive failures after which a station is excluded from results
+            slow_latency: Stations answering slower than this (seconds) are down-ranked
+            unavailable_penalty: Score penalty of stations whose last probe failed
+            slow_penalty: Score penalty of slow stations
+        """
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.failure_threshold = failure_threshold
+        self.slow_latency = slow_latency
+        self.unavailable_penalty = unavailable_penalty
+        self.slow_penalty = slow_penalty
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._hosts: Dict[str, BoundedSemaphore] = {}
+        self._lock = Lock()
+        self._penalties = None  # (stations, version, penalties)
+        self.version = 0  # incremented whenever a result changes
+        self.records: Dict[str, StationHealth] = {}
+        self.storage = JsonStorage(path) if path else None
+        for uri, record in (self.storage or {}).items():
+            try:
+                self.records[uri] = StationHealth(**record)
+            except TypeError:
+                LOG.warning(f"Ignoring invalid health record for {uri}")
+
+    def _host_limit(self, url: str) -> BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def probe(self, station: NewsStation) -> StationHealth:
+        """ checks if a station answers, never raises """
+        url = probe_url(station)
+        previous = self.records.get(station.uri)
+        failures = previous.failures if previous else 0
+        with self._host_limit(url):
+            start = time.monotonic()
+            try:
+                with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                    latency = time.monotonic() - start
+                    available = response.status_code < 400
+            except Exception as e:
+                LOG.debug(f"Health check failed for {url}: {e}")
+                latency = time.monotonic() - start
+                available = False
+        return StationHealth(available=available, latency=round(latency, 3),
+                             failures=0 if available else failures + 1,
+                             checked_at=time.time())
+
+    def check(self, stations: Iterable[NewsStation]) -> List[NewsStation]:
+        """
+        Probes all stations concurrently and persists the results
+
+        Returns:
+            Stations whose ranking penalty changed
+        """
+        stations = list({s.uri: s for s in stations}.values())
+        if not stations:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(self.probe, stations))
+        if not any(health.available for health in results):
+            # most likely the device is offline (eg. booted before the network is up), not every station
+            LOG.warning(f"All {len(stations)} health probes failed, ignoring this round")
+            return []
+        changed = []
+        with self._lock:
+            for station, health in zip(stations, results):
+                if self.penalty(station) != self._penalty(health):
+                    changed.append(station)
+                self.records[station.uri] = health
+            if changed:
+                self.version += 1
+        self.save()
+        return changed
+
+    def save(self):
+        if self.storage is None:
+            return
+        self.storage.clear()
+        self.storage.update({uri: asdict(r) for uri, r in self.records.items()})
+        self.storage.store()
+
+    def _penalty(self, health: Optional[StationHealth]) -> float:
+        if health is None:
+            return 0  # never checked
+        if health.failures >= self.failure_threshold:
+            return float("inf")
+        if not health.available:
+            return self.unavailable_penalty
+        if health.latency > self.slow_latency:
+            return self.slow_penalty
+        return 0
+
+    def penalty(self, station: NewsStation) -> float:
+        """ score penalty of a station, inf if it should be excluded """
+        return self._penalty(self.records.get(station.uri))
+
+    def is_dead(self, station: NewsStation) -> bool:
+        return self.penalty(station) == float("inf")
+
+    def penalties(self, stations: Sequence[NewsStation]) -> Optional[List[float]]:
+        """
+        Penalties aligned with a station sequence, computed once per catalog and health version
+
+        Returns:
+            None if no station is penalized
+        """
+        version = self.version
+        cached = self._penalties
+        if cached is not None and cached[0] is stations and cached[1] == version:
+            return cached[2]
+        penalties = [self.penalty(s) for s in stations]
+        if not any(penalties):
+            penalties = None
+        self._penalties = (stations, version, penalties)
+        return penalties
+
+    def shutdown(self):
+        self.session.close()
@@ -0,0 +1,125 @@
+import time
+from contextlib import nullcontext
+from threading import Lock
+from typing import Dict, Sequence, Tuple
+
+# histogram upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_DISABLED = nullcontext()
+
+
+class Histogram:
+    """ cumulative latency histogram, in the Prometheus bucket layout """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> Dict[str, int]:
+        """ le -> number of observations <= le """
+        total, result = 0, {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result["+Inf" if bound == float("inf") else repr(bound)] = total
+        return result
+
+    def as_dict(self) -> dict:
+        return {"count": self.count, "sum": self.sum,
+                "mean": self.sum / self.count if self.count else 0.0,
+                "buckets": self.cumulative()}
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics: 'QueryMetrics', key: Tuple[str, str]):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.metrics.observe(self.key[0], self.key[1], time.perf_counter() - self.start)
+
+
+class QueryMetrics:
+    """
+    Per stage latency histograms and counters of the query hot paths.
+
+    Stages are labelled by operation (eg. search_news) and stage (eg. score).
+    When disabled, stage() returns a shared no-op context manager and count()
+    returns immediately, so instrumented code pays a single attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self._lock = Lock()
+
+    def stage(self, operation: str, stage: str):
+        """ context manager timing a stage of an operation """
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, (operation, stage))
+
+    def observe(self, operation: str, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get((operation, stage))
+            if histogram is None:
+                histogram = self.histograms[(operation, stage)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, operation: str, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[(operation, name)] = self.counters.get((operation, name), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        """ json serializable copy of all metrics, by operation """
+        result = {}
+        with self._lock:
+            for (operation, stage), histogram in self.histograms.items():
+                result.setdefault(operation, {"stages": {}, "counters": {}})["stages"][stage] = histogram.as_dict()
+            for (operation, name), value in self.counters.items():
+                result.setdefault(operation, {"stages": {}, "counters": {}})["counters"][name] = value
+        return result
+
+    def prometheus(self, prefix: str = "ovos_news") -> str:
+        """ all metrics in the Prometheus text exposition format """
+        lines = [f"# HELP {prefix}_stage_seconds Latency of each stage of a news query",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        with self._lock:
+            for (operation, stage), histogram in sorted(self.histograms.items()):
+                labels = f'operation="{operation}",stage="{stage}"'
+                for le, count in histogram.cumulative().items():
+                    lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {histogram.count}")
+            lines += [f"# HELP {prefix}_query_total Counters of the news query hot paths",
+                      f"# TYPE {prefix}_query_total counter"]
+            for (operation, name), value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_query_total{{operation="{operation}",counter="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
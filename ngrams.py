@@ -0,0 +1,83 @@
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """ case-insensitive word tokens """
+    return _TOKEN.findall(text.lower())
+
+
+def char_ngrams(token: str, n: int = 3) -> Set[str]:
+    """ padded character n-grams of a single token, eg. "npr" -> {" np", "npr", "pr "} """
+    padded = f" {token} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class NgramIndex:
+    """
+    Inverted index of station titles and aliases, used to prune the stations
+    that are sent to full fuzzy matching.
+
+    Both whole tokens and character n-grams are indexed, phrase grams are weighted
+    by inverse document frequency so generic words such as "news" or "radio" do not
+    select half of the catalog.
+    """
+
+    def __init__(self, names: Sequence[Iterable[str]], n: int = 3):
+        """
+        Args:
+            names: For each station (by position) the strings that identify it (title and aliases)
+            n: Character n-gram size
+        """
+        self.n = n
+        self.size = len(names)
+        self.postings: Dict[str, List[int]] = {}
+        for idx, station_names in enumerate(names):
+            for gram in self._grams(" ".join(station_names)):
+                self.postings.setdefault(gram, []).append(idx)
+        self.idf: Dict[str, float] = {gram: math.log(1 + self.size / len(posting))
+                                      for gram, posting in self.postings.items()}
+
+    def _grams(self, text: str) -> Set[str]:
+        grams = set()
+        for token in tokenize(text):
+            grams.add(f"#{token}")  # whole token
+            grams |= char_ngrams(token, self.n)
+        return grams
+
+    def candidates(self, phrase: str, min_overlap: float = 0.75,
+                   max_candidates: int = 50) -> Optional[List[int]]:
+        """
+        Returns the stations sharing enough n-grams with the phrase
+
+        Args:
+            phrase: The user search phrase.
+            min_overlap: Minimum fraction (idf weighted) of the phrase grams a station must contain.
+            max_candidates: Maximum number of candidates, best overlapping stations are kept.
+
+        Returns:
+            Sorted station positions, or None if the phrase does not select any station
+            and a full scan is needed.
+        """
+        phrase_grams = self._grams(phrase)
+        grams = [g for g in phrase_grams if g in self.postings]
+        if not grams:
+            return None
+        # grams unknown to the catalog still count towards the total weight
+        total = sum(self.idf.get(g, math.log(1 + self.size)) for g in phrase_grams)
+        overlap: Dict[int, float] = {}
+        for gram in grams:
+            weight = self.idf[gram]
+            for idx in self.postings[gram]:
+                overlap[idx] = overlap.get(idx, 0) + weight
+        selected = [idx for idx, w in overlap.items() if w >= total * min_overlap]
+        if not selected:
+            return None
+        if len(selected) > max_candidates:
+            selected = sorted(selected, key=lambda idx: overlap[idx], reverse=True)[:max_candidates]
+        return sorted(selected)
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+from ovos_utils.log import LOG
+
+from .cache import TTLCache
+from .feeds import FeedRefresher, ResolvedStream
+from .stations import NewsStation
+
+
+def resolve_with_ocp(station: NewsStation) -> Optional[ResolvedStream]:
+    """ resolves any extractor uri (eg. news//) with the installed OCP stream extractor plugins """
+    from ovos_plugin_manager.ocp import load_stream_extractors
+    xtract = load_stream_extractors()
+    if station.extractor_id not in xtract.supported_seis:
+        return None
+    meta = xtract.extract_stream(station.uri, video=False)
+    if not meta or not meta.get("uri") or meta["uri"] == station.uri:
+        return None
+    return ResolvedStream(uri=meta["uri"], title=meta.get("title", ""), resolved_at=time.time())
+
+
+class StreamResolver:
+    """
+    Resolves station extractor uris (rss//, news//, youtube.channel.live//) to the
+    concrete url of the latest episode ahead of time, results are kept in a TTL cache.
+
+    rss// feeds are fetched with conditional, streaming requests over a pooled HTTP
+    session (see FeedRefresher), other extractors are delegated to the installed OCP
+    stream extractor plugins.
+    """
+
+    def __init__(self, ttl: float = 1800, max_workers: int = 4, timeout: float = 10,
+                 resolvers: Optional[Dict[str, Callable[[NewsStation], Optional[ResolvedStream]]]] = None):
+        """
+        Args:
+            ttl: Seconds a resolved stream is considered fresh
+            max_workers: Number of stations resolved concurrently
+            timeout: HTTP timeout in seconds
+            resolvers: extractor_id -> resolver function, overrides the default resolvers
+        """
+        self.cache = TTLCache(maxsize=1024, ttl=ttl)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.feeds = FeedRefresher(self.session, timeout)
+        self.resolvers = {"rss": self._resolve_rss}
+        self.resolvers.update(resolvers or {})
+
+    def _resolve_rss(self, station: NewsStation) -> Optional[ResolvedStream]:
+        return self.feeds.fetch(station.stream)
+
+    def resolve(self, station: NewsStation) -> Optional[ResolvedStream]:
+        """
+        Resolves a station now and caches the result
+
+        Returns:
+            The resolved stream, None if the station can not be resolved
+        """
+        if not station.extractor_id:
+            return None  # already a direct stream
+        resolver = self.resolvers.get(station.extractor_id, resolve_with_ocp)
+        try:
+            resolved = resolver(station)
+        except Exception as e:
+            LOG.warning(f"Failed to resolve {station.uri}: {e}")
+            return None
+        if resolved is not None:
+            self.cache.put(station.uri, resolved)
+        return resolved
+
+    def get(self, station: NewsStation) -> Optional[ResolvedStream]:
+        """ the cached resolved stream, only if still fresh, never blocks """
+        if not station.extractor_id:
+            return None
+        return self.cache.get(station.uri)
+
+    def refresh(self, stations: Iterable[NewsStation]) -> List[NewsStation]:
+        """
+        Resolves stations concurrently
+
+        Returns:
+            Stations whose resolved url changed
+        """
+        stations = [s for s in stations if s.extractor_id]
+        if not stations:
+            return []
+        previous = {s.uri: self.cache.get(s.uri) for s in stations}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            resolved = list(pool.map(self.resolve, stations))
+        changed = []
+        for station, stream in zip(stations, resolved):
+            if stream is None:
+                continue  # the last known stream is served until it expires
+            old = previous.get(station.uri)
+            if old is None or stream.uri != old.uri:
+                changed.append(station)
+        return changed
+
+    def shutdown(self):
+        self.session.close()
@@ -0,0 +1,558 @@
+import heapq
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ovos_utils.parse import match_one, MatchStrategy
+
+if TYPE_CHECKING:
+    from .stations import NewsStation
+
+try:
+    import numpy as np
+except ImportError:  # optional, pure python scoring is used as fallback
+    np = None
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # optional, ovos_utils.parse.match_one is used as fallback
+    fuzz = process = None
+
+
+def sort_tokens(text: str) -> str:
+    """ the token normalization applied by rapidfuzz token_sort_ratio """
+    return " ".join(sorted(text.split()))
+
+
+def score_station(phrase: str, station: 'NewsStation', target_langs: Sequence[str],
+                  explicit_langs: bool, country: str, base_score: float = 0,
+                  alias_score: Optional[float] = None) -> float:
+    """
+    Calculates the relevance score of a single station, reference implementation of StationScorer
+
+    Args:
+        phrase: The user search phrase.
+        station: The news station to score.
+        target_langs: The languages the user wants news in.
+        explicit_langs: True if target_langs were explicitly requested by the user.
+        country: Country code of the user location.
+        base_score: Initial score to start from.
+        alias_score: Precomputed fuzzy match score (0-1) of the phrase against the station aliases.
+
+    Returns:
+        The match confidence, capped at 100.
+    """
+    if alias_score is None:
+        # match name
+        _, alias_score = match_one(phrase, list(station.aliases) or [station.title],
+                                   strategy=MatchStrategy.TOKEN_SORT_RATIO)
+
+    match_confidence = base_score + alias_score * 50
+
+    # match languages
+    if explicit_langs:  # if specific lang was requested
+        if any([lang in target_langs for lang in station.langs]):
+            match_confidence += 30  # explicitly requested lang match bonus
+        else:
+            match_confidence -= 20  # wrong language penalty
+    elif station.lang in target_langs:
+        # if no languages explicitly requested, assume user prefers their native lang
+        match_confidence += 10  # known main language bonus
+
+    # match country code
+    if country in station.countries:
+        match_confidence += 20  # bonus for news stations from user location
+
+    # default news feed gets a nice bonus
+    if station.is_default:
+        match_confidence += 10
+
+    return min([match_confidence, 100])
+
+
+class StationScorer:
+    """
+    Batched scoring engine over a fixed sequence of stations.
+
+    All aliases are tokenized and token-sorted once, so a query is scored against the
+    whole alias matrix with a single rapidfuzz call, language/country/default bonuses
+    are then applied as vector operations.
+
+    Scores are identical to score_station, which is used when numpy or rapidfuzz are not available
+    """
+
+    def __init__(self, stations: Sequence['NewsStation'], _aliases: 'StationScorer' = None):
+        self.stations: Sequence['NewsStation'] = stations if isinstance(stations, Sequence) \
+            else tuple(stations)
+        if _aliases is not None:
+            # same stations, different default flags, reuse the tokenized aliases
+            self.sorted_aliases = _aliases.sorted_aliases
+            self.offsets = _aliases.offsets
+        else:
+            self.sorted_aliases: List[str] = []
+            self.offsets: List[int] = []
+            for station in self.stations:
+                self.offsets.append(len(self.sorted_aliases))
+                self.sorted_aliases += [sort_tokens(a) for a in station.aliases or [station.title]]
+
+        # map every station to small lookup tables, per-query checks are done once per unique value
+        self.catalog_langs, lang_ids = self._factorize(s.lang for s in self.stations)
+        self.langsets, langset_ids = self._factorize(s.langs for s in self.stations)
+        self.countrysets, countryset_ids = self._factorize(s.countries for s in self.stations)
+        self._set_columns(lang_ids, langset_ids, countryset_ids,
+                          [s.is_default for s in self.stations],
+                          [s.world_news for s in self.stations])
+
+    @classmethod
+    def from_columns(cls, stations: Sequence['NewsStation'], sorted_aliases: List[str],
+                     offsets: List[int], catalog_langs: list, lang_ids: Sequence[int],
+                     langsets: list, langset_ids: Sequence[int],
+                     countrysets: list, countryset_ids: Sequence[int],
+                     is_default: Sequence[bool], world_news: Sequence[bool]) -> 'StationScorer':
+        """
+        Scorer over precomputed columns (eg. a compiled catalog), the station records are not read
+
+        Args:
+            stations: Station records, only accessed for the returned matches
+            sorted_aliases: Token sorted aliases (title if a station has no aliases) of all stations
+            offsets: Position of the first alias of each station in sorted_aliases
+            catalog_langs / langsets / countrysets: Unique station lang, langs and countries values
+            lang_ids / langset_ids / countryset_ids: Per station position in the unique values
+            is_default / world_news: Per station flags
+        """
+        scorer = cls.__new__(cls)
+        scorer.stations = stations
+        scorer.sorted_aliases = sorted_aliases
+        scorer.offsets = offsets
+        scorer.catalog_langs = catalog_langs
+        scorer.langsets = langsets
+        scorer.countrysets = countrysets
+        scorer._set_columns(lang_ids, langset_ids, countryset_ids, is_default, world_news)
+        return scorer
+
+    def _set_columns(self, lang_ids, langset_ids, countryset_ids, is_default, world_news):
+        # (target_langs, explicit_langs, country) -> bonus tables, a handful of combinations repeat
+        self._tables = {}
+        if np is not None:
+            self._lang_ids = np.asarray(lang_ids, dtype=np.intp)
+            self._langset_ids = np.asarray(langset_ids, dtype=np.intp)
+            self._countryset_ids = np.asarray(countryset_ids, dtype=np.intp)
+            self._offsets = np.asarray(self.offsets, dtype=np.intp)
+            self._is_default = np.asarray(is_default, dtype=bool)
+            self._world_news = np.asarray(world_news, dtype=bool)
+
+    @staticmethod
+    def _factorize(values: Iterable) -> Tuple[list, List[int]]:
+        uniques, ids, lut = [], [], {}
+        for v in values:
+            if v not in lut:
+                lut[v] = len(uniques)
+                uniques.append(v)
+            ids.append(lut[v])
+        return uniques, ids
+
+    @property
+    def vectorized(self) -> bool:
+        return np is not None and process is not None
+
+    def with_stations(self, stations: Sequence['NewsStation']) -> 'StationScorer':
+        """ new scorer for the same stations (in the same order) with updated flags """
+        return StationScorer(stations, _aliases=self)
+
+    def alias_scores(self, phrase: str, subset: Optional[Sequence[int]] = None):
+        """
+        best fuzzy match (0-1) of phrase against the aliases of each station
+
+        Args:
+            phrase: The user search phrase.
+            subset: Optional station positions, if given only those stations are matched (in that order)
+        """
+        if self.vectorized:
+            if not len(self.stations if subset is None else subset):
+                return np.zeros(0)
+            if subset is None:
+                choices, offsets = self.sorted_aliases, self._offsets
+            else:
+                choices, offsets = [], []
+                for i in subset:
+                    offsets.append(len(choices))
+                    choices += self.sorted_aliases[self.offsets[i]:self._alias_end(i)]
+            matrix = process.cdist([sort_tokens(phrase)], choices,
+                                   scorer=fuzz.ratio, dtype=np.float64)[0]
+            return np.maximum.reduceat(matrix, offsets) / 100
+        stations = self.stations if subset is None else [self.stations[i] for i in subset]
+        return [match_one(phrase, list(s.aliases) or [s.title],
+                          strategy=MatchStrategy.TOKEN_SORT_RATIO)[1]
+                for s in stations]
+
+    def _alias_end(self, i: int) -> int:
+        return self.offsets[i + 1] if i + 1 < len(self.offsets) else len(self.sorted_aliases)
+
+    def score(self, phrase: str, target_langs: Sequence[str], explicit_langs: bool,
+              country: str, base_score: float = 0, allowed_langs: Optional[Iterable[str]] = None,
+              world_only=False, local_only=False, world_news: Optional[bool] = None,
+              threshold: float = 50, candidates: Optional[Sequence[int]] = None,
+              penalties: Optional[Sequence[float]] = None,
+              stats: Optional[dict] = None) -> List[Tuple['NewsStation', float]]:
+        """
+        Scores all stations matching the filters in a single batch
+
+        Args:
+            phrase: The user search phrase.
+            target_langs: The languages the user wants news in.
+            explicit_langs: True if target_langs were explicitly requested by the user.
+            country: Country code of the user location.
+            base_score: Initial score to start from.
+            allowed_langs: Only score stations from these catalog languages, if None all are scored.
+            world_only: If True, only scores world news feeds.
+            local_only: If True, only scores local news feeds.
+            world_news: If not None, stations flagged as world news get a +10 bonus if True, -10 penalty if False.
+            threshold: Only stations scoring strictly above this value are returned.
+            candidates: Optional sorted station positions, if given only those stations are scored.
+            penalties: Optional per station penalty (eg. unreachable feeds) aligned with the catalog,
+                       subtracted after the cap, inf excludes a station.
+            stats: Optional dict, the number of scanned stations is added to "scanned".
+
+        Returns:
+            (station, score) tuples in catalog order
+        """
+        if not self.vectorized:
+            return self._score_python(phrase, target_langs, explicit_langs, country, base_score,
+                                      allowed_langs, world_only, local_only, world_news, threshold,
+                                      candidates, penalties, stats)
+
+        idx = self._filter(allowed_langs, world_only, local_only, candidates)
+        if stats is not None:
+            stats["scanned"] = stats.get("scanned", 0) + len(idx)
+        if not len(idx):
+            return []
+        # when nothing is filtered out the full alias matrix is scored in one call
+        subset = None if len(idx) == len(self.stations) else idx
+        scores = self._adjust(base_score + self.alias_scores(phrase, subset) * 50, idx,
+                              self._bonus_tables(target_langs, explicit_langs, country),
+                              explicit_langs, world_news, penalties)
+        keep = np.flatnonzero(scores > threshold)
+        return [(self.stations[idx[i]], float(scores[i])) for i in keep]
+
+    def top_k(self, phrase: str, target_langs: Sequence[str], explicit_langs: bool,
+              country: str, k: int, base_score: float = 0, allowed_langs: Optional[Iterable[str]] = None,
+              world_only=False, local_only=False, world_news: Optional[bool] = None,
+              threshold: float = 50, candidates: Optional[Sequence[int]] = None,
+              penalties: Optional[Sequence[float]] = None,
+              stats: Optional[dict] = None) -> List[Tuple['NewsStation', float]]:
+        """
+        The k best stations, identical to the first k of score() sorted by relevance
+
+        The bonuses are known before fuzzy matching, so the best possible score of every
+        station (a perfect alias match) is computed first. Stations whose upper bound can't
+        beat the threshold are never matched, the others are matched in descending upper
+        bound order until the upper bound drops below the k-th best score.
+
+        Args:
+            k: Maximum number of results
+            stats: Optional dict, the number of matched stations is added to "scanned" and the
+                   number of stations skipped by their upper bound to "pruned".
+            (all other arguments as in score)
+
+        Returns:
+            (station, score) tuples, best first, ties in catalog order
+        """
+        if k <= 0:
+            return []
+        if not self.vectorized:
+            return self._top_k_python(phrase, target_langs, explicit_langs, country, k, base_score,
+                                      allowed_langs, world_only, local_only, world_news, threshold,
+                                      candidates, penalties, stats)
+
+        idx = self._filter(allowed_langs, world_only, local_only, candidates)
+        tables = self._bonus_tables(target_langs, explicit_langs, country)
+        # a perfect alias match is the best score a station can get
+        upper = self._adjust(np.full(len(idx), base_score + 50.0), idx, tables,
+                             explicit_langs, world_news, penalties)
+        viable = upper > threshold
+        idx, upper = idx[viable], upper[viable]
+        # stable, stations with the same upper bound stay in catalog order
+        order = np.argsort(-upper, kind="stable")
+        idx, upper = idx[order], upper[order]
+        groups = np.flatnonzero(np.diff(upper)) + 1
+
+        best_idx = np.zeros(0, dtype=np.intp)
+        best_scores = np.zeros(0)
+        scanned = 0
+        for start, end in zip(np.concatenate(([0], groups)), np.concatenate((groups, [len(idx)]))):
+            # a station can only tie with the k-th best, never beat it
+            if len(best_scores) == k and upper[start] < best_scores[-1]:
+                break
+            group = idx[start:end]
+            scanned += len(group)
+            scores = self._adjust(base_score + self.alias_scores(phrase, group) * 50, group, tables,
+                                  explicit_langs, world_news, penalties)
+            keep = scores > threshold
+            best_idx = np.concatenate((best_idx, group[keep]))
+            best_scores = np.concatenate((best_scores, scores[keep]))
+            top = np.lexsort((best_idx, -best_scores))[:k]
+            best_idx, best_scores = best_idx[top], best_scores[top]
+        if stats is not None:
+            stats["scanned"] = stats.get("scanned", 0) + scanned
+            stats["pruned"] = stats.get("pruned", 0) + len(viable) - scanned
+        return [(self.stations[i], float(s)) for i, s in zip(best_idx, best_scores)]
+
+    def upper_bound(self, target_langs: Sequence[str], explicit_langs: bool, country: str,
+                    base_score: float = 0, allowed_langs: Optional[Iterable[str]] = None,
+                    world_only=False, local_only=False, world_news: Optional[bool] = None,
+                    exclude: Optional[Sequence[int]] = None,
+                    penalties: Optional[Sequence[float]] = None) -> float:
+        """
+        Best score any station matching the filters could reach, a perfect alias match
+
+        Args:
+            exclude: Optional station positions left out, eg. candidates that were already scored
+            (all other arguments as in score)
+
+        Returns:
+            The highest upper bound, -inf if no station is left
+        """
+        if not self.vectorized:
+            if allowed_langs is not None:
+                allowed_langs = set(allowed_langs)
+            excluded = set(exclude or ())
+            best = float("-inf")
+            for i, station in enumerate(self.stations):
+                if i in excluded:
+                    continue
+                if allowed_langs is not None and station.lang not in allowed_langs:
+                    continue
+                if world_only and not station.world_news:
+                    continue
+                if local_only and station.world_news:
+                    continue
+                s = score_station("", station, target_langs, explicit_langs, country,
+                                  base_score, alias_score=1.0)
+                if world_news is not None and station.world_news:
+                    s += 10 if world_news else -10
+                if penalties is not None:
+                    s -= penalties[i]
+                best = max(best, s)
+            return best
+
+        idx = self._filter(allowed_langs, world_only, local_only, None)
+        if exclude is not None and len(exclude):
+            idx = idx[~np.isin(idx, np.asarray(exclude, dtype=np.intp))]
+        if not len(idx):
+            return float("-inf")
+        upper = self._adjust(np.full(len(idx), base_score + 50.0), idx,
+                             self._bonus_tables(target_langs, explicit_langs, country),
+                             explicit_langs, world_news, penalties)
+        return float(upper.max())
+
+    def exact_matches(self, name: str) -> List[int]:
+        """ positions of the stations with an alias (title if they have none) identical to name """
+        if getattr(self, "_exact", None) is None:
+            exact = {}
+            for i, start in enumerate(self.offsets):
+                for alias in self.sorted_aliases[start:self._alias_end(i)]:
+                    exact.setdefault(alias, []).append(i)
+            self._exact = exact
+        return self._exact.get(sort_tokens(name), [])
+
+    def iter_top(self, phrase: str, target_langs: Sequence[str], explicit_langs: bool,
+                 country: str, k: int, base_score: float = 0, allowed_langs: Optional[Iterable[str]] = None,
+                 world_only=False, local_only=False, world_news: Optional[bool] = None,
+                 threshold: float = 50, candidates: Optional[Sequence[int]] = None,
+                 penalties: Optional[Sequence[float]] = None, first: Optional[Sequence[int]] = None,
+                 cap: Optional[float] = None, stats: Optional[dict] = None) -> Iterator[Tuple['NewsStation', float]]:
+        """
+        Yields the results of top_k in the same order, each one as soon as it is final
+
+        Stations in `first` (eg. exact keyword hits) are matched before all others, the rest
+        in descending upper bound order like top_k. A result is yielded once no station left
+        to match can beat it, or tie it while coming first in the catalog.
+
+        Args:
+            first: Optional station positions to match first, only changes how early results are known
+            cap: Optional maximum applied to the scores when ordering them (not to the yielded
+                 scores), eg. 100 to order like a stable sort of score() by match confidence
+            (all other arguments as in top_k)
+        """
+        if k <= 0:
+            return
+        if not self.vectorized:
+            results = self._top_k_python(phrase, target_langs, explicit_langs, country, k, base_score,
+                                         allowed_langs, world_only, local_only, world_news, threshold,
+                                         candidates, penalties, stats)
+            if cap is not None:
+                results = sorted(results, key=lambda r: -min(r[1], cap))
+            yield from results
+            return
+
+        def key(value):
+            return value if cap is None else min(value, cap)
+
+        idx = self._filter(allowed_langs, world_only, local_only, candidates)
+        tables = self._bonus_tables(target_langs, explicit_langs, country)
+        upper = self._adjust(np.full(len(idx), base_score + 50.0), idx, tables,
+                             explicit_langs, world_news, penalties)
+        viable = upper > threshold
+        idx, upper = idx[viable], upper[viable]
+        order = np.argsort(-upper, kind="stable")
+        idx, upper = idx[order], upper[order]
+        hits = idx[np.isin(idx, np.asarray(first or [], dtype=np.intp))]
+        if len(hits):
+            idx, upper = idx[~np.isin(idx, hits)], upper[~np.isin(idx, hits)]
+        starts = np.flatnonzero(np.diff(upper)) + 1
+        groups = np.split(idx, starts) if len(idx) else []
+        bounds = [key(float(upper[i])) for i in np.concatenate(([0], starts)).astype(int)] if len(idx) else []
+        # lowest catalog position of the stations left that share a group's (capped) bound
+        tie_min = [int(g.min()) for g in groups]
+        for j in range(len(groups) - 2, -1, -1):
+            if bounds[j + 1] == bounds[j]:
+                tie_min[j] = min(tie_min[j], tie_min[j + 1])
+        batches = [hits] + groups
+
+        pending = []  # (-ordering score, position, score) heap
+        scanned = emitted = 0
+        try:
+            for b, group in enumerate(batches):
+                if len(group):
+                    scanned += len(group)
+                    scores = self._adjust(base_score + self.alias_scores(phrase, group) * 50, group, tables,
+                                          explicit_langs, world_news, penalties)
+                    keep = scores > threshold
+                    for i, score in zip(group[keep], scores[keep]):
+                        heapq.heappush(pending, (-key(float(score)), int(i), float(score)))
+                # batch b + 1 is groups[b], the best station left can score bounds[b]
+                while pending:
+                    ordering, i, score = -pending[0][0], pending[0][1], pending[0][2]
+                    if b < len(groups) and not (ordering > bounds[b] or
+                                                (ordering == bounds[b] and i < tie_min[b])):
+                        break
+                    heapq.heappop(pending)
+                    yield self.stations[i], score
+                    emitted += 1
+                    if emitted == k:
+                        return
+        finally:
+            if stats is not None:
+                stats["scanned"] = stats.get("scanned", 0) + scanned
+                stats["pruned"] = stats.get("pruned", 0) + len(viable) - scanned
+
+    def _filter(self, allowed_langs, world_only, local_only, candidates):
+        """ positions of the stations matching the filters, in catalog order """
+        mask = np.ones(len(self.stations), dtype=bool)
+        if allowed_langs is not None:
+            allowed_langs = set(allowed_langs)
+            mask &= np.array([l in allowed_langs for l in self.catalog_langs], dtype=bool)[self._lang_ids]
+        if world_only:
+            mask &= self._world_news
+        if local_only:
+            mask &= ~self._world_news
+        if candidates is not None:
+            idx = np.array(candidates, dtype=np.intp)
+            return idx[mask[idx]]
+        return np.flatnonzero(mask)
+
+    def _bonus_tables(self, target_langs, explicit_langs, country):
+        """ per unique lang / langs / countries value, if it earns the language and country bonuses """
+        key = (tuple(target_langs), explicit_langs, country)
+        tables = self._tables.get(key)
+        if tables is None:
+            if len(self._tables) >= 256:
+                self._tables = {}
+            tables = self._tables[key] = self._build_bonus_tables(target_langs, explicit_langs, country)
+        return tables
+
+    def _build_bonus_tables(self, target_langs, explicit_langs, country):
+        if explicit_langs:
+            lang_match = np.array([any([l in target_langs for l in ls]) for ls in self.langsets], dtype=bool)
+        else:
+            lang_match = np.array([l in target_langs for l in self.catalog_langs], dtype=bool)
+        country_match = np.array([country in cs for cs in self.countrysets], dtype=bool)
+        return lang_match, country_match
+
+    def _adjust(self, scores, idx, tables, explicit_langs, world_news, penalties):
+        """ applies the bonuses of stations idx to their base + alias scores, in score_station order """
+        lang_match, country_match = tables
+        # match languages
+        if explicit_langs:
+            scores += np.where(lang_match[self._langset_ids[idx]], 30, -20)
+        else:
+            scores += np.where(lang_match[self._lang_ids[idx]], 10, 0)
+        # match country code
+        scores += np.where(country_match[self._countryset_ids[idx]], 20, 0)
+        # default news feed bonus
+        scores += np.where(self._is_default[idx], 10, 0)
+        scores = np.minimum(scores, 100)
+
+        if world_news is not None:
+            scores += np.where(self._world_news[idx], 10 if world_news else -10, 0)
+        if penalties is not None:
+            scores -= np.asarray(penalties, dtype=float)[idx]
+        return scores
+
+    def _score_python(self, phrase, target_langs, explicit_langs, country, base_score,
+                      allowed_langs, world_only, local_only, world_news, threshold,
+                      candidates=None, penalties=None, stats=None):
+        if allowed_langs is not None:
+            allowed_langs = set(allowed_langs)
+        positions = range(len(self.stations)) if candidates is None else candidates
+        results = []
+        scanned = 0
+        for i in positions:
+            station = self.stations[i]
+            if allowed_langs is not None and station.lang not in allowed_langs:
+                continue
+            if world_only and not station.world_news:
+                continue
+            if local_only and station.world_news:
+                continue
+            scanned += 1
+            s = score_station(phrase, station, target_langs, explicit_langs, country, base_score)
+            if world_news is not None and station.world_news:
+                s += 10 if world_news else -10
+            if penalties is not None:
+                s -= penalties[i]
+            if s <= threshold:
+                continue
+            results.append((station, s))
+        if stats is not None:
+            stats["scanned"] = stats.get("scanned", 0) + scanned
+        return results
+
+    def _top_k_python(self, phrase, target_langs, explicit_langs, country, k, base_score,
+                      allowed_langs, world_only, local_only, world_news, threshold,
+                      candidates=None, penalties=None, stats=None):
+        if allowed_langs is not None:
+            allowed_langs = set(allowed_langs)
+        positions = range(len(self.stations)) if candidates is None else candidates
+        heap = []  # (score, -position), the k-th best on top
+        scanned = pruned = 0
+        for i in positions:
+            station = self.stations[i]
+            if allowed_langs is not None and station.lang not in allowed_langs:
+                continue
+            if world_only and not station.world_news:
+                continue
+            if local_only and station.world_news:
+                continue
+            adjust = (10 if world_news else -10) if world_news is not None and station.world_news else 0
+            penalty = penalties[i] if penalties is not None else 0
+            upper = score_station(phrase, station, target_langs, explicit_langs, country,
+                                  base_score, alias_score=1.0) + adjust - penalty
+            # later stations lose ties, so they must beat the k-th best
+            if upper <= threshold or (len(heap) == k and upper <= heap[0][0]):
+                pruned += 1
+                continue
+            scanned += 1
+            s = score_station(phrase, station, target_langs, explicit_langs, country, base_score)
+            if world_news is not None and station.world_news:
+                s += 10 if world_news else -10
+            if penalties is not None:
+                s -= penalties[i]
+            if s <= threshold:
+                continue
+            if len(heap) < k:
+                heapq.heappush(heap, (s, -i))
+            elif (s, -i) > heap[0]:
+                heapq.heapreplace(heap, (s, -i))
+        if stats is not None:
+            stats["scanned"] = stats.get("scanned", 0) + scanned
+            stats["pruned"] = stats.get("pruned", 0) + pruned
+        return [(self.stations[-neg_i], s) for s, neg_i in sorted(heap, reverse=True)]
@@ -0,0 +1,28 @@
+"""compiles News.json into News.keywords.json, the station names registered with OCP at startup
+
+News.json stays the editable source of truth, run this script again after modifying it,
+the skill ignores (and logs) a News.keywords.json that is out of date.
+
+The skill compiles its own memory mapped News.catalog into its data folder. Pass a catalog
+path to also compile one here, to check that a station list compiles and how long it takes.
+
+usage: python scripts/compile_catalog.py [News.json] [News.keywords.json] [News.catalog]
+"""
+import sys
+import time
+from os.path import dirname
+
+from skill_ovos_news.catalog import compile_catalog, compile_keywords
+
+root = dirname(dirname(__file__)) or "."
+source = sys.argv[1] if len(sys.argv) > 1 else f"{root}/News.json"
+keywords = sys.argv[2] if len(sys.argv) > 2 else f"{root}/News.keywords.json"
+target = sys.argv[3] if len(sys.argv) > 3 else None
+
+count = compile_keywords(source, keywords)
+print(f"wrote {count} keywords into {keywords}")
+if target:
+    start = time.perf_counter()
+    count = compile_catalog(source, target)
+    print(f"compiled {count} stations from {source} into {target} "
+          f"in {time.perf_counter() - start:.2f}s")
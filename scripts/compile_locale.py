@@ -0,0 +1,21 @@
+"""compiles the vocabulary files of every language into locale/<lang>/bundle.json, loaded by the skill in one read
+
+The .voc files stay the editable source of truth, run this script
+again after modifying them (scripts/sync_translations.py does it), the skill ignores
+(and logs) a bundle that is out of date and reads the files instead.
+
+usage: python scripts/compile_locale.py [locale folder]
+"""
+import sys
+import time
+from os.path import dirname
+
+from skill_ovos_news.bundles import compile_bundles
+
+root = dirname(dirname(__file__)) or "."
+locale = sys.argv[1] if len(sys.argv) > 1 else f"{root}/locale"
+
+start = time.perf_counter()
+compiled = compile_bundles(locale)
+print(f"compiled {sum(compiled.values())} resource files of {len(compiled)} languages "
+      f"in {time.perf_counter() - start:.2f}s")
@@ -80,3 +80,8 @@ for lang in os.listdir(tx):
                 with open(f"{locale}/{lang.lower()}/{fid}", "w") as f:
                     f.write("\n".join(sorted(samples)))
 
+
+# the skill loads the compiled bundles, keep them in sync with the files
+from skill_ovos_news.bundles import compile_bundles
+
+compile_bundles(locale)
@@ -0,0 +1,194 @@
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from ovos_utils.log import LOG
+
+from .stations import EXTRACTOR_IDS, NewsStation
+
+_LANG = re.compile(r"^[a-zA-Z]{2,3}([-_][a-zA-Z0-9]{2,8})*$")
+_URI = re.compile(r"^(?:(?:" + "|".join(re.escape(x) for x in EXTRACTOR_IDS) + r")//)?https?://\S+$")
+
+
+@dataclass
+class IngestStats:
+    lines: int = 0  # parsed lines / rows
+    added: int = 0  # new stations
+    merged: int = 0  # rows merged as aliases of the previous station
+    invalid: int = 0
+    duplicates: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def _split(value: Union[str, list, None]) -> List[str]:
+    """ list values are "|" separated in CSV files """
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split("|") if v.strip()]
+    return [str(v).strip() for v in value if v and str(v).strip()]
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def normalize_record(record: dict) -> Tuple[str, str, dict]:
+    """
+    Validates an external station record and converts it to a News.json entry
+
+    Records use the News.json station keys (aliases, uri, image, secondary_langs,
+    world_news, alt_uris) plus "lang" and a station name ("title", "feed" or the
+    news.csv "sample" column).
+
+    Returns:
+        (feed, lang, config) as expected by NewsStation.from_config
+
+    Raises:
+        ValueError: if the record is not a valid station
+    """
+    label = record.get("label")
+    if label and label != "news_provider":
+        raise ValueError(f"unsupported label: {label}")
+    lang = (record.get("lang") or "").strip()
+    if not _LANG.match(lang):
+        raise ValueError(f"invalid lang: {lang!r}")
+    uri = (record.get("uri") or "").strip()
+    if not _URI.match(uri):
+        raise ValueError(f"invalid uri: {uri!r}")
+    aliases = _split(record.get("aliases"))
+    feed = (record.get("feed") or record.get("title") or record.get("sample") or "").strip()
+    feed = feed or (aliases[0] if aliases else "")
+    if not feed:
+        raise ValueError("station has no name")
+    sample = (record.get("sample") or "").strip()
+    if sample and sample not in aliases:
+        aliases.append(sample)
+    config = {"aliases": aliases, "uri": uri}
+    if record.get("title"):
+        config["title"] = record["title"].strip()
+    for key in ("image", "bg_image"):
+        if record.get(key):
+            config[key] = record[key].strip()
+    for key in ("secondary_langs", "alt_uris"):
+        values = _split(record.get(key))
+        if values:
+            config[key] = values
+    if _flag(record.get("world_news")):
+        config["world_news"] = True
+    return feed, lang.replace("_", "-"), config
+
+
+class CatalogSource:
+    """
+    Streams stations from an operator supplied JSONL or CSV file.
+
+    The file is parsed line by line and stations are yielded in batches, so memory
+    is bounded by the batch size and not by the size of the file.
+
+    CSV files have the news.csv columns (label, sample) plus uri and lang, optional columns
+    use the News.json keys with "|" separated lists. Consecutive rows of the same station
+    (same lang and uri) are merged, each sample becomes an alias.
+    """
+
+    def __init__(self, source: Union[str, IO[str]], fmt: Optional[str] = None,
+                 batch_size: int = 1000, default_bg: str = "",
+                 known: Iterable[Tuple[str, str]] = ()):
+        """
+        Args:
+            source: Path or text file object
+            fmt: "jsonl" or "csv", guessed from the file extension if not given
+            batch_size: Number of stations per batch
+            default_bg: Background image for stations without one
+            known: (standardized lang, uri) of stations that are already indexed, they are skipped
+        """
+        self.source = source
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        self.fmt = (fmt or ("csv" if str(name).lower().endswith(".csv") else "jsonl")).lower()
+        if self.fmt not in ("csv", "jsonl"):
+            raise ValueError(f"unsupported catalog format: {fmt}")
+        self.batch_size = max(1, batch_size)
+        self.default_bg = default_bg
+        self.seen: Set[Tuple[str, str]] = set(known)
+        self.stats = IngestStats()
+
+    def _records(self, f: IO[str]) -> Iterator[Tuple[int, dict]]:
+        if self.fmt == "csv":
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield line, row
+            return
+        for line, text in enumerate(f, start=1):
+            text = text.strip()
+            if not text:
+                continue
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as e:
+                self.stats.invalid += 1
+                LOG.debug(f"{self.source}:{line} invalid json: {e}")
+                continue
+            if isinstance(record, dict):
+                yield line, record
+            else:
+                self.stats.invalid += 1
+
+    def _configs(self, f: IO[str]) -> Iterator[Tuple[str, str, dict]]:
+        """ normalized records, consecutive rows of the same station merged """
+        pending = None
+        for line, record in self._records(f):
+            self.stats.lines += 1
+            try:
+                feed, lang, config = normalize_record(record)
+            except ValueError as e:
+                self.stats.invalid += 1
+                LOG.debug(f"{self.source}:{line} skipped: {e}")
+                continue
+            if pending is not None and (pending[1], pending[2]["uri"]) == (lang, config["uri"]):
+                aliases = pending[2]["aliases"]
+                aliases += [a for a in config["aliases"] if a not in aliases]
+                self.stats.merged += 1
+                continue
+            if pending is not None:
+                yield pending
+            pending = (feed, lang, config)
+        if pending is not None:
+            yield pending
+
+    def _stations(self) -> Iterator[NewsStation]:
+        if isinstance(self.source, str):
+            with open(self.source, newline="", encoding="utf-8") as f:
+                yield from self._stations_from(f)
+        else:
+            yield from self._stations_from(self.source)
+
+    def _stations_from(self, f: IO[str]) -> Iterator[NewsStation]:
+        for feed, lang, config in self._configs(f):
+            station = NewsStation.from_config(feed, lang, config, self.default_bg)
+            key = (station.lang, station.uri)
+            if key in self.seen:
+                self.stats.duplicates += 1
+                continue
+            self.seen.add(key)
+            self.stats.added += 1
+            yield station
+
+    def __iter__(self) -> Iterator[List[NewsStation]]:
+        """ yields lists of at most batch_size new stations """
+        start = time.perf_counter()
+        batch = []
+        for station in self._stations():
+            batch.append(station)
+            if len(batch) >= self.batch_size:
+                self.stats.batches += 1
+                yield batch
+                batch = []
+        if batch:
+            self.stats.batches += 1
+            yield batch
+        self.stats.seconds = time.perf_counter() - start
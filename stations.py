@@ -0,0 +1,329 @@
+import sys
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from itertools import chain
+from os.path import dirname
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ovos_utils.lang import standardize_lang_tag
+from ovos_utils.ocp import MediaEntry, MediaType, PlaybackType, PluginStream
+
+from .ngrams import NgramIndex
+from .scoring import StationScorer
+
+# stream extractor prefixes understood by the OCP extractor plugins
+EXTRACTOR_IDS = ("news", "rss", "youtube.channel.live")
+
+IMAGES_DIR = f"{dirname(__file__)}/res/images/"
+
+# catalogs repeat a handful of language tags, standardizing them is comparatively slow
+_standardize_lang = lru_cache(maxsize=512)(standardize_lang_tag)
+
+# lang and country sets are repeated by most stations, a single instance of each is kept
+_SHARED_SETS: Dict[FrozenSet[str], FrozenSet[str]] = {}
+
+
+def intern_all(values: Iterable[str]) -> Tuple[str, ...]:
+    """ interned copies of strings that are repeated across stations (aliases, lang tags, paths) """
+    return tuple(sys.intern(v) for v in values)
+
+
+def shared_set(values: Iterable[str]) -> FrozenSet[str]:
+    """ the single shared frozenset instance equal to values """
+    values = frozenset(intern_all(values))
+    return _SHARED_SETS.setdefault(values, values)
+
+
+def split_extractor(uri: str) -> Tuple[Optional[str], Optional[str]]:
+    """ (extractor_id, stream) of an OCP extractor uri, (None, None) for direct streams """
+    for xid in EXTRACTOR_IDS:
+        if uri.startswith(f"{xid}//"):
+            return xid, uri.split(f"{xid}//")[-1]
+    return None, None
+
+
+@dataclass(frozen=True, slots=True)
+class NewsStation:
+    """
+    Read-only, fully normalized news station record.
+
+    All fields that used to be recomputed by every query (standardized lang tags,
+    country codes, image paths, extractor id and stream) are resolved once when
+    the catalog is compiled. Records have no instance dict, repeated strings are
+    interned and lang/country sets are shared between stations.
+    """
+    feed: str  # key in News.json
+    title: str
+    uri: str
+    lang: str  # standardized lang tag of the catalog section
+    aliases: Tuple[str, ...] = ()
+    secondary_langs: Tuple[str, ...] = ()
+    alt_uris: Tuple[str, ...] = ()
+    langs: FrozenSet[str] = frozenset()  # standardized lang + secondary_langs
+    countries: FrozenSet[str] = frozenset()  # country suffixes of langs
+    image: str = ""
+    bg_image: str = ""
+    extractor_id: Optional[str] = None
+    stream: Optional[str] = None
+    world_news: bool = False
+    is_default: bool = False
+
+    @staticmethod
+    def from_config(feed: str, lang: str, config: dict,
+                    default_bg: str = "") -> 'NewsStation':
+        """
+        Compiles a raw News.json entry into a station record.
+
+        Args:
+            feed: The station key inside its language section.
+            lang: The (raw) language section the station belongs to.
+            config: The raw station dictionary, it is never modified.
+            default_bg: Background image used when the station does not define one.
+
+        Returns:
+            A NewsStation with all derived fields precomputed.
+        """
+        std_lang = sys.intern(_standardize_lang(lang))
+        secondary_langs = intern_all(config.get("secondary_langs") or [])
+        langs = shared_set([std_lang] + [_standardize_lang(l) for l in secondary_langs])
+        countries = shared_set(l.rsplit("-", 1)[-1] for l in langs if "-" in l)
+        uri = config.get("uri") or ""
+        extractor_id, stream = split_extractor(uri)
+        return NewsStation(feed=feed,
+                           title=config.get("title") or feed,
+                           uri=uri,
+                           lang=std_lang,
+                           aliases=intern_all(config.get("aliases") or []),
+                           secondary_langs=secondary_langs,
+                           alt_uris=tuple(config.get("alt_uris") or []),
+                           langs=langs,
+                           countries=countries,
+                           image=sys.intern(config.get("image", "").replace("./res/images/", IMAGES_DIR)),
+                           bg_image=sys.intern(config.get("bg_image") or default_bg),
+                           extractor_id=extractor_id,
+                           stream=stream,
+                           world_news=bool(config.get("world_news", False)))
+
+    def as_dict(self, skill_icon: str = "") -> dict:
+        """
+        Returns a new dictionary in the format historically returned by NewsSkill.read_db
+
+        Args:
+            skill_icon: Value for the "skill_logo" key.
+
+        Returns:
+            A fresh dictionary, safe to be modified by the caller.
+        """
+        entry = {
+            "aliases": list(self.aliases),
+            "uri": self.uri,
+            "image": self.image,
+            "secondary_langs": list(self.secondary_langs),
+            "lang": self.lang,
+            "title": self.title,
+            "bg_image": self.bg_image,
+            "skill_logo": skill_icon,
+            "playback": PlaybackType.AUDIO,
+            "media_type": MediaType.NEWS
+        }
+        if self.alt_uris:
+            entry["alt_uris"] = list(self.alt_uris)
+        if self.world_news:
+            entry["world_news"] = True
+        if self.is_default:
+            entry["is_default"] = True
+        if self.extractor_id:
+            entry["extractor_id"] = self.extractor_id
+            entry["stream"] = self.stream
+        return entry
+
+    def entry(self, match_confidence: float = 0, uri: Optional[str] = None,
+              image: Optional[str] = None) -> Union[PluginStream, MediaEntry]:
+        """
+        Builds the OCP entry of this station directly, same as dict2entry(self.as_dict())
+
+        Args:
+            match_confidence: Score of the entry, capped at 100
+            uri: Directly playable url replacing the extractor stream, eg. a downloaded bulletin
+            image: Image replacing the station image, eg. a cached thumbnail
+
+        Returns:
+            A PluginStream for extractor uris, a MediaEntry for direct streams or if uri is given
+
+        Raises:
+            ValueError: if the station has no uri
+        """
+        match_confidence = min(100, match_confidence)
+        image = image or self.image
+        if uri is None and self.extractor_id:
+            return PluginStream(stream=self.stream, extractor_id=self.extractor_id, title=self.title,
+                                image=image, match_confidence=match_confidence,
+                                playback=PlaybackType.AUDIO, media_type=MediaType.NEWS)
+        uri = uri or self.uri
+        if not uri:
+            raise ValueError(f"station {self.feed} has no uri")
+        return MediaEntry(uri=uri, title=self.title, image=image, match_confidence=match_confidence,
+                          playback=PlaybackType.AUDIO, media_type=MediaType.NEWS)
+
+
+@dataclass
+class CatalogDiff:
+    """ differences between two versions of the station catalog """
+    added: List[NewsStation]
+    removed: List[NewsStation]
+    changed: List[Tuple[NewsStation, NewsStation]]  # (old, new)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> Dict[str, int]:
+        return {"added": len(self.added), "removed": len(self.removed), "changed": len(self.changed)}
+
+
+class StationIndex:
+    """
+    Immutable, precompiled index over the News.json catalog.
+
+    Stations are grouped by their standardized language so queries only need to
+    filter and score, the catalog is never walked to normalize data again.
+    A new index is built whenever the catalog or the default feeds change,
+    an existing index is never modified.
+    """
+
+    def __init__(self, stations: Iterable[NewsStation],
+                 default_feeds: Optional[Dict[str, str]] = None,
+                 key: tuple = (), _scorer: Optional[StationScorer] = None,
+                 _ngrams: Optional[NgramIndex] = None):
+        self.key = key
+        self.default_feeds = dict(default_feeds or {})
+        by_lang: Dict[str, List[NewsStation]] = {}
+        for station in stations:
+            if self.default_feeds.get(station.lang) == station.feed:
+                station = replace(station, is_default=True)
+            elif station.is_default:
+                station = replace(station, is_default=False)
+            by_lang.setdefault(station.lang, []).append(station)
+        self._set_groups({l: tuple(s) for l, s in by_lang.items()})
+        self._scorer: Optional[StationScorer] = None
+        self._ngrams: Optional[NgramIndex] = None
+        if _scorer is not None and len(_scorer.stations) == len(self.stations):
+            self._scorer = _scorer.with_stations(self.stations)
+        if _ngrams is not None and _ngrams.size == len(self.stations):
+            self._ngrams = _ngrams
+
+    def _set_groups(self, by_lang: Dict[str, Sequence[NewsStation]]):
+        self.by_lang: Dict[str, Sequence[NewsStation]] = by_lang
+        self.stations: Sequence[NewsStation] = tuple(chain.from_iterable(by_lang.values()))
+
+    @property
+    def scorer(self) -> StationScorer:
+        """ batched scorer over all stations, built on first use """
+        if self._scorer is None:
+            self._scorer = self._build_scorer()
+        return self._scorer
+
+    @property
+    def ngrams(self) -> NgramIndex:
+        """ n-gram index of station names, built on first use """
+        if self._ngrams is None:
+            self._ngrams = NgramIndex(self.names())
+        return self._ngrams
+
+    def _build_scorer(self) -> StationScorer:
+        return StationScorer(self.stations)
+
+    def names(self) -> Sequence[Tuple[str, ...]]:
+        """ title and aliases of every station, by position """
+        return [(s.title,) + s.aliases for s in self.stations]
+
+    @staticmethod
+    def from_archive(archive: dict, default_feeds: Optional[Dict[str, str]] = None,
+                     default_bg: str = "", key: tuple = ()) -> 'StationIndex':
+        """
+        Compiles the raw News.json contents into a StationIndex
+
+        Args:
+            archive: Mapping of lang -> {feed: config}, as stored in News.json
+            default_feeds: Mapping of standardized lang -> default feed name
+            default_bg: Background image for stations without one
+            key: Opaque value describing the inputs this index was built from
+
+        Returns:
+            A new StationIndex
+        """
+        stations = [NewsStation.from_config(feed, lang, config, default_bg)
+                    for lang, feeds in archive.items()
+                    for feed, config in feeds.items()]
+        return StationIndex(stations, default_feeds, key)
+
+    def with_defaults(self, default_feeds: Dict[str, str], key: tuple = ()) -> 'StationIndex':
+        """
+        Returns a new index sharing the compiled records of this one, but
+        flagging a different set of default feeds.
+        """
+        return StationIndex(self.stations, default_feeds, key,
+                            _scorer=self.scorer, _ngrams=self._ngrams)
+
+    def extend(self, stations: Iterable[NewsStation], key: Optional[tuple] = None) -> 'StationIndex':
+        """
+        Returns a new index with additional stations appended to their language groups.
+
+        Only the new stations are normalized, the existing records are shared with this index.
+        The scorer and n-gram index of the new index are built on first use.
+
+        Args:
+            stations: The stations to add
+            key: Opaque value describing the inputs of the new index, defaults to the key of this index
+        """
+        added = StationIndex(stations, self.default_feeds)
+        groups = dict(self.by_lang)
+        for lang, group in added.by_lang.items():
+            groups[lang] = tuple(groups.get(lang, ())) + group
+        index = StationIndex((), self.default_feeds, self.key if key is None else key)
+        index._set_groups(groups)
+        return index
+
+    def close(self):
+        """ releases the files the stations are read from, must not be called while queries use the index """
+
+    @property
+    def langs(self) -> List[str]:
+        return list(self.by_lang)
+
+    def keywords(self) -> List[str]:
+        """ all unique station names and aliases, for OCP keyword registration """
+        return list(dict.fromkeys(chain.from_iterable(s.aliases + (s.feed,) for s in self.stations)))
+
+    def diff(self, other: 'StationIndex') -> 'CatalogDiff':
+        """ stations added, removed or modified in other, stations are identified by lang and feed """
+        old = {(s.lang, s.feed): s for s in self.stations}
+        new = {(s.lang, s.feed): s for s in other.stations}
+        return CatalogDiff(added=[s for k, s in new.items() if k not in old],
+                           removed=[s for k, s in old.items() if k not in new],
+                           changed=[(old[k], s) for k, s in new.items() if k in old and old[k] != s])
+
+    def filter(self, langs: Iterable[str] = None, world_only=False,
+               local_only=False) -> Iterator[NewsStation]:
+        """
+        Iterates stations matching the requested news type
+
+        Args:
+            langs: Only include stations from these catalog languages, if None all languages are included
+            world_only: If True, includes only world news feeds.
+            local_only: If True, includes only local news feeds.
+        """
+        groups = self.by_lang.values() if langs is None else \
+            [self.by_lang[l] for l in langs if l in self.by_lang]
+        for group in groups:
+            for station in group:
+                if world_only and not station.world_news:
+                    continue
+                if local_only and station.world_news:
+                    continue
+                yield station
+
+    def __len__(self):
+        return len(self.stations)
+
+    def __iter__(self) -> Iterator[NewsStation]:
+        return iter(self.stations)
@@ -0,0 +1,262 @@
+"""search, scoring and startup benchmarks over synthetic station catalogs
+
+Synthetic catalogs are built by replicating the News.json stations (renamed, keeping
+their language sections) up to the requested size, every core path of a FakeBus
+backed skill is then timed over a fixed utterance corpus.
+
+usage:
+    python test/benchmarks/benchmark.py --save test/benchmarks/baseline.json
+    python test/benchmarks/benchmark.py --compare test/benchmarks/baseline.json
+    python test/benchmarks/benchmark.py --memory
+
+--compare exits with status 1 if any path got slower (p95) or used more memory (peak)
+than the baseline by more than --tolerance, --memory reports the memory held by the station records and the
+allocations of every query instead
+"""
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, List
+
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+from ovos_utils.fakebus import FakeBus
+from ovos_utils.ocp import MediaType
+
+from skill_ovos_news import NewsSkill
+
+NEWS_JSON = join(dirname(dirname(dirname(__file__))), "News.json")
+SKILL_ID = "ovos-skill-news.openvoiceos"
+SIZES = [100, 1000, 10000, 100000]
+MEMORY_SIZES = [10000, 100000]
+
+# fixed utterance corpus, station names, languages and generic requests
+CORPUS = ["NPR", "npr news", "bbc", "portuguese news", "play the news", "world news",
+          "portuguese world news", "euronews", "catalan news", "news in spanish", "german news",
+          "CBC", "fox news", "latest news", "finnish news", "dutch news", "english world news",
+          "Associated press", "rtp", "DLF", "ekot", "yle", "sky news", "tell me the news"]
+
+
+def synthetic_catalog(size: int, source: str = NEWS_JSON) -> dict:
+    """ News.json replicated up to size stations, copies get a numbered name, aliases and uri """
+    with open(source) as f:
+        archive = json.load(f)
+    originals = [(lang, feed, config) for lang, feeds in archive.items() for feed, config in feeds.items()]
+    catalog = {lang: {} for lang in archive}
+    for i in range(size):
+        lang, feed, config = originals[i % len(originals)]
+        copy = i // len(originals)
+        if copy:
+            config = dict(config,
+                          aliases=[f"{a} {copy}" for a in config.get("aliases", [])],
+                          uri=f"{config['uri']}#{copy}")
+            feed = f"{feed} {copy}"
+        catalog[lang][feed] = config
+    return catalog
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    samples = sorted(samples)
+    k = (len(samples) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(samples) - 1)
+    return samples[lo] + (samples[hi] - samples[lo]) * (k - lo)
+
+
+def measure(func: Callable[[], None], calls: int) -> Dict[str, float]:
+    """ latency percentiles over calls, then the peak memory of one more call """
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"calls": calls,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "peak_kb": round(peak / 1024, 1)}
+
+
+def build_skill(catalog_path: str) -> NewsSkill:
+    skill = NewsSkill()
+    skill.archive_path = catalog_path
+    skill.compiled_path = catalog_path.replace(".json", ".catalog")
+    skill._startup(FakeBus(), SKILL_ID)
+    # measure the real work, not the search cache (not via settings, those are persisted)
+    skill.search_cache.maxsize = 0
+    skill.play_media = lambda *args, **kwargs: None
+    skill.speak_dialog = lambda *args, **kwargs: None
+    skill.acknowledge = lambda: None
+    return skill
+
+
+def bench_size(size: int, repeat: int = 3, compiled: bool = False) -> Dict[str, dict]:
+    with TemporaryDirectory() as tmp:
+        path = join(tmp, "News.json")
+        with open(path, "w") as f:
+            json.dump(synthetic_catalog(size), f)
+        if compiled:
+            from skill_ovos_news.catalog import compile_catalog
+            compile_catalog(path, path.replace(".json", ".catalog"))
+        skill = build_skill(path)
+        stations = skill.stations.stations
+        corpus = CORPUS * repeat
+        queries = iter(corpus * 4)
+        results = {}
+
+        def initialize():
+            skill._stations = None
+            skill.initialize()
+            skill.stations.scorer  # built lazily on the first query otherwise
+
+        results["initialize"] = measure(initialize, repeat)
+        results["read_db"] = measure(lambda: skill.read_db(langs=["pt-PT"]), repeat)
+        results["read_db_all"] = measure(lambda: skill.read_db(), repeat)
+        station_iter = iter([stations[i % len(stations)] for i in range(len(corpus) + 1)])
+        results["_score"] = measure(lambda: skill._score(next(queries), next(station_iter)), len(corpus))
+        results["search_news"] = measure(lambda: skill.search_news(next(queries), MediaType.NEWS), len(corpus))
+        results["search_news_generic"] = measure(lambda: skill.search_news(next(queries), MediaType.GENERIC),
+                                                 len(corpus))
+        results["news_playlist"] = measure(skill.news_playlist, repeat)
+        utterances = iter(corpus * 2 + corpus[:2])
+        results["handle_play_the_news"] = measure(
+            lambda: skill.handle_play_the_news(Message("", {"utterance": next(utterances)})), len(corpus))
+        results["handle_global_news"] = measure(
+            lambda: skill.handle_global_news(Message("", {"utterance": next(utterances)})), len(corpus))
+        skill.shutdown()
+    return results
+
+
+def peak_kb(func: Callable[[], None]) -> float:
+    """ peak memory allocated while func runs """
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def bench_memory(size: int, repeat: int = 3) -> Dict[str, float]:
+    """ memory held by the station records of a catalog and allocated per query """
+    from skill_ovos_news.stations import StationIndex
+    catalog = synthetic_catalog(size)
+    gc.collect()
+    tracemalloc.start()
+    index = StationIndex.from_archive(catalog)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    gc.collect()
+    gc_ms = (time.perf_counter() - start) * 1000
+    del index
+    with TemporaryDirectory() as tmp:
+        path = join(tmp, "News.json")
+        with open(path, "w") as f:
+            json.dump(catalog, f)
+        skill = build_skill(path)
+        skill.stations.scorer
+        skill.stations.ngrams
+        queries = CORPUS * repeat
+        search = [peak_kb(lambda: skill.search_news(q, MediaType.NEWS)) for q in queries]
+        read_db = peak_kb(skill.read_db)
+        skill.shutdown()
+    return {"index_kb": round(held / 1024, 1),
+            "bytes_per_station": round(held / size),
+            "gc_ms": round(gc_ms, 2),
+            "search_news_peak_kb": round(percentile(search, 95), 1),
+            "read_db_all_peak_kb": read_db}
+
+
+def run(sizes: List[int], repeat: int = 3, compiled: bool = False) -> dict:
+    report = {"meta": {"python": platform.python_version(),
+                       "machine": platform.machine(),
+                       "compiled": compiled,
+                       "repeat": repeat,
+                       "corpus": len(CORPUS)},
+              "results": {}}
+    for size in sizes:
+        start = time.perf_counter()
+        report["results"][str(size)] = bench_size(size, repeat, compiled)
+        print(f"{size} stations benchmarked in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    report["meta"]["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.25, min_ms: float = 1.0,
+            min_kb: float = 64) -> List[str]:
+    """
+    Compares a report against a baseline
+
+    Args:
+        tolerance: Allowed relative increase
+        min_ms / min_kb: Absolute increases below these are noise and never a regression
+
+    Returns:
+        Description of every regression
+    """
+    regressions = []
+    for size, paths in report["results"].items():
+        for path, current in paths.items():
+            previous = baseline.get("results", {}).get(size, {}).get(path)
+            if previous is None:
+                continue
+            for metric, floor in (("p95_ms", min_ms), ("peak_kb", min_kb)):
+                old, new = previous[metric], current[metric]
+                if new > old * (1 + tolerance) and new - old > floor:
+                    regressions.append(f"{size} stations {path} {metric}: {old} -> {new}")
+    return regressions
+
+
+def print_report(report: dict):
+    print(f"{'stations':>8} {'path':<22} {'p50 ms':>10} {'p95 ms':>10} {'peak kb':>10}")
+    for size, paths in report["results"].items():
+        for path, r in paths.items():
+            print(f"{size:>8} {path:<22} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['peak_kb']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the utterance corpus")
+    parser.add_argument("--compiled", action="store_true", help="load the catalogs as compiled News.catalog files")
+    parser.add_argument("--save", help="write the results as a json baseline")
+    parser.add_argument("--compare", help="baseline json to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--memory", action="store_true", help="memory of the station records and per query")
+    args = parser.parse_args()
+
+    LOG.set_level("ERROR")
+    if args.memory:
+        sizes = args.sizes if args.sizes != SIZES else MEMORY_SIZES
+        print(f"{'stations':>8} {'index kb':>10} {'B/station':>10} {'gc ms':>8} {'search p95 kb':>14} {'read_db kb':>11}")
+        for size in sizes:
+            r = bench_memory(size, args.repeat)
+            print(f"{size:>8} {r['index_kb']:>10.1f} {r['bytes_per_station']:>10} {r['gc_ms']:>8.2f} "
+                  f"{r['search_news_peak_kb']:>14.1f} {r['read_db_all_peak_kb']:>11.1f}")
+        return
+    report = run(args.sizes, args.repeat, args.compiled)
+    print_report(report)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
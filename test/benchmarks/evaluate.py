@@ -0,0 +1,266 @@
+"""ranking accuracy and latency of search_news over the news.csv provider samples and generic requests
+
+Every news_provider sample is turned into utterance variants (the bare name, and the name
+combined with the "news" vocabulary of the session language), generic requests such as
+"the news" or "public radio" are added as they are. Every utterance is searched for with
+and without the NEWS media type, in sessions of several languages and locations. Queries
+run in a process pool, every worker owns its own FakeBus backed skill.
+
+A provider query is correct if the first result is a station known by that name (title,
+feed or alias in News.json), top-3 if it is among the first three results. Samples that
+no station is known by are reported but not scored.
+
+Every query is also ranked by the reference scorer, the per station score_station over
+all stations without pruning or top-k, and the first result and the number of results
+must be the same. Optimizations must not change who wins.
+
+usage:
+    python test/benchmarks/evaluate.py --save test/benchmarks/evaluation.json
+    python test/benchmarks/evaluate.py --compare test/benchmarks/evaluation.json
+    python test/benchmarks/evaluate.py --settings '{"prune_candidates": true}'
+
+exits with status 1 if any query differs from the reference scorer, or with --compare
+if the winning station of any utterance changed
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from os.path import dirname, join
+from typing import Dict, List, Optional, Set, Tuple
+
+from benchmark import percentile
+
+ROOT = dirname(dirname(dirname(__file__)))
+NEWS_CSV = join(ROOT, "news.csv")
+NEWS_JSON = join(ROOT, "News.json")
+SKILL_ID = "ovos-skill-news.openvoiceos"
+# session language -> location country code
+PROFILES = {"en-US": "US", "en-GB": "GB", "pt-PT": "PT", "de-DE": "DE", "es-ES": "ES"}
+# requests that don't name a provider, generic words match many stations
+GENERIC = ["the news", "news", "radio news", "public radio", "latest news", "world news"]
+MEDIA_TYPES = ("news", "generic")
+
+_skill = None  # the skill of a worker process
+_reference = None  # same catalog, ranked by the reference scorer
+
+
+def load_samples(path: str = NEWS_CSV, label: str = "news_provider") -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return list(dict.fromkeys(row["sample"] for row in csv.DictReader(f) if row["label"] == label))
+
+
+def known_names(path: str = NEWS_JSON) -> Dict[str, Set[str]]:
+    """ casefolded station name/alias -> titles of the stations known by it """
+    from skill_ovos_news.stations import StationIndex
+    with open(path, encoding="utf-8") as f:
+        index = StationIndex.from_archive(json.load(f))
+    names = {}
+    for station in index:
+        for name in (station.feed, station.title) + station.aliases:
+            names.setdefault(name.casefold(), set()).add(station.title)
+    return names
+
+
+def variants(sample: str, news_words: List[str]) -> List[str]:
+    """ utterances asking for a provider, with and without the localized word for news """
+    if not news_words:
+        return [sample]
+    return [sample, f"{sample} {news_words[0]}", f"{news_words[0]} {sample}"]
+
+
+def _location(country: str) -> dict:
+    return {"city": {"code": "", "name": "",
+                     "state": {"code": "", "name": "", "country": {"code": country, "name": country}}}}
+
+
+def _start_skill(settings: dict):
+    from ovos_utils.fakebus import FakeBus
+    from skill_ovos_news import NewsSkill
+    skill = NewsSkill()
+    skill._startup(FakeBus(), SKILL_ID)
+    skill._warm.wait()
+    # both skills share the settings file, the values are only changed in memory
+    skill.settings.update(settings)
+    # every query is ranked, repeated utterances never come from the search cache
+    skill.search_cache.maxsize = 0
+    return skill
+
+
+def _init_worker(settings: Optional[dict] = None):
+    global _skill, _reference
+    from ovos_utils.log import LOG
+    LOG.set_level("ERROR")
+    _skill = _start_skill(settings or {})
+    # every relevant station, sorted and cut like search_news does
+    _reference = _start_skill({"prune_candidates": False, "stream_results": False, "max_results": 0})
+
+
+def _search(message, skill, phrase: str, media_type: str) -> list:
+    # the session is read from the message argument of the calling frames, like in a bus handler
+    from ovos_utils.ocp import MediaType
+    media_type = MediaType.NEWS if media_type == "news" else MediaType.GENERIC
+    return list(skill.search_news(phrase, media_type))
+
+
+def _reference_search(message, phrase: str, media_type: str) -> list:
+    from unittest.mock import patch
+    from skill_ovos_news import scoring
+    # without numpy the scorer falls back to score_station for every station
+    with patch.object(scoring, "np", None):
+        return _search(message, _reference, phrase, media_type)[:_skill.max_results]
+
+
+def evaluate_chunk(lang: str, country: str, samples: List[str], generic: List[str]) -> List[dict]:
+    """ ranks the utterance variants of samples and the generic requests in one session, runs in a worker process """
+    from ovos_bus_client.message import Message
+    from ovos_bus_client.session import Session
+    session = Session(f"evaluate-{lang}-{country}", lang=lang, location_prefs=_location(country))
+    message = Message("ovos.common_play.search", {"lang": lang}, {"session": session.serialize()})
+    news_words = _skill.voc_list("news", lang)
+    queries = [(sample, utterance) for sample in samples for utterance in variants(sample, news_words)]
+    queries += [(None, utterance) for utterance in generic]
+    records = []
+    for sample, utterance in queries:
+        for media_type in MEDIA_TYPES:
+            start = time.perf_counter()
+            results = _search(message, _skill, utterance, media_type)
+            latency = (time.perf_counter() - start) * 1000
+            reference = _reference_search(message, utterance, media_type)
+            records.append({"lang": lang, "country": country, "sample": sample, "utterance": utterance,
+                            "media_type": media_type, "ranked": [r.title for r in results[:3]],
+                            "count": len(results), "latency_ms": latency,
+                            "reference": [reference[0].title if reference else None, len(reference)]})
+    return records
+
+
+def run(samples: List[str], profiles: Dict[str, str], workers: int, chunk: int = 16,
+        generic: List[str] = GENERIC, settings: Optional[dict] = None) -> Tuple[List[dict], float]:
+    """
+    Args:
+        samples: Provider names, searched in several variants
+        profiles: Session lang -> location country code
+        workers: Number of worker processes
+        chunk: Samples per task
+        generic: Requests searched as they are, once per profile
+        settings: Skill settings under evaluation, the reference scorer always ranks every station
+
+    Returns:
+        (query records, wall time in seconds)
+    """
+    tasks = [(lang, country, samples[i:i + chunk], generic if i == 0 else [])
+             for lang, country in profiles.items() for i in range(0, max(1, len(samples)), chunk)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings,)) as pool:
+        chunks = list(pool.map(evaluate_chunk, *zip(*tasks)))
+    return [r for records in chunks for r in records], time.perf_counter() - start
+
+
+def summarize(records: List[dict], names: Dict[str, Set[str]]) -> Dict[str, dict]:
+    """ accuracy, agreement with the reference scorer and latency per session profile and over all queries """
+    groups: Dict[str, List[dict]] = {}
+    for r in records:
+        groups.setdefault(f"{r['lang']}/{r['country']}", []).append(r)
+    groups["all"] = records
+    summary = {}
+    for profile, group in groups.items():
+        providers = [r for r in group if r["sample"] is not None]
+        scored = [r for r in providers if r["sample"].casefold() in names]
+        top1 = sum(1 for r in scored if r["ranked"][:1] and r["ranked"][0] in names[r["sample"].casefold()])
+        top3 = sum(1 for r in scored if set(r["ranked"]) & names[r["sample"].casefold()])
+        agree = sum(1 for r in group if not _differs(r))
+        latencies = [r["latency_ms"] for r in group]
+        summary[profile] = {"queries": len(group),
+                            "unknown": len(providers) - len(scored),
+                            "top1": round(top1 / max(1, len(scored)), 4),
+                            "top3": round(top3 / max(1, len(scored)), 4),
+                            "reference": round(agree / max(1, len(group)), 4),
+                            "p50_ms": round(percentile(latencies, 50), 3),
+                            "p95_ms": round(percentile(latencies, 95), 3)}
+    return summary
+
+
+def _key(r: dict) -> str:
+    return f"{r['lang']}/{r['country']}/{r['media_type']}/{r['utterance']}"
+
+
+def _differs(r: dict) -> bool:
+    return [(r["ranked"] or [None])[0], r["count"]] != list(r["reference"])
+
+
+def differences(records: List[dict]) -> List[str]:
+    """ queries whose first result or number of results differs from the reference scorer """
+    return [f"{_key(r)}: {r['reference'][0]} ({r['reference'][1]} results) -> "
+            f"{(r['ranked'] or [None])[0]} ({r['count']} results)" for r in records if _differs(r)]
+
+
+def winners(records: List[dict]) -> Dict[str, Optional[str]]:
+    """ "lang/country/media type/utterance" -> title of the first result """
+    return {_key(r): (r["ranked"] or [None])[0] for r in records}
+
+
+def compare(current: Dict[str, Optional[str]], baseline: Dict[str, Optional[str]]) -> List[str]:
+    """ utterances whose winning station changed """
+    return [f"{key}: {baseline[key]} -> {winner}" for key, winner in current.items()
+            if key in baseline and baseline[key] != winner]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=[f"{l}:{c}" for l, c in PROFILES.items()],
+                        help="session lang:country pairs, eg. en-US:US pt-PT:PT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--limit", type=int, default=0, help="only the first n samples, 0 for all")
+    parser.add_argument("--settings", type=json.loads, default={},
+                        help="skill settings under evaluation as json, eg. '{\"prune_candidates\": true}'")
+    parser.add_argument("--save", help="write the summary and the winner of every utterance as json")
+    parser.add_argument("--compare", help="evaluation json to check for changed winners")
+    args = parser.parse_args()
+
+    profiles = dict(p.split(":", 1) for p in args.profiles)
+    samples = load_samples()
+    if args.limit:
+        samples = samples[:args.limit]
+    records, wall = run(samples, profiles, args.workers, settings=args.settings)
+    summary = summarize(records, known_names())
+
+    print(f"{'profile':<10} {'queries':>8} {'unknown':>8} {'top-1':>7} {'top-3':>7} {'ref':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8}")
+    for profile, s in summary.items():
+        print(f"{profile:<10} {s['queries']:>8} {s['unknown']:>8} {s['top1']:>7.1%} {s['top3']:>7.1%} "
+              f"{s['reference']:>7.1%} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f}")
+    print(f"\n{len(records)} queries in {wall:.1f}s with {args.workers} workers, "
+          f"{len(records) / wall:.1f} queries/s")
+
+    report = {"meta": {"workers": args.workers, "wall_s": round(wall, 2), "settings": args.settings,
+                       "queries_per_s": round(len(records) / wall, 1)},
+              "summary": summary, "winners": winners(records)}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    failed = False
+    differing = differences(records)
+    for difference in differing:
+        print(f"DIFFERS {difference}")
+    if differing:
+        failed = True
+    else:
+        print("same results as the reference scorer")
+    if args.compare:
+        with open(args.compare) as f:
+            changed = compare(report["winners"], json.load(f)["winners"])
+        for change in changed:
+            print(f"CHANGED {change}")
+        if changed:
+            failed = True
+        else:
+            print("no ranking changes")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""skill load time benchmark, optionally on an emulated low-end (ARM-class) CPU profile
+
+Every measurement runs in a fresh python process, so imports are never cached:
+
+- startup profile: import time (framework and skill), initialize time, latency of a query
+  issued right after startup and time until the catalog is ready, for the eager and the
+  deferred ("deferred_startup" setting) startup modes
+- locale: loading the resources of a language from the compiled bundle and from the raw files
+
+A low-end device is emulated by pinning the process to --cpus cores and throttling it
+to --cpu-quota of each 20ms period (the same duty cycle a cgroup CPUQuota applies),
+the parent process stops and resumes the measuring process.
+
+usage:
+    python test/benchmarks/startup.py
+    python test/benchmarks/startup.py --cpus 1 --cpu-quota 0.25 --langs en-US pt-PT
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+SKILL_ID = "ovos-skill-news.openvoiceos"
+DEFAULT_LANGS = ["en-US", "pt-PT", "de-DE", "es-ES"]
+MODES = ["eager", "deferred"]
+
+
+def build_skill(**kwargs):
+    from ovos_utils.fakebus import FakeBus
+    from skill_ovos_news import NewsSkill
+    skill = NewsSkill(**kwargs)
+    skill._startup(FakeBus(), SKILL_ID)
+    return skill
+
+
+def profile_startup(mode: str) -> Dict[str, float]:
+    """ cold start timeline of one skill, in milliseconds """
+    start = time.perf_counter()
+    import ovos_workshop.skills.common_play
+    from ovos_utils.log import LOG
+    from ovos_utils.ocp import MediaType
+    LOG.set_level("ERROR")
+    framework = time.perf_counter()
+    import skill_ovos_news
+    imported = time.perf_counter()
+    skill = build_skill(settings={"deferred_startup": mode == "deferred"})
+    initialized = time.perf_counter()
+    skill.search_news("npr news", MediaType.NEWS)
+    answered = time.perf_counter()
+    skill._warm.wait()
+    ready = time.perf_counter()
+    # settings are persisted on shutdown
+    skill.settings.pop("deferred_startup")
+    skill.shutdown()
+    return {"import_framework": round((framework - start) * 1000, 1),
+            "import_skill": round((imported - framework) * 1000, 1),
+            "initialize": round((initialized - imported) * 1000, 1),
+            "first_query": round((answered - initialized) * 1000, 1),
+            "catalog_ready": round((ready - imported) * 1000, 1)}
+
+
+def bench_locale(skill, lang: str, repeat: int) -> Dict[str, dict]:
+    """ vocabularies and dialogs of a language, with and without the compiled bundle """
+    from benchmark import measure
+
+    def load(bundled: bool):
+        def run():
+            skill._voc_cache.clear()
+            skill._lang_resources.clear()
+            skill._vocab_matchers.clear()
+            skill._locale_bundles.clear()
+            if not bundled:
+                skill._locale_bundles[lang] = None
+            skill._vocab_matcher(lang)
+            skill.dialog_renderer
+        return run
+
+    return {f"locale_bundle_{lang}": measure(load(True), repeat),
+            f"locale_files_{lang}": measure(load(False), repeat)}
+
+
+def run_locale(langs: List[str], repeat: int) -> Dict[str, dict]:
+    from ovos_utils.log import LOG
+    LOG.set_level("ERROR")
+    skill = build_skill()
+    results = {}
+    for lang in langs:
+        results.update(bench_locale(skill, lang, repeat))
+    skill.shutdown()
+    return results
+
+
+def run_child(args: List[str], cpu_quota: float = 1.0, period: float = 0.02) -> dict:
+    """ runs this script with args in a fresh process, limited to cpu_quota of every period """
+    child = subprocess.Popen([sys.executable, __file__, "--child"] + args, stdout=subprocess.PIPE)
+    if cpu_quota < 1:
+        try:
+            while child.poll() is None:
+                time.sleep(period * cpu_quota)
+                child.send_signal(signal.SIGSTOP)
+                time.sleep(period * (1 - cpu_quota))
+                child.send_signal(signal.SIGCONT)
+        except ProcessLookupError:
+            pass
+        finally:
+            if child.poll() is None:
+                child.send_signal(signal.SIGCONT)
+    output = child.communicate()[0].decode().strip()
+    return json.loads(output.splitlines()[-1])  # the json report is the last line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--langs", nargs="+", default=DEFAULT_LANGS)
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per startup mode")
+    parser.add_argument("--cpus", type=int, default=0, help="pin to this many cores, 0 for all")
+    parser.add_argument("--cpu-quota", type=float, default=1.0, help="fraction of cpu time, eg. 0.25")
+    parser.add_argument("--save", help="write the results as json")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cpus:
+        os.sched_setaffinity(0, sorted(os.sched_getaffinity(0))[:args.cpus])
+    if args.child:
+        results = profile_startup(args.mode) if args.mode else run_locale(args.langs, args.repeat * 5)
+        print(json.dumps(results))
+        return
+
+    profiles = {}
+    for mode in MODES:
+        runs = [run_child(["--mode", mode], args.cpu_quota) for _ in range(args.repeat)]
+        # median of the cold starts
+        profiles[mode] = {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in runs[0]}
+    locale = run_child(["--langs", *args.langs, "--repeat", str(args.repeat)], args.cpu_quota)
+
+    print(f"{'startup (ms)':<18}" + "".join(f"{k:>18}" for k in profiles[MODES[0]]))
+    for mode, timeline in profiles.items():
+        print(f"{mode:<18}" + "".join(f"{v:>18.1f}" for v in timeline.values()))
+    print(f"\n{'locale':<22} {'p50 ms':>10} {'p95 ms':>10} {'peak kb':>10}")
+    for path, r in locale.items():
+        print(f"{path:<22} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['peak_kb']:>10.1f}")
+    if args.save:
+        report = {"meta": {"cpus": args.cpus or len(os.sched_getaffinity(0)), "cpu_quota": args.cpu_quota},
+                  "startup": profiles, "locale": locale}
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""local stand-in HTTP server for tests that would otherwise need the network"""
+import hashlib
+from email.utils import formatdate
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from os.path import dirname, getmtime, isfile, join
+from threading import Thread
+
+FIXTURES = join(dirname(__file__), "fixtures")
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        self.server.requests.append(self.path)
+        self.server.headers.append(dict(self.headers))
+        path = self.translate_path(self.path)
+        if path.endswith(".xml") and isfile(path):
+            # feeds can link to other fixtures, $SERVER is replaced with the base url
+            with open(path, "rb") as f:
+                body = f.read().replace(b"$SERVER", f"http://127.0.0.1:{self.server.server_port}".encode())
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            modified = formatdate(getmtime(path), usegmt=True)
+            if self.headers.get("If-None-Match") == etag or \
+                    (not self.headers.get("If-None-Match") and self.headers.get("If-Modified-Since") == modified):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return None
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modified)
+            self.end_headers()
+            return BytesIO(body)
+        return super().send_head()
+
+
+class FixtureServer:
+    """ serves the fixtures folder on a random localhost port """
+
+    def __init__(self, directory: str = FIXTURES):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Handler, directory=directory))
+        self.httpd.requests = []
+        self.httpd.headers = []  # request headers, in the order of requests
+        self.httpd.daemon_threads = True
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def headers(self):
+        return self.httpd.headers
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}/{path.lstrip('/')}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,29 @@
+"""base class for tests that start the skill, keeps what it stores out of the user's folders"""
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+
+def _isolate(add_cleanup):
+    tmp = TemporaryDirectory()
+    add_cleanup(tmp.cleanup)
+    env = patch.dict(os.environ, {f"XDG_{name}_HOME": os.path.join(tmp.name, name.lower())
+                                  for name in ("CONFIG", "DATA", "CACHE")})
+    env.start()
+    add_cleanup(env.stop)
+
+
+class SkillTestCase(unittest.TestCase):
+    """
+    Points the XDG folders at temporary directories, once for the class and again for
+    every test, so settings.json and the skill data of one test never reach the user's
+    folders or the next test. Subclasses overriding setUpClass or setUp call super first.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        _isolate(cls.addClassCleanup)
+
+    def setUp(self):
+        _isolate(self.addCleanup)
@@ -0,0 +1,29 @@
+import json
+import unittest
+from itertools import combinations
+from os.path import dirname, join
+
+from langcodes import closest_match
+from skill_ovos_news.affinity import LanguageAffinity
+from skill_ovos_news.stations import StationIndex
+
+
+class TestLanguageAffinity(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        with open(join(dirname(dirname(dirname(__file__))), "News.json")) as f:
+            self.index = StationIndex.from_archive(json.load(f))
+
+    def test_matches_closest_match(self):
+        requestable = ["en-US", "en-GB", "en", "pt-PT", "pt", "es-ES", "de-DE", "nl-NL", "fi-FI", "sv-SE"]
+        affinity = LanguageAffinity(self.index.langs, requestable)
+        unknown = ["ca", "fr-CA", "zh-CN"]  # not precomputed
+        for langs in [[l] for l in requestable + unknown] + [list(c) for c in combinations(requestable[:5], 2)]:
+            expected = [l for l in self.index.langs if closest_match(l, langs)[-1] <= 10]
+            self.assertEqual(list(affinity.allowed(langs)), expected, langs)
+
+    def test_precomputed(self):
+        affinity = LanguageAffinity(self.index.langs, ["en-US"])
+        self.assertEqual(len(affinity.distances), len(self.index.langs))
+        self.assertIs(affinity.allowed(["en-US"]), affinity.allowed(["en-US"]))
+        self.assertEqual(len(affinity.distances), len(self.index.langs))
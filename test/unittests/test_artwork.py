@@ -0,0 +1,119 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from ovos_utils.messagebus import FakeBus
+from skill_ovos_news import NewsSkill
+from skill_ovos_news import artwork as artwork_module
+from skill_ovos_news.artwork import ArtworkCache
+from skill_ovos_news.stations import IMAGES_DIR, NewsStation
+
+from fixture_server import FixtureServer
+from skill_test import SkillTestCase
+
+
+def join_image(name: str) -> str:
+    return os.path.join(IMAGES_DIR, name)
+
+
+class TestArtworkCache(unittest.TestCase):
+    def test_remote(self):
+        # the bundled images stand in for remote artwork
+        with FixtureServer(IMAGES_DIR) as server, TemporaryDirectory() as tmp:
+            url = server.url("ABC.png")
+            cache = ArtworkCache(tmp, ttl=3600)
+            self.assertIsNone(cache.get(url, 64))
+            self.assertEqual(cache.refresh([url]), [url])
+            artwork = cache.artwork[url]
+            with open(artwork.path, "rb") as a, open(join_image("ABC.png"), "rb") as b:
+                self.assertEqual(a.read(), b.read())
+            self.assertTrue(cache.get(url, 64).startswith(tmp))
+
+            # fresh, not requested again
+            self.assertEqual(cache.refresh([url]), [])
+            self.assertEqual(server.requests.count("/ABC.png"), 1)
+
+            # stale, revalidated, the unchanged image is not downloaded again
+            cache.ttl = 0
+            self.assertEqual(cache.refresh([url]), [])
+            self.assertEqual(server.requests.count("/ABC.png"), 2)
+            self.assertEqual(server.headers[-1].get("If-Modified-Since"), artwork.last_modified)
+            self.assertEqual(cache.artwork[url].path, artwork.path)
+
+            # persisted index
+            self.assertEqual(ArtworkCache(tmp).artwork[url].path, artwork.path)
+            cache.shutdown()
+
+    def test_quota_eviction(self):
+        with FixtureServer(IMAGES_DIR) as server, TemporaryDirectory() as tmp:
+            first, second = server.url("ABC.png"), server.url("BBC.png")
+            bundled = join_image("CBC.png")
+            cache = ArtworkCache(tmp)
+            cache.refresh([first, second, bundled])
+            cache.get(first, 64)  # second is now the least recently used
+
+            cache.quota = cache.artwork[first].size + cache.artwork[bundled].size
+            self.assertEqual(cache.refresh([]), [second])
+            self.assertIsNotNone(cache.get(first, 64))
+            self.assertIsNone(cache.get(second, 64))
+            self.assertEqual(len([f for f in os.listdir(tmp) if f.endswith(".png")]),
+                             1 + len(cache.artwork[first].sizes) + len(cache.artwork[bundled].sizes))
+
+            # bundled images are never removed
+            cache.quota = 0
+            cache.evict()
+            self.assertTrue(os.path.isfile(bundled))
+            self.assertEqual(cache.artwork, {})
+            cache.shutdown()
+
+    def test_unavailable(self):
+        with FixtureServer(IMAGES_DIR) as server, TemporaryDirectory() as tmp:
+            cache = ArtworkCache(tmp)
+            self.assertEqual(cache.refresh([server.url("missing.png"), join_image("missing.png")]), [])
+            self.assertEqual(cache.artwork, {})
+            cache.shutdown()
+
+    def test_thumbnails(self):
+        if artwork_module.Image is None:
+            self.skipTest("Pillow not installed")
+        with TemporaryDirectory() as tmp:
+            image = join_image("ABC.png")
+            cache = ArtworkCache(tmp, sizes=(64, 128))
+            cache.refresh([image])
+            for size in (64, 128):
+                path = cache.get(image, size)
+                self.assertTrue(path.startswith(tmp))
+                with artwork_module.Image.open(path) as thumbnail:
+                    self.assertLessEqual(max(thumbnail.size), size)
+            # larger than every thumbnail, the original is used
+            self.assertIsNone(cache.get(image, 1024))
+            cache.shutdown()
+
+
+class TestSkillArtwork(SkillTestCase):
+    @classmethod
+    def setUpClass(self):
+        super().setUpClass()
+        self.skill = NewsSkill()
+        self.skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+
+    @classmethod
+    def tearDownClass(self):
+        self.skill.shutdown()
+
+    def test_entries_use_cached_artwork(self):
+        with FixtureServer(IMAGES_DIR) as server, TemporaryDirectory() as tmp:
+            station = NewsStation.from_config("FIX", "en-US", {"uri": "https://example.com/news.mp3",
+                                                               "image": server.url("ABC.png")})
+            self.assertEqual(self.skill._station2entry(station, 80).image, station.image)
+
+            self.skill.artwork = ArtworkCache(tmp)
+            try:
+                self.skill.artwork.refresh([station.image])
+                cached = self.skill.artwork.get(station.image, 256)
+                self.assertTrue(cached.startswith(tmp))
+                self.assertEqual(self.skill._station2entry(station, 80).image, cached)
+                self.assertEqual(self.skill._station2featured(station).image, cached)
+            finally:
+                self.skill.artwork.shutdown()
+                self.skill.artwork = None
@@ -0,0 +1,31 @@
+import sys
+import unittest
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(dirname(__file__)), "benchmarks"))
+from benchmark import bench_size, compare, percentile, synthetic_catalog
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_synthetic_catalog(self):
+        catalog = synthetic_catalog(150)
+        stations = [(feed, config) for feeds in catalog.values() for feed, config in feeds.items()]
+        self.assertEqual(len(stations), 150)
+        self.assertEqual(len({config["uri"] for _, config in stations}), 150)
+        self.assertIn("NPR 1", catalog["en-US"])
+
+    def test_compare(self):
+        baseline = {"results": {"100": {"search_news": {"p95_ms": 10, "peak_kb": 100}}}}
+        same = {"results": {"100": {"search_news": {"p95_ms": 10.5, "peak_kb": 100}}}}
+        slower = {"results": {"100": {"search_news": {"p95_ms": 20, "peak_kb": 100}}}}
+        self.assertEqual(compare(same, baseline), [])
+        self.assertEqual(len(compare(slower, baseline)), 1)
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+
+    def test_smoke(self):
+        results = bench_size(100, repeat=1)
+        self.assertEqual(set(results), {"initialize", "read_db", "read_db_all", "_score", "search_news",
+                                        "search_news_generic", "news_playlist",
+                                        "handle_play_the_news", "handle_global_news"})
+        for r in results.values():
+            self.assertGreater(r["p95_ms"], 0)
@@ -0,0 +1,145 @@
+import os
+import time
+import unittest
+from tempfile import TemporaryDirectory
+
+from ovos_bus_client.message import Message
+from ovos_bus_client.session import Session
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaEntry, MediaState, PluginStream
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.briefing import BriefingPlayer
+from skill_ovos_news.bulletins import BulletinCache
+from skill_ovos_news.resolver import StreamResolver
+from skill_ovos_news.stations import NewsStation, StationIndex
+
+from fixture_server import FixtureServer
+from skill_test import SkillTestCase
+
+
+def wait_for(predicate, timeout=5):
+    end = time.time() + timeout
+    while not predicate() and time.time() < end:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestBriefingPlayer(unittest.TestCase):
+    def test_prefetch_window(self):
+        with FixtureServer() as server, TemporaryDirectory() as tmp:
+            stations = [NewsStation.from_config(name, "en-US", {"uri": f"rss//{server.url(feed)}"})
+                        for name, feed in (("A", "bulletin.xml"), ("B", "bulletin.xml?b"), ("C", "world.xml"))]
+            queued = []
+            player = BriefingPlayer(BulletinCache(tmp, StreamResolver(), ttl=60), lambda s: s.entry(100),
+                                    lambda entry, message: queued.append(entry), depth=1)
+            first = player.start(stations)
+            # nothing was buffered yet, the first station plays right away
+            self.assertIsInstance(first, PluginStream)
+            self.assertTrue(player.owns(stations[0].uri))
+            # nothing is queued before the first item was sent to OCP
+            time.sleep(0.1)
+            self.assertEqual(queued, [])
+            player.prefetch()
+
+            # only the next item is buffered while the first one plays
+            self.assertTrue(wait_for(lambda: len(queued) == 1))
+            self.assertIsInstance(queued[0], MediaEntry)
+            self.assertTrue(queued[0].uri.startswith("file://"))
+            self.assertTrue(os.path.isfile(queued[0].uri[len("file://"):]))
+            time.sleep(0.1)
+            self.assertEqual(len(queued), 1)
+            self.assertNotIn("/episodes/world.mp3", server.requests)
+
+            player.advance()
+            self.assertTrue(wait_for(lambda: len(queued) == 2))
+            self.assertEqual(queued[1].title, "C")
+            self.assertTrue(all(player.owns(entry.uri) for entry in queued))
+            self.assertEqual(server.requests.count("/episodes/world.mp3"), 1)
+            player.advance()
+            player.advance()
+            self.assertFalse(player.active)
+            self.assertFalse(player.owns(queued[0].uri))
+
+            # a briefing that is replaced never queues its items
+            queued.clear()
+            player.start(stations)
+            player.prefetch()
+            player.stop()
+            time.sleep(0.2)
+            self.assertEqual(queued, [])
+            player.shutdown()
+
+    def test_buffered_first_item(self):
+        with FixtureServer() as server, TemporaryDirectory() as tmp:
+            station = NewsStation.from_config("A", "en-US", {"uri": f"rss//{server.url('bulletin.xml')}"})
+            cache = BulletinCache(tmp, StreamResolver(), ttl=60)
+            cache.download(station)
+            player = BriefingPlayer(cache, lambda s: s.entry(100), lambda e, m: None)
+            first = player.start([station])
+            self.assertTrue(first.uri.startswith("file://"))
+            self.assertIsNone(player.start([]))
+            player.shutdown()
+
+
+class TestSkillBriefing(SkillTestCase):
+    def test_play_the_news_briefing(self):
+        with FixtureServer() as server:
+            skill = NewsSkill()
+            skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+            archive = {"en-US": {"LOCAL": {"uri": f"rss//{server.url('bulletin.xml')}"},
+                                 "LOCAL2": {"uri": f"rss//{server.url('bulletin.xml?2')}"},
+                                 "WORLD": {"uri": f"rss//{server.url('world.xml')}", "world_news": True}}}
+            skill._stations = StationIndex.from_archive(archive, key=skill.stations.key)
+            skill.settings["briefing"] = True
+            skill.on_settings_changed()
+            self.assertEqual([s.feed for s in skill.briefing_stations("play the news", ["en-US"])],
+                             ["LOCAL", "LOCAL2", "WORLD"])
+
+            # every bulletin is on disk already, the next one is queued right away
+            for station in skill.briefing_stations("play the news", ["en-US"]):
+                skill.briefing.cache.download(station)
+            events, played, queued = [], [], []
+
+            def on_play(message):
+                events.append(message)
+                played.append(message.data["media"])
+
+            def on_queue(message):
+                events.append(message)
+                queued.extend(message.data["tracks"])
+
+            skill.bus.on("ovos.common_play.play", on_play)
+            skill.bus.on("ovos.common_play.playlist.queue", on_queue)
+            skill.acknowledge = lambda: None
+            session = Session("briefing-test")
+            skill.handle_play_the_news(Message("recognizer_loop:utterance", {"utterance": "play the news"},
+                                               {"session": session.serialize()}))
+            self.assertEqual(played[0].title, "LOCAL")
+            self.assertTrue(wait_for(lambda: len(queued) == 1))
+            self.assertEqual(queued[0].title, "LOCAL2")
+            # the play request replaces the OCP playlist, it must come first
+            self.assertEqual([m.msg_type for m in events], ["ovos.common_play.play", "ovos.common_play.playlist.queue"])
+            self.assertEqual(events[1].context["session"]["session_id"], "briefing-test")
+
+            # OCP plays the queued bulletins one after the other, the briefing goes on
+            skill.bus.emit(Message("ovos.common_play.media.state", {"state": MediaState.END_OF_MEDIA}))
+            skill.bus.emit(Message("ovos.common_play.play", {"media": queued[0].as_dict}))
+            self.assertTrue(skill.briefing.active)
+            self.assertTrue(wait_for(lambda: len(queued) == 2))
+            self.assertEqual(queued[1].title, "WORLD")
+            self.assertTrue(queued[1].uri.startswith("file://"))
+            skill.bus.emit(Message("ovos.common_play.media.state", {"state": MediaState.END_OF_MEDIA}))
+            skill.bus.emit(Message("ovos.common_play.play", {"media": queued[1].as_dict}))
+            self.assertTrue(skill.briefing.active)
+            self.assertEqual(skill.briefing.playing, 2)
+
+            # something else plays, no more bulletins are queued
+            skill.bus.emit(Message("ovos.common_play.play", {"media": {"uri": "https://example.com/song.mp3"}}))
+            self.assertFalse(skill.briefing.active)
+
+            skill.handle_play_the_news(Message("recognizer_loop:utterance", {"utterance": "play the news"},
+                                               {"session": session.serialize()}))
+            self.assertTrue(skill.briefing.active)
+            skill.bus.emit(Message("ovos.common_play.stop"))
+            self.assertFalse(skill.briefing.active)
+            skill.shutdown()
@@ -0,0 +1,89 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaEntry, MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.bulletins import BulletinCache
+from skill_ovos_news.resolver import StreamResolver
+from skill_ovos_news.stations import NewsStation, StationIndex
+
+from fixture_server import FIXTURES, FixtureServer
+from skill_test import SkillTestCase
+
+EPISODE = os.path.join(FIXTURES, "episodes", "bulletin.mp3")
+
+
+class TestBulletinCache(unittest.TestCase):
+    def test_download(self):
+        with FixtureServer() as server, TemporaryDirectory() as tmp:
+            station = NewsStation.from_config("FIX", "en-US", {"uri": f"rss//{server.url('bulletin.xml')}"})
+            cache = BulletinCache(tmp, StreamResolver(), ttl=60)
+            self.assertIsNone(cache.get(station))
+            self.assertEqual(cache.refresh([station]), [station.uri])
+            bulletin = cache.get(station)
+            self.assertEqual(bulletin.title, "Bulletin 07:00")
+            self.assertEqual(bulletin.size, os.path.getsize(EPISODE))
+            with open(bulletin.path, "rb") as a, open(EPISODE, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+            # same episode is not downloaded again
+            self.assertEqual(cache.refresh([station]), [])
+            self.assertEqual(server.requests.count("/episodes/bulletin.mp3"), 1)
+
+            # persisted index
+            self.assertEqual(BulletinCache(tmp, StreamResolver()).bulletins[station.uri].path, bulletin.path)
+
+            cache.ttl = 0
+            self.assertIsNone(cache.get(station))
+            cache.shutdown()
+
+    def test_quota_eviction(self):
+        with FixtureServer() as server, TemporaryDirectory() as tmp:
+            first = NewsStation.from_config("A", "en-US", {"uri": f"rss//{server.url('bulletin.xml')}"})
+            second = NewsStation.from_config("B", "en-US", {"uri": f"rss//{server.url('bulletin.xml?x=2')}"})
+            size = os.path.getsize(EPISODE)
+            cache = BulletinCache(tmp, StreamResolver(), quota=size * 2, ttl=60)
+            cache.refresh([first, second])
+            self.assertEqual(cache.size, size * 2)
+            cache.get(first)  # second is now the least recently used
+
+            cache.quota = size
+            self.assertEqual(cache.refresh([]), [second.uri])
+            self.assertIsNotNone(cache.get(first))
+            self.assertIsNone(cache.get(second))
+            self.assertEqual(len([f for f in os.listdir(tmp) if f.endswith(".mp3")]), 1)
+
+            # files larger than the quota are never kept
+            cache.quota = size - 1
+            cache.bulletins.clear()
+            self.assertIsNone(cache.download(first))
+            cache.shutdown()
+
+    def test_direct_streams(self):
+        with TemporaryDirectory() as tmp:
+            station = NewsStation.from_config("FIX", "en-US", {"uri": "https://example.com/live.mp3"})
+            cache = BulletinCache(tmp, StreamResolver())
+            self.assertEqual(cache.refresh([station]), [])
+            self.assertEqual(cache.bulletins, {})
+
+
+class TestSkillBulletins(SkillTestCase):
+    def test_search_plays_local_file(self):
+        with FixtureServer() as server:
+            skill = NewsSkill()
+            skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+            archive = {"en-US": {"FIX": {"aliases": ["Fixture News"],
+                                         "uri": f"rss//{server.url('bulletin.xml')}"}}}
+            skill._stations = StationIndex.from_archive(archive, key=skill.stations.key)
+            skill.settings["offline_bulletins"] = True
+            skill.settings["offline_stations"] = ["FIX"]
+            skill.on_settings_changed()
+
+            skill.download_bulletins()
+            results = skill.search_news("fixture news", MediaType.NEWS)
+            self.assertIsInstance(results[0], MediaEntry)
+            self.assertTrue(results[0].uri.startswith("file://"))
+            self.assertTrue(os.path.isfile(results[0].uri[len("file://"):]))
+            skill.shutdown()
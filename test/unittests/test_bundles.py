@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import unittest
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+
+from ovos_utils.messagebus import FakeBus
+from ovos_workshop.skills.common_play import OVOSCommonPlaybackSkill
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.bundles import BUNDLE_NAME, LocaleBundle, compile_bundle
+
+from skill_test import SkillTestCase
+
+LOCALE = join(dirname(dirname(dirname(__file__))), "locale")
+
+
+class TestLocaleBundle(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.lang_dir = join(self.tmp.name, "en-us")
+        shutil.copytree(join(LOCALE, "en-us"), self.lang_dir)
+        os.remove(join(self.lang_dir, BUNDLE_NAME))
+        compile_bundle(self.lang_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_contents(self):
+        bundle = LocaleBundle.open_fresh(self.lang_dir)
+        self.assertEqual(bundle.vocabs["world_news"], ["global news", "international news", "world news"])
+        # dialogs are rendered from the files by ovos_workshop, they don't make a bundle stale
+        with open(join(self.lang_dir, "greeting.dialog"), "w") as f:
+            f.write("hello {{name}}")
+        self.assertNotIn("dialogs", compile_bundle(self.lang_dir, join(self.tmp.name, "dialogs.json")))
+        self.assertIsNotNone(LocaleBundle.open_fresh(self.lang_dir))
+
+    def test_freshness(self):
+        path = join(self.lang_dir, "news.voc")
+        # new mtimes, eg. a fresh clone or installation
+        for name in os.listdir(self.lang_dir):
+            os.utime(join(self.lang_dir, name), (1, 1))
+        self.assertIsNotNone(LocaleBundle.open_fresh(self.lang_dir))
+        # same size, other word
+        with open(path, encoding="utf-8") as f:
+            contents = f.read()
+        self.assertIn("news", contents)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(contents.replace("news", "nova", 1))
+        os.utime(path, (1, 1))
+        self.assertIsNone(LocaleBundle.open_fresh(self.lang_dir))
+        compile_bundle(self.lang_dir)
+        self.assertIn("nova", LocaleBundle.open_fresh(self.lang_dir).vocabs["news"])
+        with open(path, "a") as f:
+            f.write("\nbulletin")
+        self.assertIsNone(LocaleBundle.open_fresh(self.lang_dir))
+        compile_bundle(self.lang_dir)
+        self.assertIn("bulletin", LocaleBundle.open_fresh(self.lang_dir).vocabs["news"])
+        # new resource file
+        with open(join(self.lang_dir, "extra.voc"), "w") as f:
+            f.write("extra")
+        self.assertIsNone(LocaleBundle.open_fresh(self.lang_dir))
+
+    def test_missing(self):
+        os.remove(join(self.lang_dir, BUNDLE_NAME))
+        self.assertIsNone(LocaleBundle.open_fresh(self.lang_dir))
+
+    def test_shipped_bundles(self):
+        for lang in os.listdir(LOCALE):
+            with open(join(LOCALE, lang, BUNDLE_NAME), encoding="utf-8") as f:
+                shipped = json.load(f)
+            fresh = compile_bundle(join(LOCALE, lang), join(self.tmp.name, f"{lang}.json"))
+            self.assertEqual(shipped, fresh, f"{lang} bundle is out of date, run scripts/compile_locale.py")
+
+
+class TestSkillBundle(SkillTestCase):
+    def test_same_vocabulary(self):
+        skill = NewsSkill()
+        skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+        self.assertIsNotNone(skill.locale_bundle())
+        for voc in ["news", "world_news"] + list(skill.lang_vocs):
+            self.assertEqual(skill.voc_list(voc), OVOSCommonPlaybackSkill.voc_list(skill, voc))
+        # the raw files are read when there is no bundle
+        skill._locale_bundles["en-US"] = None
+        skill._voc_cache.clear()
+        self.assertEqual(skill.voc_list("world_news"), ["global news", "international news", "world news"])
+        skill.shutdown()
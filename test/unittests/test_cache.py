@@ -0,0 +1,77 @@
+import time
+import unittest
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.cache import TTLCache
+
+from skill_test import SkillTestCase
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru(self):
+        cache = TTLCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "b" is now the least recently used
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_ttl(self):
+        cache = TTLCache(ttl=0.05)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.1)
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual(cache.stats["expirations"], 1)
+
+    def test_disabled(self):
+        cache = TTLCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertEqual(len(cache), 0)
+
+
+class TestSearchCache(SkillTestCase):
+    @classmethod
+    def setUpClass(self):
+        super().setUpClass()
+        self.skill = NewsSkill()
+        self.skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+
+    def setUp(self):
+        super().setUp()
+        self.skill.search_cache.clear()
+
+    def test_hits(self):
+        hits = self.skill.search_cache.hits
+        first = self.skill.search_news("NPR", MediaType.NEWS)
+        second = self.skill.search_news("NPR", MediaType.NEWS)
+        self.assertEqual(self.skill.search_cache.hits, hits + 1)
+        self.assertEqual([r.title for r in first], [r.title for r in second])
+        self.assertEqual([r.match_confidence for r in first], [r.match_confidence for r in second])
+
+    def test_fresh_copies(self):
+        first = self.skill.search_news("bbc news", MediaType.NEWS)
+        self.assertTrue(first)
+        expected = first[0].match_confidence
+        first[0].match_confidence = 0
+        second = self.skill.search_news("bbc news", MediaType.NEWS)
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(second[0].match_confidence, expected)
+
+    def test_context_in_key(self):
+        self.skill.search_news("play the news", MediaType.NEWS)
+        misses = self.skill.search_cache.misses
+        self.skill.search_news("play the news", MediaType.GENERIC)
+        self.assertEqual(self.skill.search_cache.misses, misses + 1)
+
+    def test_settings_invalidate(self):
+        self.skill.search_news("NPR", MediaType.NEWS)
+        self.assertTrue(len(self.skill.search_cache))
+        self.skill.on_settings_changed()
+        self.assertEqual(len(self.skill.search_cache), 0)
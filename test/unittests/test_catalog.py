@@ -0,0 +1,100 @@
+import json
+import shutil
+import unittest
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from ovos_utils.messagebus import FakeBus
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.catalog import CompiledCatalog, CompiledStationIndex, compile_catalog
+from skill_ovos_news.stations import StationIndex
+
+from skill_test import SkillTestCase
+
+NEWS_JSON = join(dirname(dirname(dirname(__file__))), "News.json")
+
+
+class TestCompiledCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.source = join(self.tmp.name, "News.json")
+        self.target = join(self.tmp.name, "News.catalog")
+        shutil.copy(NEWS_JSON, self.source)
+        with open(self.source) as f:
+            self.archive = json.load(f)
+        self.assertEqual(compile_catalog(self.source, self.target), sum(len(v) for v in self.archive.values()))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_index(self):
+        defaults = {"en-US": "NPR", "pt-PT": "RTP"}
+        index = StationIndex.from_archive(self.archive, defaults, default_bg="bg.jpg")
+        compiled = CompiledStationIndex(CompiledCatalog(self.target), defaults, default_bg="bg.jpg")
+        self.assertEqual(compiled.stations.decoded, 0)
+        self.assertEqual(compiled.keywords(), index.keywords())
+        self.assertEqual(compiled.langs, index.langs)
+        self.assertEqual(list(compiled.stations), list(index.stations))
+        self.assertEqual(list(compiled.filter(["pt-PT"], local_only=True)),
+                         list(index.filter(["pt-PT"], local_only=True)))
+
+        compiled = compiled.with_defaults({"en-US": "FOX"})
+        index = index.with_defaults({"en-US": "FOX"})
+        for phrase in ("npr", "fox news", "euronews", ""):
+            self.assertEqual(compiled.scorer.score(phrase, ["en-US"], False, "US", base_score=30),
+                             index.scorer.score(phrase, ["en-US"], False, "US", base_score=30))
+        self.assertEqual(compiled.ngrams.candidates("national public radio"),
+                         index.ngrams.candidates("national public radio"))
+
+    def test_lazy_decoding(self):
+        compiled = CompiledStationIndex(CompiledCatalog(self.target))
+        scored = compiled.scorer.score("deutschlandfunk", ["de-DE"], True, "DE", threshold=70)
+        self.assertTrue(scored)
+        self.assertEqual(compiled.stations.decoded, len(scored))
+
+    def test_freshness(self):
+        self.assertIsNotNone(CompiledCatalog.open_fresh(self.target, self.source))
+        # same contents, different mtime
+        shutil.copy(self.source, self.source + ".bak")
+        shutil.move(self.source + ".bak", self.source)
+        self.assertIsNotNone(CompiledCatalog.open_fresh(self.target, self.source))
+
+        self.archive["en-US"]["NPR"]["aliases"].append("modified")
+        with open(self.source, "w") as f:
+            json.dump(self.archive, f)
+        self.assertIsNone(CompiledCatalog.open_fresh(self.target, self.source))
+        self.assertIsNone(CompiledCatalog.open_fresh(join(self.tmp.name, "missing"), self.source))
+        with open(self.target, "wb") as f:
+            f.write(b"not a catalog")
+        self.assertIsNone(CompiledCatalog.open_fresh(self.target, self.source))
+
+
+class TestSkillCatalog(SkillTestCase):
+    def test_compiled_on_first_use(self):
+        with TemporaryDirectory() as tmp:
+            source = join(tmp, "News.json")
+            shutil.copy(NEWS_JSON, source)
+            skill = NewsSkill()
+            skill.archive_path = source
+            skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+            skill._warm.wait()
+            with patch.object(skill.file_system, "path", tmp):
+                key = skill.stations.key
+                self.assertIsInstance(skill._load_index(key), CompiledStationIndex)
+                path = join(tmp, "News.catalog")
+                self.assertIsNotNone(CompiledCatalog.open_fresh(path, source))
+
+                # up to date, not compiled again
+                with patch("skill_ovos_news.compile_catalog") as compile_:
+                    self.assertIsInstance(skill._load_index(key), CompiledStationIndex)
+                compile_.assert_not_called()
+
+                # News.json changed
+                with open(source) as f:
+                    archive = json.load(f)
+                archive["en-US"]["Fixture"] = {"aliases": ["Fixture Radio"], "uri": "https://example.com/live.mp3"}
+                with open(source, "w") as f:
+                    json.dump(archive, f)
+                self.assertIn("Fixture", [s.feed for s in skill._load_index(key)])
+            skill.shutdown()
@@ -0,0 +1,65 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from ovos_bus_client.message import Message
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType, Playlist
+from skill_ovos_news import NewsSkill
+
+from skill_test import SkillTestCase
+
+LANGS = ["en-US", "pt-PT", "de-DE", "es-ES"]
+PHRASES = ["NPR", "bbc news", "portuguese news", "play the news", "world news", "euronews",
+           "german news", "news in spanish", "RTP", "DLF", "latest news", ""]
+
+
+def _dump(result):
+    if isinstance(result, Playlist):
+        return "playlist", result.title, result.match_confidence, [e.title for e in result]
+    return result.title, getattr(result, "uri", None) or result.stream, result.match_confidence, result.image
+
+
+class TestConcurrentSearch(SkillTestCase):
+    def test_search_news_thread_pool(self):
+        skill = NewsSkill()
+        skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+        # a small cache, so threads both hit and evict each other's entries
+        skill.search_cache.maxsize = 8
+        # the default feed only overrides the skill language, sessions get different defaults
+        skill.settings["default_feed"] = "BBC"
+
+        messages = {lang: Message("ovos.common_play.search", {"lang": lang}) for lang in LANGS}
+
+        def in_session(message, func, *args):
+            # the session language is read from the message argument of the calling frames, like in a bus handler
+            return func(*args)
+
+        def search(lang, phrase, media_type):
+            results = in_session(messages[lang], skill.search_news, phrase, media_type)
+            # callers own their results
+            for r in results:
+                r.match_confidence = 0
+            return results
+
+        def query(lang, phrase, media_type):
+            return [_dump(r) for r in in_session(messages[lang], skill.search_news, phrase, media_type)]
+
+        tasks = [(lang, phrase, media_type) for lang in LANGS for phrase in PHRASES
+                 for media_type in (MediaType.NEWS, MediaType.GENERIC)]
+        expected = {task: query(*task) for task in tasks}
+        self.assertTrue(any(expected.values()))
+        # languages really produce different results
+        self.assertNotEqual(expected[("en-US", "play the news", MediaType.NEWS)],
+                            expected[("pt-PT", "play the news", MediaType.NEWS)])
+
+        skill.search_cache.clear()
+        work = tasks * 3
+        random.Random(42).shuffle(work)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            mutated = [pool.submit(search, *task) for task in work[::7]]
+            results = list(pool.map(lambda task: (task, query(*task)), work))
+        for task, result in results:
+            self.assertEqual(expected[task], result, task)
+        for future in mutated:
+            future.result()
+        skill.shutdown()
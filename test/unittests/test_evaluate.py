@@ -0,0 +1,56 @@
+import sys
+from os.path import dirname, join
+
+from skill_test import SkillTestCase
+
+sys.path.insert(0, join(dirname(dirname(__file__)), "benchmarks"))
+from evaluate import GENERIC, compare, differences, known_names, load_samples, run, summarize, variants, winners
+
+
+class TestEvaluate(SkillTestCase):
+    def test_samples(self):
+        samples = load_samples()
+        self.assertIn("Fox News Channel", samples)
+        self.assertEqual(len(samples), len(set(samples)))
+        self.assertIn("FOX", known_names()["fox news channel"])
+        self.assertEqual(variants("NPR", ["news", "headlines"]), ["NPR", "NPR news", "news NPR"])
+        self.assertEqual(variants("NPR", []), ["NPR"])
+
+    def test_summarize(self):
+        names = {"npr": {"NPR"}, "bbc": {"BBC"}}
+        records = [{"lang": "en-US", "country": "US", "sample": "NPR", "utterance": "NPR", "media_type": "news",
+                    "ranked": ["NPR", "FOX"], "count": 2, "latency_ms": 1, "reference": ["NPR", 2]},
+                   {"lang": "en-US", "country": "US", "sample": "BBC", "utterance": "BBC", "media_type": "news",
+                    "ranked": ["FOX", "BBC"], "count": 2, "latency_ms": 3, "reference": ["FOX", 2]},
+                   {"lang": "en-US", "country": "US", "sample": "XYZ", "utterance": "XYZ", "media_type": "news",
+                    "ranked": [], "count": 0, "latency_ms": 2, "reference": [None, 0]},
+                   {"lang": "en-US", "country": "US", "sample": None, "utterance": "the news", "media_type": "generic",
+                    "ranked": ["FOX", "NPR"], "count": 2, "latency_ms": 2, "reference": ["NPR", 5]}]
+        summary = summarize(records, names)["en-US/US"]
+        self.assertEqual(summary["queries"], 4)
+        self.assertEqual(summary["unknown"], 1)
+        self.assertEqual(summary["top1"], 0.5)
+        self.assertEqual(summary["top3"], 1.0)
+        self.assertEqual(summary["reference"], 0.75)
+        self.assertEqual(summary["p50_ms"], 2)
+        self.assertEqual(differences(records), ["en-US/US/generic/the news: NPR (5 results) -> FOX (2 results)"])
+
+        baseline = winners(records)
+        self.assertEqual(baseline["en-US/US/news/XYZ"], None)
+        self.assertEqual(compare(baseline, baseline), [])
+        changed = dict(baseline, **{"en-US/US/news/NPR": "FOX"})
+        self.assertEqual(compare(changed, baseline), ["en-US/US/news/NPR: NPR -> FOX"])
+
+    def test_smoke(self):
+        records, wall = run(["NPR", "Fox News Channel"], {"en-US": "US", "pt-PT": "PT"}, workers=2)
+        # 3 variants of 2 samples and the generic requests, with and without the NEWS media type
+        self.assertEqual(len(records), (2 * 3 + len(GENERIC)) * 2 * 2)
+        self.assertGreater(wall, 0)
+        summary = summarize(records, known_names())
+        self.assertEqual(summary["all"]["unknown"], 0)
+        self.assertEqual(differences(records), [])
+        self.assertEqual(summary["all"]["reference"], 1.0)
+        # in a US session many US stations cap at the same score and the catalog order picks the first,
+        # a GENERIC query only matches if the utterance has the news vocabulary
+        news = summarize([r for r in records if r["media_type"] == "news"], known_names())
+        self.assertEqual(news["pt-PT/PT"]["top1"], 1.0)
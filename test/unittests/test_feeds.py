@@ -0,0 +1,97 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from skill_ovos_news.feeds import FeedRefresher, FirstEpisodeParser
+
+from fixture_server import FIXTURES, FixtureServer
+
+
+def podcast(items: int, first: str = "Episode 0") -> str:
+    """ a large feed, newest episode first """
+    entries = "".join(f"""
+    <item>
+      <title>{first if i == 0 else f"Episode {i}"}</title>
+      <description>{"lorem ipsum " * 20}</description>
+      <enclosure url="http://localhost/episodes/{i}.mp3" length="1024" type="audio/mpeg"/>
+    </item>""" for i in range(items))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Podcast</title>{entries}
+</channel></rss>"""
+
+
+class TestFirstEpisodeParser(unittest.TestCase):
+    def test_rss(self):
+        with open(os.path.join(FIXTURES, "feed.xml"), "rb") as f:
+            data = f.read()
+        parser = FirstEpisodeParser()
+        chunks = [data[i:i + 16] for i in range(0, len(data), 16)]
+        for read, chunk in enumerate(chunks):
+            stream = parser.feed(chunk)
+            if stream is not None:
+                break
+        self.assertEqual(stream.uri, "http://localhost/episodes/latest.mp3")
+        self.assertEqual(stream.title, "Newscast 10:00")
+        self.assertLess(read, len(chunks) - 1)  # the second item was never needed
+
+    def test_atom(self):
+        parser = FirstEpisodeParser()
+        stream = parser.feed(b"""<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom</title>
+            <entry><title>No audio</title><link href="http://localhost/page"/></entry>
+            <entry><title>Latest</title>
+              <link rel="enclosure" type="image/png" href="http://localhost/cover.png"/>
+              <link rel="enclosure" type="audio/mpeg" href="http://localhost/latest.mp3"/>
+            </entry></feed>""")
+        self.assertEqual(stream.uri, "http://localhost/latest.mp3")
+        self.assertEqual(stream.title, "Latest")
+
+
+class TestFeedRefresher(unittest.TestCase):
+    def test_conditional_requests(self):
+        with FixtureServer() as server:
+            feeds = FeedRefresher(timeout=5)
+            url = server.url("feed.xml")
+            self.assertEqual(feeds.fetch(url).uri, "http://localhost/episodes/latest.mp3")
+            self.assertNotIn("If-None-Match", server.headers[-1])
+
+            stream = feeds.fetch(url)
+            self.assertEqual(stream.uri, "http://localhost/episodes/latest.mp3")
+            self.assertEqual(stream.title, "Newscast 10:00")
+            self.assertIn("If-None-Match", server.headers[-1])
+            self.assertIn("If-Modified-Since", server.headers[-1])
+            stats = feeds.stats
+            self.assertEqual(stats["requests"], 2)
+            self.assertEqual(stats["not_modified"], 1)
+            self.assertGreaterEqual(stats["bytes_saved"], os.path.getsize(os.path.join(FIXTURES, "feed.xml")))
+            feeds.shutdown()
+
+    def test_stops_after_first_episode(self):
+        with TemporaryDirectory() as tmp, FixtureServer(tmp) as server:
+            path = os.path.join(tmp, "podcast.xml")
+            with open(path, "w") as f:
+                f.write(podcast(500))
+            size = os.path.getsize(path)
+            feeds = FeedRefresher(timeout=5)
+            stream = feeds.fetch(server.url("podcast.xml"))
+            self.assertEqual(stream.uri, "http://localhost/episodes/0.mp3")
+            stats = feeds.stats
+            self.assertEqual(stats["early_exits"], 1)
+            self.assertLess(stats["bytes_read"], size / 10)
+            self.assertEqual(stats["bytes_read"] + stats["bytes_saved"], size)
+
+            # a new episode changes the validators
+            with open(path, "w") as f:
+                f.write(podcast(500, first="Breaking"))
+            os.utime(path, (1, 1))
+            self.assertEqual(feeds.fetch(server.url("podcast.xml")).title, "Breaking")
+            self.assertEqual(feeds.stats["not_modified"], 0)
+            feeds.shutdown()
+
+    def test_malformed_feed(self):
+        with TemporaryDirectory() as tmp, FixtureServer(tmp) as server:
+            with open(os.path.join(tmp, "broken.xml"), "w") as f:
+                f.write(podcast(3).replace("<title>Podcast</title>", "<title>Pod&nbsp;cast</title>"))
+            feeds = FeedRefresher(timeout=5)
+            self.assertEqual(feeds.fetch(server.url("broken.xml")).uri, "http://localhost/episodes/0.mp3")
+            self.assertEqual(feeds.stats["fallbacks"], 1)
+            feeds.shutdown()
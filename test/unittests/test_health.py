@@ -0,0 +1,112 @@
+import unittest
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.health import HealthChecker, StationHealth
+from skill_ovos_news.scoring import StationScorer
+from skill_ovos_news.stations import NewsStation, StationIndex
+
+from fixture_server import FixtureServer
+from skill_test import SkillTestCase
+
+
+class TestHealthChecker(unittest.TestCase):
+    def test_probe_and_persist(self):
+        with FixtureServer() as server, TemporaryDirectory() as tmp:
+            alive = NewsStation.from_config("ALIVE", "en-US", {"uri": f"rss//{server.url('feed.xml')}"})
+            missing = NewsStation.from_config("404", "en-US", {"uri": server.url("missing.mp3")})
+            offline = NewsStation.from_config("DOWN", "en-US", {"uri": "http://127.0.0.1:9/live.mp3"})
+            path = join(tmp, "health.json")
+
+            checker = HealthChecker(path, timeout=1, failure_threshold=2)
+            self.assertEqual(checker.penalties([alive, missing, offline]), None)
+            changed = checker.check([alive, missing, offline])
+            self.assertEqual(set(changed), {missing, offline})
+            self.assertTrue(checker.records[alive.uri].available)
+            self.assertEqual(checker.penalty(alive), 0)
+            self.assertEqual(checker.penalty(missing), checker.unavailable_penalty)
+
+            checker.check([alive, missing, offline])
+            self.assertTrue(checker.is_dead(offline))
+            self.assertEqual(checker.penalties([alive, missing, offline]), [0, float("inf"), float("inf")])
+            checker.shutdown()
+
+            # results survive restarts
+            reloaded = HealthChecker(path, failure_threshold=2)
+            self.assertEqual(reloaded.records, checker.records)
+            self.assertTrue(reloaded.is_dead(offline))
+
+    def test_scorer_penalties(self):
+        stations = [NewsStation.from_config(f, "en-US", {"uri": f"http://{f}.mp3", "aliases": [f]})
+                    for f in ("alpha", "beta", "gamma")]
+        scorer = StationScorer(stations)
+        kwargs = dict(target_langs=["en-US"], explicit_langs=False, country="US", base_score=30)
+        base = dict(scorer.score("alpha", **kwargs))
+        scored = dict(scorer.score("alpha", penalties=[10, 0, float("inf")], **kwargs))
+        self.assertEqual(scored[stations[0]], base[stations[0]] - 10)
+        self.assertNotIn(stations[2], scored)
+        self.assertEqual(dict(scorer._score_python("alpha", ["en-US"], False, "US", 30, None, False, False,
+                                                   None, 50, None, [10, 0, float("inf")])), scored)
+
+
+class TestSkillHealth(SkillTestCase):
+    @classmethod
+    def setUpClass(self):
+        super().setUpClass()
+        self.skill = NewsSkill()
+        self.skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+
+    @classmethod
+    def tearDownClass(self):
+        self.skill.shutdown()
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.skill.search_cache.clear()
+        previous = self.skill._stations
+
+        def restore():
+            self.skill.health = None
+            self.skill._stations = previous
+            self.skill.search_cache.clear()
+
+        self.addCleanup(restore)
+
+    def _catalog(self, stations: dict):
+        archive = {"en-US": {feed: {"aliases": ["Fixture News"], "uri": uri} for feed, uri in stations.items()}}
+        self.skill._stations = StationIndex.from_archive(archive, key=self.skill.stations.key)
+
+    def test_opt_in(self):
+        self.assertIsNone(self.skill.health)
+
+    def test_dead_stations_excluded(self):
+        with FixtureServer() as server:
+            self.skill.health = HealthChecker(join(self.tmp.name, "health.json"), timeout=1, failure_threshold=1)
+            self._catalog({"DEAD": "http://127.0.0.1:9/live.mp3", "ALIVE": f"rss//{server.url('feed.xml')}"})
+            self.assertEqual({r.title for r in self.skill.search_news("fixture news", MediaType.NEWS)},
+                             {"DEAD", "ALIVE"})
+            self.skill.check_station_health()
+            self.assertEqual([r.title for r in self.skill.search_news("fixture news", MediaType.NEWS)], ["ALIVE"])
+
+    def test_offline_round_ignored(self):
+        self.skill.health = HealthChecker(join(self.tmp.name, "health.json"), timeout=1, failure_threshold=1)
+        self._catalog({"DOWN": "http://127.0.0.1:9/live.mp3", "DOWN2": "http://127.0.0.1:9/other.mp3"})
+        self.assertEqual(self.skill.health.check(self.skill.stations), [])
+        self.assertEqual(self.skill.health.records, {})
+        self.assertEqual(len(self.skill.search_news("fixture news", MediaType.NEWS)), 2)
+
+    def test_penalties_never_empty_results(self):
+        self.skill.health = HealthChecker(join(self.tmp.name, "health.json"), failure_threshold=1)
+        self._catalog({"A": "http://127.0.0.1:9/a.mp3", "B": "http://127.0.0.1:9/b.mp3"})
+        for station in self.skill.stations:
+            self.skill.health.records[station.uri] = StationHealth(available=False, failures=1)
+        self.skill.health.version += 1
+        self.assertEqual({r.title for r in self.skill.search_news("fixture news", MediaType.NEWS)}, {"A", "B"})
+        self.skill.search_cache.clear()
+        self.assertEqual({r.title for r in self.skill.iter_search_news("fixture news", MediaType.NEWS)},
+                         {"A", "B"})
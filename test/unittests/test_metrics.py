@@ -0,0 +1,65 @@
+import unittest
+
+from ovos_bus_client.message import Message
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.metrics import Histogram, QueryMetrics
+
+from skill_test import SkillTestCase
+
+
+class TestQueryMetrics(unittest.TestCase):
+    def test_histogram(self):
+        histogram = Histogram(buckets=(0.01, 0.1))
+        for seconds in (0.005, 0.05, 0.05, 3):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.cumulative(), {"0.01": 1, "0.1": 3, "+Inf": 4})
+        self.assertEqual(histogram.count, 4)
+
+    def test_disabled(self):
+        metrics = QueryMetrics(enabled=False)
+        self.assertIs(metrics.stage("search_news", "score"), metrics.stage("search_news", "parse"))
+        with metrics.stage("search_news", "score"):
+            metrics.count("search_news", "queries")
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_enabled(self):
+        metrics = QueryMetrics(enabled=True)
+        with metrics.stage("search_news", "score"):
+            pass
+        metrics.count("search_news", "scanned", 70)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["search_news"]["stages"]["score"]["count"], 1)
+        self.assertEqual(snapshot["search_news"]["counters"]["scanned"], 70)
+        text = metrics.prometheus()
+        self.assertIn('ovos_news_stage_seconds_bucket{operation="search_news",stage="score",le="+Inf"} 1', text)
+        self.assertIn('ovos_news_query_total{operation="search_news",counter="scanned"} 70', text)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+
+class TestSkillMetrics(SkillTestCase):
+    def test_search_stages(self):
+        bus = FakeBus()
+        skill = NewsSkill()
+        skill._startup(bus, "ovos-skill-news.openvoiceos")
+        skill.metrics.enabled = True
+        skill.search_news("npr news", MediaType.NEWS)
+        skill.search_news("npr news", MediaType.NEWS)
+        skill.play_media = lambda *args, **kwargs: None
+        skill.handle_play_the_news(Message("", {"utterance": "play the news"}))
+
+        search = skill.metrics.snapshot()["search_news"]
+        self.assertEqual(search["counters"]["queries"], 2)
+        self.assertEqual(search["counters"]["cache_hits"], 1)
+        self.assertGreater(search["counters"]["scanned"], 0)
+        for stage in ("total", "parse", "match_lang", "cache", "ocp_voc_match", "filter", "score", "entries", "sort"):
+            self.assertIn(stage, search["stages"])
+        self.assertEqual(search["stages"]["total"]["count"], 2)
+        self.assertIn("score", skill.metrics.snapshot()["handle_play_the_news"]["stages"])
+
+        responses = []
+        bus.on(f"{skill.skill_id}.metrics.response", lambda m: responses.append(m))
+        bus.emit(Message(f"{skill.skill_id}.metrics"))
+        self.assertIn("ovos_news_stage_seconds_bucket", responses[0].data["prometheus"])
@@ -0,0 +1,85 @@
+import json
+import unittest
+from os.path import dirname, join
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.ngrams import NgramIndex, char_ngrams, tokenize
+from skill_ovos_news.stations import StationIndex
+
+from skill_test import SkillTestCase
+
+
+class TestNgramIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        with open(join(dirname(dirname(dirname(__file__))), "News.json")) as f:
+            self.index = StationIndex.from_archive(json.load(f))
+
+    def _feeds(self, phrase):
+        candidates = self.index.ngrams.candidates(phrase)
+        if candidates is None:
+            return None
+        return [self.index.stations[i].feed for i in candidates]
+
+    def test_grams(self):
+        self.assertEqual(tokenize("NPR News-Now"), ["npr", "news", "now"])
+        self.assertEqual(char_ngrams("npr"), {" np", "npr", "pr "})
+        self.assertEqual(char_ngrams("a"), {" a "})
+
+    def test_provider_candidates(self):
+        self.assertIn("NPR", self._feeds("NPR"))
+        self.assertIn("BBC", self._feeds("bbc"))
+        self.assertIn("AP", self._feeds("associated press"))
+        self.assertLess(len(self._feeds("NPR")), len(self.index))
+
+    def test_full_scan(self):
+        self.assertIsNone(self._feeds(""))
+        self.assertIsNone(self._feeds("xyzzy qwfp"))
+
+    def test_max_candidates(self):
+        index = NgramIndex([("news station",)] * 100)
+        self.assertEqual(len(index.candidates("news", max_candidates=10)), 10)
+        self.assertEqual(len(index.candidates("news", max_candidates=1000)), 100)
+
+
+class TestSkillPruning(SkillTestCase):
+    @classmethod
+    def setUpClass(self):
+        super().setUpClass()
+        self.skill = NewsSkill()
+        self.skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+        self.skill._warm.wait()
+        # generic words select many stations by n-grams, but not the ones that win
+        self.phrases = ["the news", "radio news", "public radio", "news", "BBC", "bbc news", "NPR"]
+
+    @classmethod
+    def tearDownClass(self):
+        self.skill.shutdown()
+
+    def _search(self, prune: bool, stream=False):
+        self.skill.settings["prune_candidates"] = prune
+        try:
+            results = {}
+            for phrase in self.phrases:
+                for media_type in (MediaType.NEWS, MediaType.GENERIC):
+                    self.skill.search_cache.clear()
+                    found = self.skill.iter_search_news(phrase, media_type) if stream else \
+                        self.skill.search_news(phrase, media_type)
+                    results[(phrase, media_type)] = [(r.title, r.match_confidence) for r in found]
+            return results
+        finally:
+            self.skill.settings.pop("prune_candidates")
+
+    def test_off_by_default(self):
+        self.assertNotIn("prune_candidates", self.skill.settings)
+        _, _, rank, _ = self.skill._plan_search("bbc news", MediaType.NEWS)
+        self.assertFalse(rank["prune"])
+
+    def test_same_rankings(self):
+        baseline = self._search(prune=False)
+        self.assertEqual(baseline[("the news", MediaType.GENERIC)][0][0], "NPR")  # the default feed
+        self.assertGreater(len(baseline[("radio news", MediaType.GENERIC)]), 1)
+        self.assertEqual(baseline, self._search(prune=True))
+        self.assertEqual(baseline, self._search(prune=True, stream=True))
@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.catalog import CompiledCatalog, CompiledStationIndex
+
+from skill_test import SkillTestCase
+
+NEWS_JSON = join(dirname(dirname(dirname(__file__))), "News.json")
+
+
+class TestCatalogReload(SkillTestCase):
+    def test_reload(self):
+        with TemporaryDirectory() as tmp:
+            path = join(tmp, "News.json")
+            shutil.copy(NEWS_JSON, path)
+            bus = FakeBus()
+            messages = []
+            for msg_type in ("ovos.common_play.register_keyword", "ovos.common_play.deregister_keyword"):
+                bus.on(msg_type, lambda m: messages.append(m))
+            skill = NewsSkill()
+            skill.archive_path = path
+            skill.compiled_path = join(tmp, "News.catalog")
+            skill._startup(bus, "ovos-skill-news.openvoiceos")
+            snapshot = skill.stations
+            self.assertIsNone(skill.reload_catalog())  # not modified
+
+            with open(path) as f:
+                archive = json.load(f)
+            archive["en-US"]["Fixture"] = {"aliases": ["Fixture Radio"], "uri": "https://example.com/live.mp3"}
+            with open(path, "w") as f:
+                json.dump(archive, f)
+            os.utime(path, (snapshot.key[0] + 1, snapshot.key[0] + 1))
+            # queries are served from the old index until it is swapped
+            self.assertIs(skill.stations, snapshot)
+            messages.clear()
+            diff = skill.reload_catalog()
+            self.assertEqual(diff.summary(), {"added": 1, "removed": 0, "changed": 0})
+            self.assertIsNot(skill.stations, snapshot)
+            self.assertEqual(len(skill.stations), len(snapshot) + 1)
+            # only the new keywords are sent to OCP
+            self.assertEqual(messages[-1].data["samples"], ["Fixture Radio", "Fixture"])
+            self.assertEqual(skill.ocp_voc_match("play fixture radio"), {"news_provider": "Fixture Radio"})
+            self.assertIn("Fixture", [r.title for r in skill.search_news("fixture radio", MediaType.NEWS)])
+
+            archive["en-US"].pop("Fixture")
+            with open(path, "w") as f:
+                json.dump(archive, f)
+            messages.clear()
+            diff = skill.reload_catalog(force=True)
+            self.assertEqual(diff.summary(), {"added": 0, "removed": 1, "changed": 0})
+            # removals replace the OCP label
+            self.assertEqual([m.msg_type for m in messages],
+                             ["ovos.common_play.deregister_keyword", "ovos.common_play.register_keyword"])
+            self.assertEqual(skill.ocp_voc_match("play fixture radio"), {})
+            skill.shutdown()
+
+    def test_touch_releases_catalog(self):
+        with TemporaryDirectory() as tmp:
+            path = join(tmp, "News.json")
+            shutil.copy(NEWS_JSON, path)
+            skill = NewsSkill()
+            skill.archive_path = path
+            skill.compiled_path = join(tmp, "News.catalog")
+            skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+            snapshot = skill.stations
+            self.assertIsInstance(snapshot, CompiledStationIndex)
+
+            def mapped():
+                with open("/proc/self/maps") as f:
+                    return sum(1 for line in f if line.rstrip().endswith(skill.compiled_path))
+
+            before = mapped() if os.path.isfile("/proc/self/maps") else None
+            with patch.object(CompiledCatalog, "close", autospec=True, side_effect=CompiledCatalog.close) as close:
+                for i in range(1, 11):
+                    # touched, same stations
+                    os.utime(path, (snapshot.key[0] + i, snapshot.key[0] + i))
+                    self.assertFalse(skill.reload_catalog())
+            # every catalog opened for a comparison was closed, the one in use was not
+            self.assertEqual(close.call_count, 10)
+            self.assertNotIn(snapshot.catalog, [c.args[0] for c in close.call_args_list])
+            self.assertIs(skill.stations.catalog, snapshot.catalog)
+            if before is not None:
+                self.assertEqual(mapped(), before)
+            self.assertTrue(skill.search_news("npr news", MediaType.NEWS))
+            skill.shutdown()
@@ -0,0 +1,56 @@
+import unittest
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaEntry, MediaType, PluginStream
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.resolver import StreamResolver
+from skill_ovos_news.stations import NewsStation, StationIndex
+
+from fixture_server import FixtureServer
+from skill_test import SkillTestCase
+
+
+class TestStreamResolver(unittest.TestCase):
+    def test_resolve_rss(self):
+        with FixtureServer() as server:
+            station = NewsStation.from_config("FIX", "en-US", {"uri": f"rss//{server.url('feed.xml')}"})
+            resolver = StreamResolver(ttl=60)
+            self.assertIsNone(resolver.get(station))
+            self.assertEqual(resolver.refresh([station]), [station])
+            resolved = resolver.get(station)
+            self.assertEqual(resolved.uri, "http://localhost/episodes/latest.mp3")
+            self.assertEqual(resolved.title, "Newscast 10:00")
+            # unchanged on next refresh
+            self.assertEqual(resolver.refresh([station]), [])
+            resolver.shutdown()
+
+    def test_unreachable(self):
+        station = NewsStation.from_config("FIX", "en-US", {"uri": "rss//http://127.0.0.1:9/feed.xml"})
+        resolver = StreamResolver(ttl=60, timeout=1)
+        self.assertIsNone(resolver.resolve(station))
+        self.assertIsNone(resolver.get(station))
+
+    def test_direct_streams(self):
+        station = NewsStation.from_config("FIX", "en-US", {"uri": "https://example.com/live.mp3"})
+        self.assertIsNone(StreamResolver().resolve(station))
+
+
+class TestSkillPreresolve(SkillTestCase):
+    def test_search_returns_resolved(self):
+        with FixtureServer() as server:
+            skill = NewsSkill()
+            skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+            archive = {"en-US": {"FIX": {"aliases": ["Fixture News"],
+                                         "uri": f"rss//{server.url('feed.xml')}"}}}
+            skill._stations = StationIndex.from_archive(archive, key=skill.stations.key)
+            skill.settings["preresolve_streams"] = True
+            skill.on_settings_changed()
+
+            results = skill.search_news("fixture news", MediaType.NEWS)
+            self.assertIsInstance(results[0], PluginStream)
+
+            skill.preresolve_streams()
+            results = skill.search_news("fixture news", MediaType.NEWS)
+            self.assertIsInstance(results[0], MediaEntry)
+            self.assertEqual(results[0].uri, "http://localhost/episodes/latest.mp3")
+            skill.shutdown()
@@ -0,0 +1,151 @@
+import json
+import unittest
+from os.path import dirname, join
+from unittest.mock import patch
+
+from skill_ovos_news import scoring
+from skill_ovos_news.scoring import StationScorer, score_station
+from skill_ovos_news.stations import StationIndex
+
+
+class TestStationScorer(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        with open(join(dirname(dirname(dirname(__file__))), "News.json")) as f:
+            archive = json.load(f)
+        self.index = StationIndex.from_archive(archive, {"en-US": "NPR", "pt-PT": "TSF"})
+        self.phrases = ["NPR", "bbc news", "", "national public radio", "portuguese news",
+                        "euronews", "deutschlandfunk nachrichten", "news in spanish"]
+        self.queries = [
+            dict(target_langs=["en-US"], explicit_langs=False, country="US"),
+            dict(target_langs=["pt-PT"], explicit_langs=True, country="PT", base_score=30),
+            dict(target_langs=["de-DE", "en"], explicit_langs=True, country="DE", world_news=True),
+            dict(target_langs=["en-US"], explicit_langs=False, country="GB", world_news=False),
+        ]
+
+    def _reference(self, phrase, target_langs, explicit_langs, country,
+                   base_score=0, world_news=None):
+        results = []
+        for station in self.index:
+            s = score_station(phrase, station, target_langs, explicit_langs, country, base_score)
+            if world_news is not None and station.world_news:
+                s += 10 if world_news else -10
+            if s > 50:
+                results.append((station.feed, s))
+        return results
+
+    def _check(self, scorer):
+        for phrase in self.phrases:
+            for q in self.queries:
+                expected = self._reference(phrase, **q)
+                got = [(st.feed, s) for st, s in scorer.score(phrase, **q)]
+                self.assertEqual(expected, got, (phrase, q))
+
+    def _check_top_k(self, scorer):
+        penalties = [20 if i % 7 == 0 else float("inf") if i % 11 == 0 else 0 for i in range(len(self.index))]
+        for phrase in self.phrases:
+            for q in self.queries:
+                ranked = sorted(scorer.score(phrase, penalties=penalties, **q), key=lambda r: -r[1])
+                for k in (1, 3, 10):
+                    stats = {}
+                    got = scorer.top_k(phrase, k=k, penalties=penalties, stats=stats, **q)
+                    self.assertEqual(ranked[:k], got, (phrase, q, k))
+                    self.assertLessEqual(stats["scanned"] + stats["pruned"], len(self.index))
+
+    def test_top_k(self):
+        if not self.index.scorer.vectorized:
+            self.skipTest("numpy not installed")
+        self._check_top_k(self.index.scorer)
+        stats = {}
+        self.index.scorer.top_k("NPR", ["en-US"], False, "US", k=1, stats=stats)
+        self.assertGreater(stats["pruned"], 0)
+
+    def test_top_k_fallback(self):
+        with patch.object(scoring, "np", None):
+            scorer = StationScorer(self.index.stations)
+            self._check_top_k(scorer)
+
+    def _check_upper_bound(self, scorer):
+        exclude = set(range(0, len(self.index), 2))
+        bounds = []
+        for q in self.queries:
+            bound = scorer.upper_bound(exclude=sorted(exclude), **q)
+            for phrase in self.phrases:
+                # nothing filtered, every station in catalog order
+                scored = scorer.score(phrase, threshold=float("-inf"), **q)
+                self.assertLessEqual(max(s for i, (_, s) in enumerate(scored) if i not in exclude), bound,
+                                     (phrase, q))
+            bounds.append(bound)
+        self.assertEqual(scorer.upper_bound(["en-US"], False, "US", exclude=list(range(len(self.index)))),
+                         float("-inf"))
+        return bounds
+
+    def test_upper_bound(self):
+        if not self.index.scorer.vectorized:
+            self.skipTest("numpy not installed")
+        bounds = self._check_upper_bound(self.index.scorer)
+        with patch.object(scoring, "np", None):
+            self.assertEqual(self._check_upper_bound(StationScorer(self.index.stations)), bounds)
+
+    def _check_iter_top(self, scorer):
+        penalties = [20 if i % 7 == 0 else float("inf") if i % 11 == 0 else 0 for i in range(len(self.index))]
+        for phrase in self.phrases:
+            for q in self.queries:
+                for k in (1, 3, 10):
+                    expected = scorer.top_k(phrase, k=k, penalties=penalties, **q)
+                    got = list(scorer.iter_top(phrase, k=k, penalties=penalties, **q))
+                    self.assertEqual(expected, got, (phrase, q, k))
+                # everything, in the order of a stable sort on the capped score
+                expected = sorted(scorer.score(phrase, penalties=penalties, **q), key=lambda r: -min(100, r[1]))
+                got = list(scorer.iter_top(phrase, k=len(self.index), penalties=penalties, cap=100, **q))
+                self.assertEqual(expected, got, (phrase, q))
+
+    def test_iter_top(self):
+        if not self.index.scorer.vectorized:
+            self.skipTest("numpy not installed")
+        self._check_iter_top(self.index.scorer)
+
+    def test_iter_top_fallback(self):
+        with patch.object(scoring, "np", None):
+            self._check_iter_top(StationScorer(self.index.stations))
+
+    def test_iter_top_exact_first(self):
+        if not self.index.scorer.vectorized:
+            self.skipTest("numpy not installed")
+        scorer = self.index.scorer
+        first = scorer.exact_matches("NPR")
+        self.assertTrue(first)
+        stats = {}
+        results = scorer.iter_top("NPR", ["en-US"], False, "US", k=3, first=first, stats=stats)
+        station, _ = next(results)
+        results.close()
+        self.assertEqual(station.feed, "NPR")
+        # the first result is final before most of the catalog is scored
+        self.assertLess(stats["scanned"], len(self.index) // 2)
+
+    def test_vectorized_matches_reference(self):
+        if not self.index.scorer.vectorized:
+            self.skipTest("numpy not installed")
+        self._check(self.index.scorer)
+
+    def test_fallback_matches_reference(self):
+        with patch.object(scoring, "np", None):
+            scorer = StationScorer(self.index.stations)
+            self.assertFalse(scorer.vectorized)
+            self._check(scorer)
+
+    def test_filters(self):
+        scored = self.index.scorer.score("news", ["pt-PT"], True, "PT", base_score=50,
+                                         allowed_langs=["pt-PT"], local_only=True)
+        self.assertTrue(scored)
+        for station, _ in scored:
+            self.assertEqual(station.lang, "pt-PT")
+            self.assertFalse(station.world_news)
+
+    def test_defaults_reuse_aliases(self):
+        index = self.index.with_defaults({"en-US": "FOX"})
+        self.assertIs(index.scorer.sorted_aliases, self.index.scorer.sorted_aliases)
+        fox = dict((st.feed, s) for st, s in index.scorer.score("", ["en-US"], False, "US", base_score=40))
+        npr = dict((st.feed, s) for st, s in self.index.scorer.score("", ["en-US"], False, "US", base_score=40))
+        self.assertEqual(fox["FOX"], npr["FOX"] + 10)
+        self.assertEqual(npr["NPR"], fox["NPR"] + 10)
@@ -0,0 +1,102 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.sources import CatalogSource, normalize_record
+from skill_ovos_news.stations import StationIndex
+
+from skill_test import SkillTestCase
+
+CSV = """label,sample,uri,lang,world_news
+news_provider,Fixture Radio,https://example.com/fixture.mp3,en-US,
+news_provider,Fixture News,https://example.com/fixture.mp3,en-US,
+news_provider,Radio Teste,rss//https://example.pt/feed.xml,pt_PT,true
+news_provider,No Uri,,en-US,
+news_provider,Bad Lang,https://example.com/bad.mp3,??,
+news_provider,Fixture Radio,https://example.com/fixture.mp3,en-US,
+"""
+
+
+class _LineCounter(io.StringIO):
+    """ counts how many lines were read from the file """
+    read_lines = 0
+
+    def __next__(self):
+        self.read_lines += 1
+        return super().__next__()
+
+
+class TestCatalogSource(unittest.TestCase):
+    def test_normalize(self):
+        feed, lang, config = normalize_record({"title": "FIX", "lang": "en_US", "uri": "news//https://x.com",
+                                               "aliases": "Fixture|Fixture News", "world_news": "yes"})
+        self.assertEqual((feed, lang), ("FIX", "en-US"))
+        self.assertEqual(config["aliases"], ["Fixture", "Fixture News"])
+        self.assertTrue(config["world_news"])
+        for bad in ({"lang": "en-US", "uri": "https://x.com"},
+                    {"title": "FIX", "lang": "en-US", "uri": "ftp://x.com"},
+                    {"title": "FIX", "uri": "https://x.com"},
+                    {"label": "movie_name", "title": "FIX", "lang": "en-US", "uri": "https://x.com"}):
+            with self.assertRaises(ValueError):
+                normalize_record(bad)
+
+    def test_csv(self):
+        source = CatalogSource(io.StringIO(CSV), "csv")
+        stations = [s for batch in source for s in batch]
+        self.assertEqual([s.feed for s in stations], ["Fixture Radio", "Radio Teste"])
+        self.assertEqual(stations[0].aliases, ("Fixture Radio", "Fixture News"))
+        self.assertEqual(stations[1].lang, "pt-PT")
+        self.assertEqual(stations[1].extractor_id, "rss")
+        self.assertTrue(stations[1].world_news)
+        self.assertEqual((source.stats.added, source.stats.merged, source.stats.invalid,
+                          source.stats.duplicates), (2, 1, 2, 1))
+
+    def test_jsonl(self):
+        lines = [json.dumps({"title": "A", "lang": "en-US", "uri": "https://a.com"}),
+                 "{not json",
+                 "",
+                 json.dumps({"title": "B", "lang": "de-DE", "uri": "https://b.com", "aliases": ["Bee"]})]
+        source = CatalogSource(io.StringIO("\n".join(lines)), "jsonl")
+        self.assertEqual([[s.feed for s in b] for b in source], [["A", "B"]])
+        self.assertEqual(source.stats.invalid, 1)
+
+    def test_streaming_batches(self):
+        rows = "".join(f"news_provider,Station {i},https://example.com/{i}.mp3,en-US\n" for i in range(1000))
+        f = _LineCounter("label,sample,uri,lang\n" + rows)
+        source = CatalogSource(f, "csv", batch_size=100)
+        batches = iter(source)
+        self.assertEqual(len(next(batches)), 100)
+        # only the first batch was parsed
+        self.assertLess(f.read_lines, 110)
+        self.assertEqual(sum(len(b) for b in batches), 900)
+        self.assertEqual(source.stats.batches, 10)
+
+
+class TestSkillIngestion(SkillTestCase):
+    def test_ingest(self):
+        bus = FakeBus()
+        messages = []
+        bus.on("ovos.common_play.register_keyword", lambda m: messages.append(m))
+        skill = NewsSkill()
+        skill._startup(bus, "ovos-skill-news.openvoiceos")
+        total = len(skill.stations)
+        with patch.object(StationIndex, "extend", autospec=True, side_effect=StationIndex.extend) as extend:
+            stats = skill.ingest_catalog(io.StringIO(CSV), "csv", batch_size=1)
+        self.assertEqual((stats.added, stats.batches), (2, 2))
+        # the language groups are rebuilt once, not once per batch
+        self.assertEqual(extend.call_count, 1)
+        self.assertEqual(len(skill.stations), total + 2)
+        self.assertIn("Fixture News", skill.ocp_matchers[skill.lang].entities["news_provider"])
+        # only the new keywords are sent to OCP
+        self.assertIn("Fixture News", messages[-1].data["samples"])
+        self.assertNotIn("NPR", messages[-1].data["samples"])
+
+        results = skill.search_news("fixture radio", MediaType.GENERIC)
+        self.assertEqual(results[1].title, "Fixture Radio")  # ties with the default feed
+        # ingesting again does not duplicate stations
+        self.assertEqual(skill.ingest_catalog(io.StringIO(CSV), "csv").added, 0)
+        self.assertEqual(len(skill.stations), total + 2)
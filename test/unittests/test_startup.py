@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import unittest
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+from skill_ovos_news.catalog import compile_keywords, load_keywords
+from skill_ovos_news.stations import StationIndex
+
+from skill_test import SkillTestCase
+
+ROOT = dirname(dirname(dirname(__file__)))
+NEWS_JSON = join(ROOT, "News.json")
+
+
+class TestPrecomputedKeywords(unittest.TestCase):
+    def test_keywords(self):
+        with TemporaryDirectory() as tmp:
+            source = join(tmp, "News.json")
+            target = join(tmp, "News.keywords.json")
+            shutil.copy(NEWS_JSON, source)
+            self.assertIsNone(load_keywords(target, source))
+            with open(source) as f:
+                archive = json.load(f)
+            self.assertEqual(compile_keywords(source, target), len(StationIndex.from_archive(archive).keywords()))
+            self.assertEqual(load_keywords(target, source), StationIndex.from_archive(archive).keywords())
+
+            # same contents, new mtime
+            os.utime(source, (1, 1))
+            self.assertIsNotNone(load_keywords(target, source))
+            archive["en-US"]["Fixture"] = {"aliases": ["Fixture News"], "uri": "https://example.com/live.mp3"}
+            with open(source, "w") as f:
+                json.dump(archive, f)
+            self.assertIsNone(load_keywords(target, source))
+
+    def test_shipped_keywords(self):
+        self.assertIsNotNone(load_keywords(join(ROOT, "News.keywords.json"), NEWS_JSON),
+                             "News.keywords.json is out of date, run scripts/compile_catalog.py")
+
+
+class TestDeferredStartup(SkillTestCase):
+    def start(self, deferred: bool) -> NewsSkill:
+        bus = FakeBus()
+        self.registered = []
+        bus.on("ovos.common_play.register_keyword", lambda m: self.registered.append(m.data))
+        skill = NewsSkill(settings={"deferred_startup": deferred})
+        skill._startup(bus, "ovos-skill-news.openvoiceos")
+        return skill
+
+    def test_deferred(self):
+        skill = self.start(deferred=True)
+        with open(self.registered[0]["csv"]) as f:
+            samples = [line.split(",", 1)[1] for line in f.read().splitlines()[1:]]
+        self.assertEqual(samples, load_keywords(skill.keywords_path, skill.archive_path))
+        results = skill.search_news("npr news", MediaType.NEWS)
+        self.assertTrue(skill._warm.is_set())
+        self.assertEqual(skill.ocp_voc_match("npr news"), {"news_provider": "NPR News"})
+        skill.shutdown()
+
+        eager = self.start(deferred=False)
+        self.assertTrue(eager._warm.is_set())
+        self.assertEqual([r.title for r in eager.search_news("npr news", MediaType.NEWS)], [r.title for r in results])
+        eager.shutdown()
@@ -0,0 +1,141 @@
+import json
+import unittest
+from os.path import dirname, join
+
+from ovos_utils.ocp import MediaEntry, PluginStream, dict2entry
+from skill_ovos_news.featured import FeaturedPlaylist, copy_entry
+from skill_ovos_news.stations import NewsStation, StationIndex
+
+
+class TestStationIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        with open(join(dirname(dirname(dirname(__file__))), "News.json")) as f:
+            self.archive = json.load(f)
+
+    def test_compile_station(self):
+        config = {"aliases": ["BBC", "BBC News"],
+                  "uri": "rss//https://podcasts.files.bbci.co.uk/p02nq0gn.rss",
+                  "image": "./res/images/BBC.png",
+                  "secondary_langs": ["en"]}
+        station = NewsStation.from_config("BBC", "en-GB", config)
+        self.assertEqual(station.lang, "en-GB")
+        self.assertEqual(station.langs, {"en-GB", "en"})
+        self.assertEqual(station.countries, {"GB"})
+        self.assertEqual(station.extractor_id, "rss")
+        self.assertEqual(station.stream, "https://podcasts.files.bbci.co.uk/p02nq0gn.rss")
+        self.assertTrue(station.image.endswith("/res/images/BBC.png"))
+        self.assertNotIn("./", station.image)
+        # the raw catalog is never modified
+        self.assertEqual(config["image"], "./res/images/BBC.png")
+        self.assertNotIn("lang", config)
+
+    def test_as_dict_is_a_copy(self):
+        index = StationIndex.from_archive(self.archive, {"en-US": "NPR"})
+        npr = [s for s in index if s.feed == "NPR"][0]
+        entry = npr.as_dict()
+        self.assertTrue(entry["is_default"])
+        self.assertEqual(entry["extractor_id"], "news")
+        entry["aliases"].append("modified")
+        self.assertNotIn("modified", npr.as_dict()["aliases"])
+
+    def test_compact_records(self):
+        index = StationIndex.from_archive(self.archive)
+        en = [s for s in index if s.lang == "en-US"]
+        self.assertFalse(hasattr(en[0], "__dict__"))
+        # repeated values are stored once
+        self.assertIs(en[0].langs, en[1].langs)
+        self.assertIs(en[0].bg_image, en[1].bg_image)
+
+    def test_entry(self):
+        index = StationIndex.from_archive(self.archive)
+        for station in index:
+            expected = dict2entry(station.as_dict())
+            expected.match_confidence = 80
+            self.assertEqual(station.entry(80), expected)
+        npr = [s for s in index if s.feed == "NPR"][0]
+        self.assertIsInstance(npr.entry(), PluginStream)
+        local = npr.entry(120, uri="file:///tmp/npr.mp3")
+        self.assertIsInstance(local, MediaEntry)
+        self.assertEqual(local.uri, "file:///tmp/npr.mp3")
+        self.assertEqual(local.match_confidence, 100)
+
+    def test_defaults(self):
+        index = StationIndex.from_archive(self.archive, {"en-US": "NPR"})
+        self.assertEqual([s.feed for s in index if s.is_default], ["NPR"])
+        index2 = index.with_defaults({"en-US": "FOX"})
+        self.assertEqual([s.feed for s in index2 if s.is_default], ["FOX"])
+        # the original index is untouched
+        self.assertEqual([s.feed for s in index if s.is_default], ["NPR"])
+
+    def test_extend(self):
+        index = StationIndex.from_archive(self.archive, {"en-US": "NPR"})
+        extra = [NewsStation.from_config("NPR", "en-US", {"uri": "https://example.com/npr.mp3"}),
+                 NewsStation.from_config("NEW", "xx-XX", {"uri": "https://example.com/new.mp3"})]
+        extended = index.extend(extra)
+        self.assertEqual(len(extended), len(index) + 2)
+        self.assertEqual(extended.by_lang["en-US"][-1].uri, "https://example.com/npr.mp3")
+        self.assertTrue(extended.by_lang["en-US"][-1].is_default)
+        self.assertEqual(extended.langs[-1], "xx-XX")
+        self.assertEqual(len(index), sum(len(v) for v in self.archive.values()))
+
+    def test_diff(self):
+        index = StationIndex.from_archive(self.archive)
+        archive = json.loads(json.dumps(self.archive))
+        archive["en-US"]["NPR"]["aliases"].append("NPR Hourly")
+        archive["en-US"]["Fixture"] = {"aliases": ["Fixture News"], "uri": "https://example.com/live.mp3"}
+        archive["pt-PT"].pop("RDP")
+        diff = index.diff(StationIndex.from_archive(archive))
+        self.assertEqual(diff.summary(), {"added": 1, "removed": 1, "changed": 1})
+        self.assertEqual(diff.changed[0][1].feed, "NPR")
+        self.assertFalse(index.diff(StationIndex.from_archive(self.archive)))
+        # keywords are unique
+        keywords = index.keywords()
+        self.assertEqual(len(keywords), len(set(keywords)))
+
+    def test_filter(self):
+        index = StationIndex.from_archive(self.archive)
+        self.assertEqual(len(index), sum(len(v) for v in self.archive.values()))
+        pt = list(index.filter(["pt-PT"]))
+        self.assertTrue(pt)
+        self.assertTrue(all(s.lang == "pt-PT" for s in pt))
+        world = list(index.filter(world_only=True))
+        self.assertTrue(world)
+        self.assertTrue(all(s.world_news for s in world))
+        local = list(index.filter(local_only=True))
+        self.assertEqual(len(world) + len(local), len(index))
+
+
+class TestFeaturedPlaylist(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        with open(join(dirname(dirname(dirname(__file__))), "News.json")) as f:
+            self.archive = json.load(f)
+
+    def test_lazy_incremental(self):
+        index = StationIndex.from_archive(self.archive)
+        featured = FeaturedPlaylist(lambda s: MediaEntry(uri=s.uri, title=s.title, image=s.image))
+        featured.update(index.stations)
+        self.assertEqual(len(featured.page(0, 20)), 20)
+        self.assertEqual(featured.builds, 20)
+        self.assertEqual(len(featured.playlist()), len(index))
+        self.assertEqual(featured.builds, len(index))
+
+        # only the modified station gets a new entry
+        archive = json.loads(json.dumps(self.archive))
+        archive["en-US"]["NPR"]["image"] = "npr.png"
+        featured.update(StationIndex.from_archive(archive).stations)
+        playlist = featured.playlist()
+        self.assertEqual(featured.builds, len(index) + 1)
+        self.assertIn("npr.png", [e.image for e in playlist])
+
+    def test_copies(self):
+        index = StationIndex.from_archive(self.archive)
+        featured = FeaturedPlaylist(lambda s: MediaEntry(uri=s.uri, title=s.title, image=s.image))
+        featured.update(index.stations)
+        featured.playlist()[0].match_confidence = 99
+        self.assertEqual(featured.playlist()[0].match_confidence, 0)
+        playlist = featured.playlist()
+        copied = copy_entry(playlist)
+        self.assertIsNot(copied[0], playlist[0])
+        self.assertEqual(copied.title, playlist.title)
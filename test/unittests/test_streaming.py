@@ -0,0 +1,73 @@
+import types
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaType
+from skill_ovos_news import NewsSkill
+
+from skill_test import SkillTestCase
+
+
+class TestStreamingSearch(SkillTestCase):
+    @classmethod
+    def setUpClass(self):
+        super().setUpClass()
+        self.skill = NewsSkill()
+        self.skill._startup(FakeBus(), "ovos-skill-news.openvoiceos")
+        self.skill._warm.wait()
+        self.phrases = ["NPR", "npr news", "bbc news", "", "national public radio", "portuguese news",
+                        "euronews", "world news", "news in spanish", "play the news", "TSF"]
+
+    @classmethod
+    def tearDownClass(self):
+        self.skill.shutdown()
+
+    def setUp(self):
+        super().setUp()
+        self.skill.search_cache.clear()
+
+    @staticmethod
+    def _summary(results):
+        return [(r.title, r.match_confidence) for r in results]
+
+    def test_same_results(self):
+        for max_results in (25, 1, 0):
+            with self.subTest(max_results=max_results):
+                self.skill.settings["max_results"] = max_results
+                try:
+                    for phrase in self.phrases:
+                        for media_type in (MediaType.NEWS, MediaType.GENERIC):
+                            self.skill.search_cache.clear()
+                            expected = self.skill.search_news(phrase, media_type)
+                            self.skill.search_cache.clear()
+                            got = list(self.skill.iter_search_news(phrase, media_type))
+                            self.assertEqual(self._summary(expected), self._summary(got), (phrase, media_type))
+                finally:
+                    self.skill.settings.pop("max_results")
+
+    def test_cached(self):
+        hits = self.skill.search_cache.hits
+        first = list(self.skill.iter_search_news("bbc news", MediaType.NEWS))
+        second = self.skill.search_news("bbc news", MediaType.NEWS)
+        self.assertEqual(self.skill.search_cache.hits, hits + 1)
+        self.assertEqual(self._summary(first), self._summary(second))
+        self.assertIsNot(first[0], second[0])
+
+    def test_partial_not_cached(self):
+        results = self.skill.iter_search_news("bbc news", MediaType.NEWS)
+        self.assertTrue(next(results).title)
+        results.close()
+        self.assertEqual(len(self.skill.search_cache), 0)
+
+    def test_exact_entity_first(self):
+        expected = self.skill.search_news("npr news", MediaType.NEWS)[0]
+        self.skill.search_cache.clear()
+        first = next(self.skill.iter_search_news("npr news", MediaType.NEWS))
+        self.assertEqual(first.title, expected.title)
+
+    def test_setting(self):
+        self.assertIsInstance(self.skill.search_news("NPR", MediaType.NEWS), list)
+        self.skill.settings["stream_results"] = True
+        try:
+            self.assertIsInstance(self.skill.search_news("NPR", MediaType.NEWS), types.GeneratorType)
+        finally:
+            self.skill.settings.pop("stream_results")
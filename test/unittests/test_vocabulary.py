@@ -0,0 +1,40 @@
+import unittest
+
+from skill_ovos_news.vocabulary import VocabMatcher
+
+
+class TestVocabMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        self.matcher = VocabMatcher({
+            "world_news": ["world news", "international news"],
+            "news": ["news"],
+            "pt-pt": ["portuguese", "português"],
+            "en": ["english"],
+        })
+
+    def test_single_pass(self):
+        m = self.matcher.match("play portuguese world news")
+        self.assertEqual(m.vocs, {"pt-pt", "world_news", "news"})
+        self.assertEqual(m.phrase, "play")
+
+    def test_no_match(self):
+        m = self.matcher.match("play NPR")
+        self.assertEqual(m.vocs, frozenset())
+        self.assertEqual(m.phrase, "play NPR")
+        self.assertEqual(self.matcher.match("").phrase, "")
+
+    def test_whole_words(self):
+        m = self.matcher.match("play euronews")
+        self.assertEqual(m.vocs, frozenset())
+        self.assertEqual(m.phrase, "play euronews")
+
+    def test_case(self):
+        # matching is case insensitive, removal is case sensitive
+        m = self.matcher.match("English News")
+        self.assertEqual(m.vocs, {"en", "news"})
+        self.assertEqual(m.phrase, "English News")
+
+    def test_accents(self):
+        self.assertEqual(self.matcher.match("notícias em portugues").vocs, {"pt-pt"})
+        self.assertEqual(self.matcher.match("notícias em português").phrase, "notícias em")
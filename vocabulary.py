@@ -0,0 +1,88 @@
+import re
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Set
+
+from ovos_utils.text_utils import remove_accents_and_punct
+
+
+class VocabMatch(NamedTuple):
+    vocs: FrozenSet[str]  # names of the .voc files found in the utterance
+    phrase: str  # utterance with all vocabulary removed
+
+
+class VocabMatcher:
+    """
+    All the vocabularies of a language compiled into a single alternation regex.
+
+    Replaces one OVOSSkill.voc_match / OVOSSkill.remove_voc call per .voc file with a
+    single scan of the utterance, that reports every matched vocabulary and the cleaned phrase.
+
+    Matching follows voc_match (whole words, case insensitive, ignoring accents and punctuation)
+    while removal follows remove_voc (whole words, case sensitive, longest terms first).
+    """
+
+    def __init__(self, vocabs: Dict[str, Iterable[str]]):
+        """
+        Args:
+            vocabs: Mapping of .voc file name -> vocabulary samples
+        """
+        self.terms: Dict[str, Set[str]] = {}  # lower case term -> voc names
+        exact = set()
+        for name, samples in vocabs.items():
+            for sample in samples:
+                sample = sample.strip()
+                if not sample:
+                    continue
+                exact.add(sample)
+                for term in {sample.lower(), remove_accents_and_punct(sample).lower()}:
+                    if term.strip():
+                        self.terms.setdefault(term.strip(), set()).add(name)
+
+        # the regex consumes the longest term, it must also report the
+        # vocabularies of any shorter term contained in it (eg. "world news" -> "news")
+        implied = {term: set() for term in self.terms}
+        for term in self.terms:
+            for other, names in self.terms.items():
+                if other != term and re.search(r"\b" + re.escape(other) + r"\b", term):
+                    implied[term] |= names
+        for term, names in implied.items():
+            self.terms[term] |= names
+
+        self._regex = self._compile(self.terms, re.IGNORECASE)
+        self._removal = self._compile(exact)
+
+    @staticmethod
+    def _compile(terms: Iterable[str], flags=0):
+        terms = sorted(terms, key=len, reverse=True)  # replace composite terms first
+        if not terms:
+            return None
+        return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b", flags)
+
+    def match(self, utterance: str) -> VocabMatch:
+        """
+        Scans the utterance once for all vocabularies
+
+        Args:
+            utterance: The user utterance.
+
+        Returns:
+            The matched vocabularies and the utterance with all vocabulary removed.
+        """
+        if not utterance or self._regex is None:
+            return VocabMatch(frozenset(), (utterance or "").strip())
+        vocs = set()
+        parts = []
+        last = 0
+        for m in self._regex.finditer(utterance):
+            vocs |= self.terms.get(m.group().lower(), set())
+            parts.append(utterance[last:m.start()])
+            # removal is case sensitive, like OVOSSkill.remove_voc
+            parts.append(self._removal.sub("", m.group()))
+            last = m.end()
+        parts.append(utterance[last:])
+
+        normalized = remove_accents_and_punct(utterance)
+        if normalized != utterance:
+            # voc_match ignores accents and punctuation
+            for m in self._regex.finditer(normalized):
+                vocs |= self.terms.get(m.group().lower(), set())
+        return VocabMatch(frozenset(vocs), "".join(parts).strip())